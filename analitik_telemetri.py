@@ -0,0 +1,219 @@
+import math
+import time
+import numpy as np
+
+# Analitik streaming per perangkat untuk mqtt_sub.py.
+#
+# Setiap perangkat punya ring buffer NumPy berukuran tetap; statistik bergulir
+# (rata-rata/varians tegangan, error centroid terhadap target optimal, jitter
+# sudut) diperbarui O(1) per pembacaan dengan menambah nilai baru dan mengurangi
+# nilai yang keluar dari jendela. Jumlah dihitung ulang dari buffer sesekali
+# (amortized O(1)) agar galat pembulatan tidak menumpuk.
+#
+# Anomali yang dideteksi (satu peringatan saat mulai, satu saat pulih):
+#   tegangan_turun : tegangan turun jauh dari puncaknya sementara sudut servo diam
+#                    (tracker macet / panel tertutup)
+#   placeholder    : koordinat -1.0 (cahaya tidak terdeteksi) terus-menerus
+#   osilasi        : servo sering berbalik arah (gain KP terlalu besar)
+
+# Target centroid optimal, sama dengan TARGET_OPTIMAL_X/Y_NORM di servo.ino
+TARGET_OPTIMAL_X = 0.4597
+TARGET_OPTIMAL_Y = 0.0994
+NILAI_PLACEHOLDER = -1.0
+
+UKURAN_JENDELA_DEFAULT = 64
+MIN_SAMPEL = 8                  # Minimal isi jendela sebelum osilasi dinilai
+AMBANG_SUDUT_DIAM = 0.5         # Derajat; servo bergerak per SERVO_STEP_SIZE = 1.0
+MIN_DIAM = 3                    # Pembacaan beruntun dengan sudut diam sebelum tegangan_turun dinilai
+AMBANG_TURUN_RELATIF = 0.2      # Turun 20% dari puncak selama sudut diam
+BATAS_PLACEHOLDER = 12          # ~1 menit pada interval kirimDataKePC 5 detik
+AMBANG_BALIK_ARAH = 0.5         # Fraksi langkah yang berbalik arah di jendela
+INTERVAL_HITUNG_ULANG = 16      # Hitung ulang jumlah setiap 16 x ukuran jendela pembaruan
+
+class CincinStatistik:
+    """Ring buffer NumPy ukuran tetap dengan rata-rata/varians bergulir O(1)."""
+
+    def __init__(self, ukuran):
+        self.data = np.zeros(ukuran)
+        self.ukuran = ukuran
+        self.n = 0
+        self._i = 0
+        self._jumlah = 0.0
+        self._jumlah_kuadrat = 0.0
+        self._sejak_hitung_ulang = 0
+
+    def tambah(self, nilai):
+        if self.n == self.ukuran:
+            lama = self.data.item(self._i)
+            self._jumlah -= lama
+            self._jumlah_kuadrat -= lama * lama
+        else:
+            self.n += 1
+        self.data[self._i] = nilai
+        self._jumlah += nilai
+        self._jumlah_kuadrat += nilai * nilai
+        self._i = (self._i + 1) % self.ukuran
+        self._sejak_hitung_ulang += 1
+        if self._sejak_hitung_ulang >= INTERVAL_HITUNG_ULANG * self.ukuran:
+            isi = self.data[:self.n]
+            self._jumlah = float(isi.sum())
+            self._jumlah_kuadrat = float(np.dot(isi, isi))
+            self._sejak_hitung_ulang = 0
+
+    def rata2(self):
+        return self._jumlah / self.n if self.n else None
+
+    def varians(self):
+        if not self.n:
+            return None
+        rata2 = self._jumlah / self.n
+        return max(0.0, self._jumlah_kuadrat / self.n - rata2 * rata2)
+
+    def rms(self):
+        return math.sqrt(self._jumlah_kuadrat / self.n) if self.n else None
+
+class AnalitikPerangkat:
+    """Statistik bergulir dan status anomali satu perangkat."""
+
+    def __init__(self, nama, ukuran_jendela=UKURAN_JENDELA_DEFAULT):
+        self.nama = nama
+        self.jumlah_pembacaan = 0
+        self.tegangan = CincinStatistik(ukuran_jendela)
+        self.error_centroid = CincinStatistik(ukuran_jendela)
+        self.langkah_azimuth = CincinStatistik(ukuran_jendela)
+        self.langkah_elevasi = CincinStatistik(ukuran_jendela)
+        self.balik_arah = CincinStatistik(ukuran_jendela) # 1.0 jika langkah berbalik arah
+        self.anomali_aktif = set()
+        self._sudut_terakhir = None
+        self._arah_terakhir = (0.0, 0.0)
+        self._diam_beruntun = 0
+        self._puncak_tegangan_diam = None
+        self._placeholder_beruntun = 0
+
+    def _ubah_status(self, jenis, aktif, waktu, nilai, peringatan, format_pesan, *argumen):
+        # Pesan hanya diformat saat status berubah, bukan di setiap pembacaan
+        if aktif == (jenis in self.anomali_aktif):
+            return
+        if aktif:
+            self.anomali_aktif.add(jenis)
+            pesan = format_pesan.format(*argumen)
+        else:
+            self.anomali_aktif.discard(jenis)
+            pesan = "kembali normal"
+        peringatan.append({'perangkat': self.nama, 'jenis': jenis, 'status': 'aktif' if aktif else 'pulih',
+                           'waktu': waktu, 'pesan': pesan, 'nilai': nilai})
+
+    def proses(self, data, peringatan):
+        """
+        Memperbarui statistik dengan satu pembacaan (dict hasil dekode_pesan).
+
+        Args:
+            data (dict): Pembacaan kirimDataKePC.
+            peringatan (list): Peringatan baru ditambahkan ke list ini.
+        """
+        self.jumlah_pembacaan += 1
+        waktu = data.get('waktu') or time.time()
+        tegangan = data.get('tegangan_v')
+        x, y = data.get('koordinat_x'), data.get('koordinat_y')
+        azimuth, elevasi = data.get('rotasi_azimuth_deg'), data.get('rotasi_elevasi_deg')
+
+        if tegangan is not None and tegangan == tegangan: # bukan NaN
+            self.tegangan.tambah(tegangan)
+
+        # Error centroid hanya untuk cahaya yang terdeteksi
+        if x == NILAI_PLACEHOLDER and y == NILAI_PLACEHOLDER:
+            self._placeholder_beruntun += 1
+        elif x is not None and y is not None:
+            self._placeholder_beruntun = 0
+            dx, dy = x - TARGET_OPTIMAL_X, y - TARGET_OPTIMAL_Y
+            self.error_centroid.tambah(math.sqrt(dx * dx + dy * dy))
+        self._ubah_status('placeholder', self._placeholder_beruntun >= BATAS_PLACEHOLDER, waktu,
+                          self._placeholder_beruntun, peringatan,
+                          "cahaya tidak terdeteksi pada {} pembacaan beruntun", self._placeholder_beruntun)
+
+        if azimuth is None or elevasi is None:
+            return
+        if self._sudut_terakhir is not None:
+            d_az = azimuth - self._sudut_terakhir[0]
+            d_el = elevasi - self._sudut_terakhir[1]
+            self.langkah_azimuth.tambah(d_az)
+            self.langkah_elevasi.tambah(d_el)
+
+            # Berbalik arah: tanda langkah berlawanan dengan langkah bergerak sebelumnya
+            balik = (d_az * self._arah_terakhir[0] < 0) or (d_el * self._arah_terakhir[1] < 0)
+            self.balik_arah.tambah(1.0 if balik else 0.0)
+            self._arah_terakhir = (d_az if abs(d_az) >= AMBANG_SUDUT_DIAM else self._arah_terakhir[0],
+                                   d_el if abs(d_el) >= AMBANG_SUDUT_DIAM else self._arah_terakhir[1])
+            if self.balik_arah.n >= MIN_SAMPEL:
+                fraksi_balik = self.balik_arah.rata2()
+                self._ubah_status('osilasi', fraksi_balik >= AMBANG_BALIK_ARAH, waktu, fraksi_balik, peringatan,
+                                  "servo berbalik arah pada {:.0%} langkah terakhir", fraksi_balik)
+
+            # Tegangan turun saat sudut diam
+            if abs(d_az) < AMBANG_SUDUT_DIAM and abs(d_el) < AMBANG_SUDUT_DIAM:
+                self._diam_beruntun += 1
+            else:
+                self._diam_beruntun = 0
+                self._puncak_tegangan_diam = None
+        self._sudut_terakhir = (azimuth, elevasi)
+
+        if tegangan is None or tegangan != tegangan:
+            return
+        if self._diam_beruntun == 0:
+            self._ubah_status('tegangan_turun', False, waktu, tegangan, peringatan, None)
+            return
+        if self._puncak_tegangan_diam is None or tegangan > self._puncak_tegangan_diam:
+            self._puncak_tegangan_diam = tegangan
+        puncak = self._puncak_tegangan_diam
+        turun = puncak > 0 and tegangan < puncak * (1 - AMBANG_TURUN_RELATIF)
+        self._ubah_status('tegangan_turun', self._diam_beruntun >= MIN_DIAM and turun, waktu, tegangan, peringatan,
+                          "tegangan {:.2f} V turun dari {:.2f} V dengan sudut tetap ({:.1f}°, {:.1f}°)",
+                          tegangan, puncak, azimuth, elevasi)
+
+    def statistik(self):
+        varians = self.tegangan.varians()
+        jitter_az, jitter_el = self.langkah_azimuth.rms(), self.langkah_elevasi.rms()
+        return {
+            'jumlah_pembacaan': self.jumlah_pembacaan,
+            'tegangan_rata2': self.tegangan.rata2(),
+            'tegangan_std': math.sqrt(varians) if varians is not None else None,
+            'error_centroid_rata2': self.error_centroid.rata2(),
+            'jitter_azimuth_deg': jitter_az,
+            'jitter_elevasi_deg': jitter_el,
+            'anomali_aktif': sorted(self.anomali_aktif),
+        }
+
+class AnalitikTelemetri:
+    """
+    Analitik streaming untuk semua perangkat.
+
+    Contoh:
+        analitik = AnalitikTelemetri()
+        for p in analitik.proses('tracker01', daftar_data):  # dari on_message
+            print(p['pesan'])
+        analitik.statistik()  # {perangkat: {...}}
+    """
+
+    def __init__(self, ukuran_jendela=UKURAN_JENDELA_DEFAULT):
+        self.ukuran_jendela = ukuran_jendela
+        self.perangkat = {}
+
+    def proses(self, perangkat, daftar_data):
+        """
+        Returns:
+            list: Peringatan baru (dict perangkat, jenis, status, waktu, pesan, nilai).
+        """
+        analitik = self.perangkat.get(perangkat)
+        if analitik is None:
+            analitik = self.perangkat[perangkat] = AnalitikPerangkat(perangkat, self.ukuran_jendela)
+        peringatan = []
+        for data in daftar_data:
+            analitik.proses(data, peringatan)
+        return peringatan
+
+    def statistik(self):
+        return {nama: analitik.statistik() for nama, analitik in list(self.perangkat.items())}
+
+    def nilai(self, kunci):
+        """Satu statistik untuk semua perangkat ({perangkat: nilai}), untuk gauge metrik."""
+        return {nama: analitik.statistik()[kunci] for nama, analitik in list(self.perangkat.items())}
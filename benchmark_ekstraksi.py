@@ -0,0 +1,288 @@
+import cv2
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import tempfile
+import tracemalloc
+import numpy as np
+from ekstraksi_fitur_cahaya import ekstrak_fitur_area_terang
+from ekstraksi_batch_vektor import ekstrak_fitur_vektor
+
+# Skenario default: resolusi (lebar, tinggi) x level noise (std dev, skala 0-255)
+RESOLUSI_DEFAULT = [(160, 120), (640, 480), (1920, 1080)]
+NOISE_DEFAULT = [0.0, 8.0, 20.0]
+
+# Metrik yang diperiksa saat membandingkan dengan baseline:
+# (nama metrik, True jika nilai lebih besar = lebih baik)
+METRIK_REGRESI = [
+    ('gambar_per_detik', True),
+    ('latensi_p99_ms', False),
+    ('error_pusat_px_mean', False),
+    ('error_area_rel_mean', False),
+    ('tingkat_deteksi', True),
+]
+
+def buat_frame_sintetis(rng, lebar, tinggi, noise_std):
+    """
+    Membuat satu frame grayscale berisi satu area terang berbentuk lingkaran.
+
+    Ground truth dihitung langsung dari mask piksel lingkaran, jadi centroid
+    dan area-nya eksak pada resolusi frame.
+
+    Args:
+        rng (np.random.Generator): Sumber bilangan acak.
+        lebar (int): Lebar frame (piksel).
+        tinggi (int): Tinggi frame (piksel).
+        noise_std (float): Standar deviasi noise Gaussian.
+
+    Returns:
+        tuple: (frame uint8 (tinggi, lebar), dict ground truth dengan
+               pusat_x_norm, pusat_y_norm, area_norm)
+    """
+    sisi_min = min(lebar, tinggi)
+    radius = rng.uniform(0.03, 0.15) * sisi_min
+    cx = rng.uniform(radius, lebar - radius)
+    cy = rng.uniform(radius, tinggi - radius)
+
+    yy, xx = np.ogrid[:tinggi, :lebar]
+    mask = (xx - cx) ** 2 + (yy - cy) ** 2 <= radius ** 2
+
+    latar = rng.uniform(10, 60)
+    frame = np.full((tinggi, lebar), latar, dtype=np.float32)
+    frame[mask] = 255.0
+    if noise_std > 0:
+        frame += rng.normal(0.0, noise_std, size=frame.shape).astype(np.float32)
+    frame = np.clip(frame, 0, 255).astype(np.uint8)
+
+    ys, xs = np.nonzero(mask)
+    ground_truth = {
+        'pusat_x_norm': xs.mean() / lebar,
+        'pusat_y_norm': ys.mean() / tinggi,
+        'area_norm': len(xs) / (lebar * tinggi),
+    }
+    return frame, ground_truth
+
+def _jalankan_host(daftar_path, skala_decode):
+    hasil = []
+    latensi = []
+    for path_gambar in daftar_path:
+        waktu_mulai = time.perf_counter()
+        fitur = ekstrak_fitur_area_terang(path_gambar, skala_decode)
+        latensi.append(time.perf_counter() - waktu_mulai)
+        hasil.append(fitur)
+    return hasil, latensi
+
+def _jalankan_vektor(daftar_path, mode, ukuran_batch):
+    # Termasuk waktu decode agar sebanding dengan varian host.
+    # Latensi per gambar = waktu batch / jumlah gambar di batch.
+    hasil = []
+    latensi = []
+    for mulai in range(0, len(daftar_path), ukuran_batch):
+        potongan = daftar_path[mulai:mulai + ukuran_batch]
+        waktu_mulai = time.perf_counter()
+        batch = np.stack([cv2.imread(path, cv2.IMREAD_GRAYSCALE) for path in potongan])
+        kolom = ekstrak_fitur_vektor(batch, mode=mode)
+        durasi = time.perf_counter() - waktu_mulai
+        latensi.extend([durasi / len(potongan)] * len(potongan))
+        for i in range(len(potongan)):
+            hasil.append({nama: nilai[i] for nama, nilai in kolom.items()})
+    return hasil, latensi
+
+def daftar_varian(ukuran_batch):
+    """
+    Mengembalikan varian ekstraktor yang dibandingkan.
+
+    Returns:
+        dict: nama varian -> fungsi(daftar_path) -> (list fitur, list latensi detik)
+    """
+    return {
+        'host_penuh': lambda daftar_path: _jalankan_host(daftar_path, 1),
+        'host_skala_2': lambda daftar_path: _jalankan_host(daftar_path, 2),
+        'host_skala_4': lambda daftar_path: _jalankan_host(daftar_path, 4),
+        'host_skala_8': lambda daftar_path: _jalankan_host(daftar_path, 8),
+        'vektor_otsu_contour': lambda daftar_path: _jalankan_vektor(daftar_path, 'otsu_contour', ukuran_batch),
+        'vektor_firmware': lambda daftar_path: _jalankan_vektor(daftar_path, 'firmware', ukuran_batch),
+    }
+
+def _ringkas(nama_varian, lebar, tinggi, noise_std, hasil, latensi, ground_truth, memori_puncak):
+    latensi_ms = np.array(latensi) * 1000
+    error_pusat = []
+    error_area = []
+    jumlah_terdeteksi = 0
+    for fitur, gt in zip(hasil, ground_truth):
+        if not fitur or fitur['area_terang_ditemukan'] != 1:
+            continue
+        jumlah_terdeteksi += 1
+        dx = (fitur['pusat_x_norm'] - gt['pusat_x_norm']) * lebar
+        dy = (fitur['pusat_y_norm'] - gt['pusat_y_norm']) * tinggi
+        error_pusat.append(np.hypot(dx, dy))
+        error_area.append(abs(fitur['area_norm'] - gt['area_norm']) / gt['area_norm'])
+
+    def _stat(nilai, fungsi):
+        return float(fungsi(nilai)) if nilai else None
+
+    return {
+        'varian': nama_varian,
+        'resolusi': f"{lebar}x{tinggi}",
+        'noise_std': noise_std,
+        'jumlah_gambar': len(hasil),
+        'gambar_per_detik': float(len(hasil) / latensi_ms.sum() * 1000) if latensi_ms.sum() > 0 else None,
+        'latensi_p50_ms': float(np.percentile(latensi_ms, 50)),
+        'latensi_p99_ms': float(np.percentile(latensi_ms, 99)),
+        'memori_puncak_mb': memori_puncak / 1e6,
+        'tingkat_deteksi': jumlah_terdeteksi / len(hasil),
+        'error_pusat_px_mean': _stat(error_pusat, np.mean),
+        'error_pusat_px_p99': _stat(error_pusat, lambda v: np.percentile(v, 99)),
+        'error_area_rel_mean': _stat(error_area, np.mean),
+    }
+
+def jalankan_benchmark(daftar_resolusi, daftar_noise, jumlah_gambar, varian_dipilih=None,
+                       format_gambar='png', ukuran_batch=32, seed=0):
+    """
+    Menjalankan seluruh skenario benchmark.
+
+    Untuk setiap kombinasi resolusi x noise, frame sintetis ditulis ke folder
+    sementara lalu diekstrak oleh setiap varian.
+
+    Args:
+        daftar_resolusi (list): List (lebar, tinggi).
+        daftar_noise (list): List standar deviasi noise.
+        jumlah_gambar (int): Jumlah frame per skenario.
+        varian_dipilih (list): Nama varian yang dijalankan (None = semua).
+        format_gambar (str): 'png' (lossless) atau 'jpg'.
+        ukuran_batch (int): Ukuran batch untuk varian vektor.
+        seed (int): Seed agar frame sintetis sama antar versi.
+
+    Returns:
+        list: Satu dict hasil per (varian, resolusi, noise).
+    """
+    semua_varian = daftar_varian(ukuran_batch)
+    if varian_dipilih:
+        semua_varian = {nama: semua_varian[nama] for nama in varian_dipilih}
+
+    rng = np.random.default_rng(seed)
+    semua_hasil = []
+    with tempfile.TemporaryDirectory(prefix='benchmark_ekstraksi_') as folder_sementara:
+        for lebar, tinggi in daftar_resolusi:
+            for noise_std in daftar_noise:
+                daftar_path = []
+                ground_truth = []
+                for i in range(jumlah_gambar):
+                    frame, gt = buat_frame_sintetis(rng, lebar, tinggi, noise_std)
+                    path_gambar = os.path.join(folder_sementara, f"frame_{i:05d}.{format_gambar}")
+                    cv2.imwrite(path_gambar, frame)
+                    daftar_path.append(path_gambar)
+                    ground_truth.append(gt)
+
+                for nama_varian, jalankan in semua_varian.items():
+                    hasil, latensi = jalankan(daftar_path)
+                    # Memori diukur di pass terpisah (satu batch penuh sudah cukup untuk puncaknya),
+                    # karena tracemalloc memperlambat setiap alokasi dan mengacaukan waktu
+                    tracemalloc.start()
+                    jalankan(daftar_path[:max(1, ukuran_batch)])
+                    _, memori_puncak = tracemalloc.get_traced_memory()
+                    tracemalloc.stop()
+                    ringkasan = _ringkas(nama_varian, lebar, tinggi, noise_std, hasil, latensi,
+                                         ground_truth, memori_puncak)
+                    semua_hasil.append(ringkasan)
+                    gambar_per_detik = ringkasan['gambar_per_detik']
+                    teks_throughput = f"{gambar_per_detik:8.1f}" if gambar_per_detik is not None else f"{'-':>8}"
+                    print(f"  {nama_varian:<20} {lebar}x{tinggi} noise={noise_std:<5} "
+                          f"{teks_throughput} gambar/detik  "
+                          f"p99={ringkasan['latensi_p99_ms']:.2f} ms  "
+                          f"deteksi={ringkasan['tingkat_deteksi']:.2f}")
+    return semua_hasil
+
+def bandingkan_dengan_baseline(hasil_baru, hasil_baseline, toleransi):
+    """
+    Mencari regresi dibanding hasil benchmark sebelumnya.
+
+    Args:
+        hasil_baru (list): Hasil dari jalankan_benchmark().
+        hasil_baseline (list): Hasil benchmark lama (dari file JSON).
+        toleransi (float): Perubahan relatif yang masih diterima (0.2 = 20%).
+
+    Returns:
+        list: Pesan untuk setiap metrik yang memburuk melebihi toleransi.
+    """
+    def _kunci(baris):
+        return (baris['varian'], baris['resolusi'], baris['noise_std'])
+
+    baseline = {_kunci(baris): baris for baris in hasil_baseline}
+    regresi = []
+    for baris in hasil_baru:
+        lama = baseline.get(_kunci(baris))
+        if lama is None:
+            continue
+        for metrik, lebih_besar_lebih_baik in METRIK_REGRESI:
+            nilai_baru, nilai_lama = baris.get(metrik), lama.get(metrik)
+            if nilai_baru is None or nilai_lama is None:
+                continue
+            if lebih_besar_lebih_baik:
+                memburuk = nilai_baru < nilai_lama * (1 - toleransi)
+            else:
+                # Toleransi absolut kecil agar nilai mendekati nol tidak memicu alarm palsu
+                memburuk = nilai_baru > nilai_lama * (1 + toleransi) + 1e-6
+            if memburuk:
+                regresi.append(f"{'/'.join(str(k) for k in _kunci(baris))}: {metrik} "
+                               f"{nilai_lama:.4g} -> {nilai_baru:.4g}")
+    return regresi
+
+# --- Program Utama ---
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark throughput dan akurasi ekstraksi fitur area terang.")
+    parser.add_argument('--jumlah', type=int, default=50, help="Jumlah frame sintetis per skenario.")
+    parser.add_argument('--resolusi', nargs='+', default=[f"{w}x{h}" for w, h in RESOLUSI_DEFAULT],
+                        help="Daftar resolusi LEBARxTINGGI.")
+    parser.add_argument('--noise', nargs='+', type=float, default=NOISE_DEFAULT,
+                        help="Daftar standar deviasi noise.")
+    parser.add_argument('--varian', nargs='+', default=None,
+                        help=f"Varian yang dijalankan (default semua): {list(daftar_varian(1))}")
+    parser.add_argument('--format', choices=['png', 'jpg'], default='png', help="Format file frame sintetis.")
+    parser.add_argument('--batch', type=int, default=32, help="Ukuran batch varian vektor.")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', default="hasil_benchmark_ekstraksi.json", help="File JSON hasil benchmark.")
+    parser.add_argument('--bandingkan', default=None, help="File JSON baseline untuk deteksi regresi.")
+    parser.add_argument('--toleransi', type=float, default=0.2,
+                        help="Perubahan relatif yang masih diterima saat membandingkan (default 0.2).")
+    args = parser.parse_args()
+
+    daftar_resolusi = [tuple(int(v) for v in res.lower().split('x')) for res in args.resolusi]
+    print("Menjalankan benchmark ekstraksi...")
+    hasil = jalankan_benchmark(daftar_resolusi, args.noise, args.jumlah, args.varian,
+                               args.format, args.batch, args.seed)
+
+    laporan = {
+        'meta': {
+            'waktu': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python': platform.python_version(),
+            'opencv': cv2.__version__,
+            'numpy': np.__version__,
+            'platform': platform.platform(),
+            'jumlah_cpu': os.cpu_count(),
+            'jumlah_gambar': args.jumlah,
+            'format': args.format,
+            'seed': args.seed,
+            'catatan_memori': "memori_puncak_mb dari tracemalloc (alokasi Python/NumPy, "
+                              "tidak termasuk buffer internal OpenCV), diukur di pass terpisah "
+                              "dari pengukuran waktu",
+        },
+        'hasil': hasil,
+    }
+    with open(args.output, 'w') as f:
+        json.dump(laporan, f, indent=2)
+    print(f"\nHasil benchmark disimpan ke: {args.output}")
+
+    if args.bandingkan:
+        with open(args.bandingkan) as f:
+            baseline = json.load(f)
+        regresi = bandingkan_dengan_baseline(hasil, baseline['hasil'], args.toleransi)
+        if regresi:
+            print(f"\nREGRESI terdeteksi dibanding {args.bandingkan}:")
+            for pesan in regresi:
+                print(f"  - {pesan}")
+            sys.exit(1)
+        print(f"\nTidak ada regresi dibanding {args.bandingkan} (toleransi {args.toleransi:.0%}).")
@@ -0,0 +1,256 @@
+import asyncio
+import argparse
+import threading
+
+# Broker MQTT 3.1.1 minimal (asyncio) untuk pengujian lokal tanpa Mosquitto.
+#
+# Didukung: CONNECT/CONNACK (tanpa autentikasi), PUBLISH QoS 0/1/2 dari client,
+# SUBSCRIBE/UNSUBSCRIBE dengan wildcard '+' dan '#', pesan retained, PINGREQ,
+# DISCONNECT. Pesan diteruskan ke subscriber dengan QoS min(publish, subscribe),
+# maksimal 1. Tidak ada sesi persisten, will message, atau pengiriman ulang ke
+# subscriber; cukup untuk uji beban mqtt_bridge.py -> mqtt_sub.py di satu mesin.
+#
+# Contoh:
+#   python broker_mini.py --port 1883
+# atau di dalam proses (lihat uji_beban_pipeline.py):
+#   broker = BrokerMini(port=0); broker.mulai(); ... broker.hentikan()
+
+CONNECT, CONNACK, PUBLISH, PUBACK, PUBREC, PUBREL, PUBCOMP = 1, 2, 3, 4, 5, 6, 7
+SUBSCRIBE, SUBACK, UNSUBSCRIBE, UNSUBACK, PINGREQ, PINGRESP, DISCONNECT = 8, 9, 10, 11, 12, 13, 14
+BATAS_BUFFER_KIRIM = 1 << 20 # Byte tertunda ke satu subscriber sebelum pengirim ditahan
+
+def cocok_topik(filter_topik, topik):
+    """True jika `topik` cocok dengan filter langganan (wildcard '+' dan '#')."""
+    bagian_filter = filter_topik.split('/')
+    bagian_topik = topik.split('/')
+    for i, bagian in enumerate(bagian_filter):
+        if bagian == '#':
+            return True
+        if i >= len(bagian_topik):
+            return False
+        if bagian != '+' and bagian != bagian_topik[i]:
+            return False
+    return len(bagian_filter) == len(bagian_topik)
+
+def _panjang_sisa(n):
+    hasil = bytearray()
+    while True:
+        byte, n = n % 128, n // 128
+        hasil.append(byte | (0x80 if n else 0))
+        if not n:
+            return bytes(hasil)
+
+def _paket(jenis, flag, isi):
+    return bytes([(jenis << 4) | flag]) + _panjang_sisa(len(isi)) + isi
+
+def _string(teks):
+    data = teks.encode('utf-8')
+    return len(data).to_bytes(2, 'big') + data
+
+class _Sesi:
+    def __init__(self, writer):
+        self.writer = writer
+        self.client_id = None
+        self.langganan = {} # filter -> qos
+        self._packet_id = 0
+
+    def packet_id_berikut(self):
+        self._packet_id = self._packet_id % 0xFFFF + 1
+        return self._packet_id
+
+    def kirim_publish(self, topik, payload, qos, retain=False):
+        if self.writer.is_closing():
+            return
+        isi = _string(topik)
+        if qos:
+            isi += self.packet_id_berikut().to_bytes(2, 'big')
+        self.writer.write(_paket(PUBLISH, (qos << 1) | int(retain), isi + payload))
+
+class BrokerMini:
+    """
+    Broker MQTT 3.1.1 minimal yang berjalan di thread latar.
+
+    Args:
+        host (str): Alamat bind.
+        port (int): Port (0 = pilih port bebas; lihat atribut `port` setelah mulai()).
+    """
+
+    def __init__(self, host='127.0.0.1', port=1883):
+        self.host = host
+        self.port = port
+        self.jumlah_publish = 0      # PUBLISH diterima dari client
+        self.jumlah_diteruskan = 0   # PUBLISH dikirim ke subscriber
+        self.byte_diterima = 0
+        self._sesi = set()
+        self._retained = {}
+        self._loop = None
+        self._server = None
+        self._thread = None
+
+    # --- Siklus hidup ---
+
+    def mulai(self):
+        """Menjalankan broker di thread latar; kembali setelah port siap menerima koneksi."""
+        siap = threading.Event()
+
+        def jalankan():
+            self._loop = asyncio.new_event_loop()
+            self._server = self._loop.run_until_complete(
+                asyncio.start_server(self._layani, self.host, self.port))
+            self.port = self._server.sockets[0].getsockname()[1]
+            siap.set()
+            self._loop.run_forever()
+            self._loop.close()
+
+        self._thread = threading.Thread(target=jalankan, name="broker_mini", daemon=True)
+        self._thread.start()
+        siap.wait()
+        return self.port
+
+    def hentikan(self):
+        """Menutup server dan semua koneksi client (mensimulasikan broker mati)."""
+        if self._loop is None:
+            return
+
+        async def tutup():
+            self._server.close()
+            for sesi in list(self._sesi):
+                sesi.writer.close()
+            await self._server.wait_closed()
+
+        asyncio.run_coroutine_threadsafe(tutup(), self._loop).result(timeout=10)
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop = None
+        self._sesi.clear()
+
+    # --- Protokol ---
+
+    async def _baca_paket(self, reader):
+        header = await reader.readexactly(1)
+        panjang, pengali = 0, 1
+        while True:
+            byte = (await reader.readexactly(1))[0]
+            panjang += (byte & 0x7F) * pengali
+            if not byte & 0x80:
+                break
+            pengali *= 128
+        isi = await reader.readexactly(panjang) if panjang else b''
+        self.byte_diterima += 2 + panjang
+        return header[0] >> 4, header[0] & 0x0F, isi
+
+    async def _layani(self, reader, writer):
+        sesi = _Sesi(writer)
+        self._sesi.add(sesi)
+        try:
+            while True:
+                jenis, flag, isi = await self._baca_paket(reader)
+                if jenis == CONNECT:
+                    self._connect(sesi, isi)
+                elif jenis == PUBLISH:
+                    for penerima in self._publish(sesi, flag, isi):
+                        if penerima.writer.transport.get_write_buffer_size() > BATAS_BUFFER_KIRIM:
+                            await self._tahan(penerima) # Subscriber lambat: tahan pengirim (backpressure)
+                elif jenis == PUBREL:
+                    writer.write(_paket(PUBCOMP, 0, isi[:2]))
+                elif jenis == SUBSCRIBE:
+                    self._subscribe(sesi, isi)
+                elif jenis == UNSUBSCRIBE:
+                    self._unsubscribe(sesi, isi)
+                elif jenis == PINGREQ:
+                    writer.write(_paket(PINGRESP, 0, b''))
+                elif jenis == DISCONNECT:
+                    break
+                # PUBACK/PUBREC/PUBCOMP dari subscriber diabaikan (tanpa kirim ulang)
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            self._sesi.discard(sesi)
+            writer.close()
+
+    async def _tahan(self, sesi):
+        try:
+            await sesi.writer.drain()
+        except ConnectionError:
+            pass
+
+    def _connect(self, sesi, isi):
+        panjang_nama = int.from_bytes(isi[0:2], 'big')
+        posisi = 2 + panjang_nama + 4 # nama protokol, level, flag, keep alive
+        panjang_id = int.from_bytes(isi[posisi:posisi + 2], 'big')
+        sesi.client_id = isi[posisi + 2:posisi + 2 + panjang_id].decode('utf-8', errors='replace')
+        # Client id yang sama menggantikan koneksi lama, seperti broker sungguhan
+        for lama in list(self._sesi):
+            if lama is not sesi and lama.client_id == sesi.client_id:
+                lama.writer.close()
+                self._sesi.discard(lama)
+        sesi.writer.write(_paket(CONNACK, 0, b'\x00\x00'))
+
+    def _publish(self, sesi, flag, isi):
+        qos = (flag >> 1) & 0x03
+        retain = bool(flag & 0x01)
+        panjang_topik = int.from_bytes(isi[0:2], 'big')
+        topik = isi[2:2 + panjang_topik].decode('utf-8')
+        posisi = 2 + panjang_topik
+        if qos:
+            packet_id = isi[posisi:posisi + 2]
+            posisi += 2
+            sesi.writer.write(_paket(PUBACK if qos == 1 else PUBREC, 0, packet_id))
+        payload = isi[posisi:]
+        self.jumlah_publish += 1
+        if retain:
+            if payload:
+                self._retained[topik] = (payload, qos)
+            else:
+                self._retained.pop(topik, None)
+        daftar_penerima = []
+        for penerima in self._sesi:
+            qos_maks = max((q for f, q in penerima.langganan.items() if cocok_topik(f, topik)), default=None)
+            if qos_maks is not None:
+                penerima.kirim_publish(topik, payload, min(qos, qos_maks, 1))
+                daftar_penerima.append(penerima)
+        self.jumlah_diteruskan += len(daftar_penerima)
+        return daftar_penerima
+
+    def _subscribe(self, sesi, isi):
+        packet_id, posisi, hasil = isi[0:2], 2, bytearray()
+        filter_baru = []
+        while posisi < len(isi):
+            panjang = int.from_bytes(isi[posisi:posisi + 2], 'big')
+            filter_topik = isi[posisi + 2:posisi + 2 + panjang].decode('utf-8')
+            qos = min(isi[posisi + 2 + panjang] & 0x03, 1)
+            posisi += 3 + panjang
+            sesi.langganan[filter_topik] = qos
+            filter_baru.append((filter_topik, qos))
+            hasil.append(qos)
+        sesi.writer.write(_paket(SUBACK, 0, packet_id + bytes(hasil)))
+        for topik, (payload, qos_retain) in self._retained.items():
+            for filter_topik, qos in filter_baru:
+                if cocok_topik(filter_topik, topik):
+                    sesi.kirim_publish(topik, payload, min(qos, qos_retain), retain=True)
+                    break
+
+    def _unsubscribe(self, sesi, isi):
+        packet_id, posisi = isi[0:2], 2
+        while posisi < len(isi):
+            panjang = int.from_bytes(isi[posisi:posisi + 2], 'big')
+            sesi.langganan.pop(isi[posisi + 2:posisi + 2 + panjang].decode('utf-8'), None)
+            posisi += 2 + panjang
+        sesi.writer.write(_paket(UNSUBACK, 0, packet_id))
+
+# --- Program Utama ---
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Broker MQTT 3.1.1 minimal untuk pengujian lokal.")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=1883)
+    args = parser.parse_args()
+
+    broker = BrokerMini(args.host, args.port)
+    port = broker.mulai()
+    print(f"Broker mini berjalan di {args.host}:{port} (Ctrl+C untuk berhenti)")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        print(f"\nBroker dihentikan. {broker.jumlah_publish} publish diterima, "
+              f"{broker.jumlah_diteruskan} diteruskan.")
+        broker.hentikan()
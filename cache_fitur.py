@@ -0,0 +1,152 @@
+import os
+import json
+import sqlite3
+
+# Cache fitur hasil ekstraksi, disimpan di SQLite.
+# Setiap gambar dikunci dengan path absolut + ukuran file + waktu modifikasi (mtime)
+# + skala decode, sehingga run berikutnya hanya perlu memproses gambar yang baru,
+# berubah, atau diekstrak dengan skala decode yang berbeda. Gambar yang gagal dibaca
+# (area_terang_ditemukan = -1) tidak disimpan, sehingga dicoba lagi di run berikutnya.
+
+def buka_cache(path_cache):
+    """
+    Membuka (atau membuat) database cache fitur.
+
+    Args:
+        path_cache (str): Path ke file SQLite cache.
+
+    Returns:
+        sqlite3.Connection: Koneksi ke database cache.
+    """
+    conn = sqlite3.connect(path_cache)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS fitur (
+            path TEXT PRIMARY KEY,
+            folder TEXT NOT NULL,
+            ukuran INTEGER NOT NULL,
+            mtime_ns INTEGER NOT NULL,
+            skala_decode INTEGER NOT NULL DEFAULT 1,
+            fitur_json TEXT NOT NULL
+        )
+    """)
+    kolom_ada = {baris[1] for baris in conn.execute("PRAGMA table_info(fitur)")}
+    if 'skala_decode' not in kolom_ada:
+        # Cache lama (sebelum ada opsi skala decode) selalu resolusi penuh
+        conn.execute("ALTER TABLE fitur ADD COLUMN skala_decode INTEGER NOT NULL DEFAULT 1")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_fitur_folder ON fitur(folder)")
+    conn.commit()
+    return conn
+
+def _stat_file(path_gambar):
+    st = os.stat(path_gambar)
+    return st.st_size, st.st_mtime_ns
+
+def periksa_perubahan(conn, folder_input_gambar, daftar_path_gambar, skala_decode=1):
+    """
+    Membandingkan isi folder saat ini dengan isi cache.
+
+    Args:
+        conn (sqlite3.Connection): Koneksi cache dari buka_cache().
+        folder_input_gambar (str): Folder yang sedang diproses.
+        daftar_path_gambar (list): Daftar path gambar yang ada di folder saat ini.
+        skala_decode (int): Skala decode yang akan dipakai untuk ekstraksi.
+
+    Returns:
+        tuple: (path_perlu_diproses, path_dihapus, info_stat)
+               - path_perlu_diproses: gambar baru atau berubah (ukuran/mtime/skala beda)
+               - path_dihapus: path di cache yang sudah tidak ada di folder
+               - info_stat: dict path -> (ukuran, mtime_ns) untuk disimpan ke cache
+    """
+    folder_abs = os.path.abspath(folder_input_gambar)
+    tersimpan = {
+        path: (ukuran, mtime_ns, skala)
+        for path, ukuran, mtime_ns, skala in conn.execute(
+            "SELECT path, ukuran, mtime_ns, skala_decode FROM fitur WHERE folder = ?", (folder_abs,))
+    }
+
+    path_perlu_diproses = []
+    info_stat = {}
+    path_sekarang = set()
+    for path_gambar in daftar_path_gambar:
+        path_abs = os.path.abspath(path_gambar)
+        path_sekarang.add(path_abs)
+        try:
+            info_stat[path_gambar] = _stat_file(path_gambar)
+        except OSError:
+            info_stat[path_gambar] = (-1, -1)
+        if tersimpan.get(path_abs) != info_stat[path_gambar] + (skala_decode,):
+            path_perlu_diproses.append(path_gambar)
+
+    path_dihapus = [path for path in tersimpan if path not in path_sekarang]
+    return path_perlu_diproses, path_dihapus, info_stat
+
+def simpan_ke_cache(conn, daftar_path_gambar, daftar_fitur, info_stat, skala_decode=1):
+    """
+    Menyimpan (insert/update) hasil ekstraksi ke cache dalam satu transaksi.
+    Hasil gagal baca tidak disimpan dan entri lamanya dihapus.
+
+    Args:
+        conn (sqlite3.Connection): Koneksi cache.
+        daftar_path_gambar (list): Path gambar yang baru diproses.
+        daftar_fitur (list): Dict fitur, urutannya sama dengan daftar_path_gambar.
+        info_stat (dict): path -> (ukuran, mtime_ns) dari periksa_perubahan().
+        skala_decode (int): Skala decode yang dipakai saat ekstraksi.
+    """
+    baris = []
+    path_gagal = []
+    for path_gambar, fitur in zip(daftar_path_gambar, daftar_fitur):
+        path_abs = os.path.abspath(path_gambar)
+        if fitur['area_terang_ditemukan'] == -1:
+            path_gagal.append((path_abs,))
+            continue
+        ukuran, mtime_ns = info_stat[path_gambar]
+        baris.append((path_abs, os.path.dirname(path_abs), ukuran, mtime_ns, skala_decode,
+                      json.dumps(fitur)))
+    with conn:
+        conn.executemany(
+            "INSERT OR REPLACE INTO fitur (path, folder, ukuran, mtime_ns, skala_decode, fitur_json) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            baris)
+        conn.executemany("DELETE FROM fitur WHERE path = ?", path_gagal)
+
+def hapus_dari_cache(conn, daftar_path_abs):
+    """
+    Menghapus entri cache untuk gambar yang sudah tidak ada di folder.
+
+    Args:
+        conn (sqlite3.Connection): Koneksi cache.
+        daftar_path_abs (list): Path absolut yang akan dihapus.
+    """
+    with conn:
+        conn.executemany("DELETE FROM fitur WHERE path = ?", [(path,) for path in daftar_path_abs])
+
+def ambil_fitur(conn, daftar_path_gambar, fitur_tidak_tersimpan=None):
+    """
+    Mengambil fitur dari cache sesuai urutan daftar_path_gambar.
+
+    Args:
+        conn (sqlite3.Connection): Koneksi cache.
+        daftar_path_gambar (list): Daftar path gambar.
+        fitur_tidak_tersimpan (dict): path -> fitur untuk gambar yang sengaja tidak
+                                      disimpan di cache (gagal baca di run ini).
+
+    Returns:
+        list: List of dict fitur (gambar yang tidak ada di cache dilewati).
+    """
+    fitur_tidak_tersimpan = fitur_tidak_tersimpan or {}
+    folder_abs = {os.path.dirname(os.path.abspath(path)) for path in daftar_path_gambar}
+    semua = {}
+    for folder in folder_abs:
+        for path, fitur_json in conn.execute(
+                "SELECT path, fitur_json FROM fitur WHERE folder = ?", (folder,)):
+            semua[path] = fitur_json
+    hasil = []
+    for path_gambar in daftar_path_gambar:
+        fitur_json = semua.get(os.path.abspath(path_gambar))
+        if fitur_json is not None:
+            hasil.append(json.loads(fitur_json))
+        elif path_gambar in fitur_tidak_tersimpan:
+            hasil.append(fitur_tidak_tersimpan[path_gambar])
+    return hasil
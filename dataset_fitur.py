@@ -0,0 +1,375 @@
+import os
+import sys
+import json
+import argparse
+import posixpath
+import numpy as np
+import pandas as pd
+
+# Format dataset biner kolumnar bersama untuk ekstraksi dan pelatihan.
+#
+# Struktur file:
+#   [header 512 byte]  magic 'FITUR\0' + JSON skema (versi, daftar kolom + dtype), di-pad spasi
+#   [record ...]       array NumPy terstruktur (little-endian) dengan dtype sesuai skema
+#
+# Record hanya ditambahkan di akhir file (append-only), sehingga ekstraksi bisa
+# menulis baris baru tanpa membaca/menulis ulang seluruh file. Pembacaan memakai
+# np.memmap, jadi hampir tidak ada biaya parsing seperti pada CSV/Excel.
+#
+# Kolom nama_file berisi path gambar relatif terhadap folder file dataset
+# (pemisah '/', lihat kunci_file), sehingga gambar bernama sama di folder
+# berbeda tidak saling menimpa. Dataset lama yang masih berisi nama file saja
+# dimigrasikan otomatis oleh sinkronkan_folder. Kunci yang lebih panjang dari
+# kolom nama_file (128 byte UTF-8) ditolak dengan ValueError, bukan dipotong.
+
+MAGIC = b'FITUR\0'
+UKURAN_HEADER = 512
+VERSI_FORMAT = 1
+
+SKEMA = [
+    ('nama_file', 'S128'),
+    ('area_norm', '<f8'),
+    ('pusat_x_norm', '<f8'),
+    ('pusat_y_norm', '<f8'),
+    ('bbox_x_norm', '<f8'),
+    ('bbox_y_norm', '<f8'),
+    ('bbox_w_norm', '<f8'),
+    ('bbox_h_norm', '<f8'),
+    ('area_terang_ditemukan', '<i1'),
+    ('Tegangan', '<f8'),  # Target pelatihan; NaN jika belum diberi label
+]
+DTYPE = np.dtype(SKEMA)
+
+def _buat_header():
+    skema_json = json.dumps({'versi': VERSI_FORMAT, 'kolom': SKEMA}).encode('utf-8')
+    header = MAGIC + skema_json
+    if len(header) > UKURAN_HEADER:
+        raise ValueError("Skema terlalu besar untuk header dataset.")
+    return header.ljust(UKURAN_HEADER, b' ')
+
+def _baca_skema(path_dataset):
+    with open(path_dataset, 'rb') as f:
+        header = f.read(UKURAN_HEADER)
+    if not header.startswith(MAGIC) or len(header) < UKURAN_HEADER:
+        raise ValueError(f"'{path_dataset}' bukan file dataset fitur yang valid.")
+    skema = json.loads(header[len(MAGIC):].decode('utf-8'))
+    if skema['versi'] != VERSI_FORMAT:
+        raise ValueError(f"Versi format dataset {skema['versi']} tidak didukung (diharapkan {VERSI_FORMAT}).")
+    dtype = np.dtype([tuple(kolom) for kolom in skema['kolom']])
+    if dtype != DTYPE:
+        raise ValueError(f"Skema dataset '{path_dataset}' tidak sesuai dengan skema saat ini.")
+    return dtype
+
+def _jumlah_record_utuh(path_dataset):
+    return (os.path.getsize(path_dataset) - UKURAN_HEADER) // DTYPE.itemsize
+
+def buka_record(path_dataset, mode='r'):
+    """
+    Membuka record dataset sebagai memmap (tanpa menyalin data ke memori).
+
+    Args:
+        path_dataset (str): Path file dataset.
+        mode (str): 'r' untuk baca saja, 'r+' untuk mengubah nilai di tempat.
+
+    Returns:
+        np.ndarray: Array terstruktur (memmap) berisi semua record.
+    """
+    _baca_skema(path_dataset)
+    jumlah = _jumlah_record_utuh(path_dataset)
+    if jumlah == 0:
+        return np.empty(0, dtype=DTYPE)
+    return np.memmap(path_dataset, dtype=DTYPE, mode=mode, offset=UKURAN_HEADER, shape=(jumlah,))
+
+def _enkode_kunci(nama_file):
+    # Dipotong diam-diam, kunci berbeda bisa menjadi sama (dan UTF-8 terpotong di tengah karakter)
+    kunci = str(nama_file).encode('utf-8')
+    if len(kunci) > DTYPE['nama_file'].itemsize:
+        raise ValueError(f"Path '{nama_file}' terlalu panjang untuk kolom nama_file "
+                         f"({len(kunci)} > {DTYPE['nama_file'].itemsize} byte UTF-8); "
+                         f"pindahkan gambar atau dataset agar path relatifnya lebih pendek.")
+    return kunci
+
+def _ke_record(daftar_fitur):
+    record = np.zeros(len(daftar_fitur), dtype=DTYPE)
+    record['Tegangan'] = np.nan
+    for nama, _ in SKEMA:
+        if nama == 'nama_file':
+            record[nama] = [_enkode_kunci(fitur[nama]) for fitur in daftar_fitur]
+        else:
+            nilai = [fitur.get(nama, np.nan if nama == 'Tegangan' else 0) for fitur in daftar_fitur]
+            record[nama] = nilai
+    return record
+
+def kunci_file(path_gambar, path_dataset):
+    """
+    Kunci baris dataset untuk sebuah gambar: path relatif terhadap folder dataset.
+
+    Args:
+        path_gambar (str): Path file gambar (atau folder).
+        path_dataset (str): Path file dataset.
+
+    Returns:
+        str: Path relatif dengan pemisah '/' ('' untuk folder dataset itu sendiri).
+    """
+    path_abs = os.path.abspath(path_gambar)
+    try:
+        kunci = os.path.relpath(path_abs, os.path.dirname(os.path.abspath(path_dataset)))
+    except ValueError:
+        kunci = path_abs # Beda drive (Windows): pakai path absolut
+    kunci = kunci.replace(os.sep, '/')
+    return '' if kunci == '.' else kunci
+
+def _tulis_ulang(path_dataset, record):
+    path_sementara = path_dataset + '.tmp'
+    with open(path_sementara, 'wb') as f:
+        f.write(_buat_header())
+        f.write(record.tobytes())
+    os.replace(path_sementara, path_dataset)
+
+def tambah_baris(path_dataset, daftar_fitur):
+    """
+    Menambahkan baris fitur di akhir dataset (membuat file jika belum ada).
+
+    Label 'Tegangan' yang sudah ada untuk nama_file yang sama dibawa ke baris
+    baru jika baris baru belum memiliki label, sehingga ekstraksi ulang sebuah
+    gambar tidak menghapus labelnya.
+
+    Args:
+        path_dataset (str): Path file dataset.
+        daftar_fitur (list): List of dict fitur (kunci sesuai SKEMA).
+
+    Returns:
+        int: Jumlah baris yang ditambahkan.
+    """
+    if not daftar_fitur:
+        return 0
+    record_baru = _ke_record(daftar_fitur)
+
+    if os.path.exists(path_dataset):
+        record_lama = buka_record(path_dataset)
+        if len(record_lama):
+            label_lama = {
+                nama: tegangan
+                for nama, tegangan in zip(record_lama['nama_file'], record_lama['Tegangan'])
+                if not np.isnan(tegangan)
+            }
+            tanpa_label = np.isnan(record_baru['Tegangan'])
+            for i in np.nonzero(tanpa_label)[0]:
+                record_baru['Tegangan'][i] = label_lama.get(record_baru['nama_file'][i], np.nan)
+        del record_lama
+    _tambah_record(path_dataset, record_baru)
+    return len(record_baru)
+
+def _tambah_record(path_dataset, record_baru):
+    if not os.path.exists(path_dataset):
+        with open(path_dataset, 'wb') as f:
+            f.write(_buat_header())
+    with open(path_dataset, 'r+b') as f:
+        # Buang record terakhir yang tidak utuh (mis. proses terhenti saat menulis)
+        ukuran_utuh = UKURAN_HEADER + _jumlah_record_utuh(path_dataset) * DTYPE.itemsize
+        f.truncate(ukuran_utuh)
+        f.seek(ukuran_utuh)
+        f.write(record_baru.tobytes())
+
+def sinkronkan_folder(path_dataset, folder, daftar_fitur, tulis_ulang=False):
+    """
+    Menyamakan baris dataset milik satu folder gambar dengan hasil ekstraksi terbaru.
+
+    Hanya gambar baru atau yang fiturnya berubah yang ditambahkan di akhir file.
+    Baris gambar yang sudah tidak ada di folder (dan baris lama berkunci nama file
+    saja dari format sebelumnya) dihapus; dalam hal itu, atau jika tulis_ulang=True,
+    file ditulis ulang tanpa baris lama yang sudah digantikan. Label 'Tegangan'
+    lama dibawa ke baris baru. Gambar yang gagal dibaca (-1) tidak ditulis.
+
+    Args:
+        path_dataset (str): Path file dataset.
+        folder (str): Folder gambar yang baru diekstrak.
+        daftar_fitur (list): Dict fitur semua gambar di folder, 'nama_file' berisi kunci_file().
+        tulis_ulang (bool): Tulis ulang file meskipun tidak ada baris yang dihapus.
+
+    Returns:
+        tuple: (jumlah baris ditambahkan/diganti, jumlah baris dihapus)
+    """
+    kunci_folder = kunci_file(folder, path_dataset)
+    kunci_sekarang = {_enkode_kunci(fitur['nama_file']) for fitur in daftar_fitur}
+    record_baru = _ke_record([fitur for fitur in daftar_fitur if fitur['area_terang_ditemukan'] != -1])
+    if os.path.exists(path_dataset):
+        record_lama = np.array(buka_record(path_dataset))
+    else:
+        record_lama = np.empty(0, dtype=DTYPE)
+
+    terakhir = {} # kunci -> indeks baris terakhir
+    label_lama = {}
+    for i, (kunci, tegangan) in enumerate(zip(record_lama['nama_file'], record_lama['Tegangan'])):
+        terakhir[kunci] = i
+        if not np.isnan(tegangan):
+            label_lama[kunci] = tegangan
+
+    nama_sekarang = {posixpath.basename(kunci) for kunci in kunci_sekarang}
+    dihapus = set()
+    for kunci in terakhir:
+        if kunci in kunci_sekarang:
+            continue
+        teks = kunci.decode('utf-8', errors='replace')
+        if posixpath.dirname(teks) == kunci_folder:
+            dihapus.add(kunci) # Gambar sudah tidak ada di folder
+        elif '/' not in teks and kunci in nama_sekarang:
+            dihapus.add(kunci) # Kunci format lama (nama file saja), digantikan path relatif
+
+    # Label dibawa dari kunci yang sama, atau dari kunci format lama yang digantikan
+    for i in np.nonzero(np.isnan(record_baru['Tegangan']))[0]:
+        kunci = record_baru['nama_file'][i]
+        nama = posixpath.basename(kunci)
+        record_baru['Tegangan'][i] = label_lama.get(kunci, label_lama.get(nama, np.nan) if nama in dihapus
+                                                    else np.nan)
+
+    # Baris yang fiturnya sama persis dengan baris terakhir untuk kunci itu tidak perlu ditulis
+    indeks_lama = np.array([terakhir.get(kunci, -1) for kunci in record_baru['nama_file']], dtype=np.intp)
+    sama = indeks_lama >= 0
+    for nama, _ in SKEMA:
+        if nama not in ('nama_file', 'Tegangan'):
+            sama[sama] &= record_lama[nama][indeks_lama[sama]] == record_baru[nama][sama]
+    berubah = record_baru[~sama]
+
+    if tulis_ulang or dihapus:
+        diganti = set(record_baru['nama_file']) if tulis_ulang else set(berubah['nama_file'])
+        indeks_tetap = sorted(i for kunci, i in terakhir.items() if kunci not in dihapus and kunci not in diganti)
+        ditulis = record_baru if tulis_ulang else berubah
+        _tulis_ulang(path_dataset, np.concatenate([record_lama[indeks_tetap], ditulis]))
+        return len(berubah), len(dihapus)
+    if len(berubah):
+        _tambah_record(path_dataset, berubah)
+    return len(berubah), 0
+
+def muat_dataset(path_dataset, unik=True):
+    """
+    Memuat dataset sebagai DataFrame.
+
+    Args:
+        path_dataset (str): Path file dataset.
+        unik (bool): Jika True, hanya baris terakhir per nama_file yang dipakai
+                     (baris lama dari ekstraksi sebelumnya diabaikan).
+
+    Returns:
+        pd.DataFrame: Kolom sesuai SKEMA.
+    """
+    record = buka_record(path_dataset)
+    df = pd.DataFrame({nama: np.asarray(record[nama]) for nama, _ in SKEMA})
+    df['nama_file'] = df['nama_file'].str.decode('utf-8')
+    if unik:
+        df = df.drop_duplicates(subset='nama_file', keep='last').reset_index(drop=True)
+    return df
+
+def isi_tegangan(path_dataset, tegangan_per_file):
+    """
+    Mengisi label 'Tegangan' di tempat untuk baris dengan nama_file tertentu.
+
+    Kunci label dicocokkan persis dengan kolom nama_file (path relatif). Label
+    yang hanya berisi nama file dicocokkan ke nama file baris, asalkan nama itu
+    hanya dimiliki satu gambar di dataset.
+
+    Args:
+        path_dataset (str): Path file dataset.
+        tegangan_per_file (dict): nama_file atau path relatif -> tegangan (Volt).
+
+    Returns:
+        int: Jumlah baris yang diperbarui.
+    """
+    record = buka_record(path_dataset, mode='r+')
+    if len(record) == 0:
+        return 0
+    label = {str(nama).encode('utf-8'): float(nilai) for nama, nilai in tegangan_per_file.items()}
+    nama_file = np.asarray(record['nama_file'])
+    pemilik_nama = {}
+    for kunci in set(nama_file.tolist()):
+        pemilik_nama.setdefault(posixpath.basename(kunci), []).append(kunci)
+    for nama, nilai in list(label.items()):
+        pemilik = pemilik_nama.get(nama, [])
+        if b'/' not in nama and nama not in pemilik and len(pemilik) == 1:
+            label[pemilik[0]] = nilai
+    cocok = np.isin(nama_file, list(label))
+    for i in np.nonzero(cocok)[0]:
+        record['Tegangan'][i] = label[nama_file[i]]
+    record.flush()
+    return int(cocok.sum())
+
+def kompaksi(path_dataset):
+    """
+    Menulis ulang dataset hanya dengan baris terakhir per nama_file.
+
+    Args:
+        path_dataset (str): Path file dataset.
+
+    Returns:
+        tuple: (jumlah baris sebelum, jumlah baris sesudah)
+    """
+    record = buka_record(path_dataset)
+    jumlah_sebelum = len(record)
+    _, indeks_terbalik = np.unique(np.asarray(record['nama_file'])[::-1], return_index=True)
+    indeks_terakhir = np.sort(jumlah_sebelum - 1 - indeks_terbalik)
+    record_unik = np.array(record[indeks_terakhir])
+    del record
+
+    _tulis_ulang(path_dataset, record_unik)
+    return jumlah_sebelum, len(record_unik)
+
+def impor_tabel(path_tabel, path_dataset, sheet_name='Sheet1'):
+    """
+    Mengimpor tabel fitur lama (CSV/Excel, mis. hasil konversi manual) ke dataset.
+
+    Args:
+        path_tabel (str): File .csv atau .xlsx berisi kolom sesuai SKEMA.
+        path_dataset (str): Path file dataset tujuan.
+        sheet_name (str): Nama sheet untuk file Excel.
+
+    Returns:
+        int: Jumlah baris yang diimpor.
+    """
+    if path_tabel.lower().endswith(('.xlsx', '.xls')):
+        df = pd.read_excel(path_tabel, sheet_name=sheet_name)
+    else:
+        df = pd.read_csv(path_tabel)
+    return tambah_baris(path_dataset, df.to_dict('records'))
+
+# --- Program Utama ---
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Utilitas dataset fitur area terang (format biner kolumnar).")
+    sub = parser.add_subparsers(dest='perintah', required=True)
+
+    p_info = sub.add_parser('info', help="Tampilkan ringkasan dataset.")
+    p_info.add_argument('dataset')
+
+    p_label = sub.add_parser('label', help="Isi kolom Tegangan dari CSV (kolom: nama_file, Tegangan).")
+    p_label.add_argument('dataset')
+    p_label.add_argument('csv_tegangan')
+
+    p_impor = sub.add_parser('impor', help="Impor tabel CSV/Excel lama ke dataset.")
+    p_impor.add_argument('tabel')
+    p_impor.add_argument('dataset')
+    p_impor.add_argument('--sheet', default='Sheet1')
+
+    p_kompaksi = sub.add_parser('kompaksi', help="Buang baris lama yang sudah digantikan.")
+    p_kompaksi.add_argument('dataset')
+
+    args = parser.parse_args()
+
+    if args.perintah == 'info':
+        df = muat_dataset(args.dataset)
+        print(f"Dataset: {args.dataset}")
+        print(f"  Jumlah record (termasuk baris lama): {len(buka_record(args.dataset))}")
+        print(f"  Jumlah gambar unik: {len(df)}")
+        print(f"  Sudah berlabel Tegangan: {df['Tegangan'].notna().sum()}")
+        print(df.head())
+    elif args.perintah == 'label':
+        df_label = pd.read_csv(args.csv_tegangan)
+        if 'nama_file' not in df_label.columns or 'Tegangan' not in df_label.columns:
+            print("Error: CSV label harus memiliki kolom 'nama_file' dan 'Tegangan'.")
+            sys.exit(1)
+        jumlah = isi_tegangan(args.dataset, dict(zip(df_label['nama_file'], df_label['Tegangan'])))
+        print(f"{jumlah} baris diberi label Tegangan.")
+    elif args.perintah == 'impor':
+        jumlah = impor_tabel(args.tabel, args.dataset, args.sheet)
+        print(f"{jumlah} baris diimpor ke {args.dataset}.")
+    elif args.perintah == 'kompaksi':
+        sebelum, sesudah = kompaksi(args.dataset)
+        print(f"Kompaksi selesai: {sebelum} -> {sesudah} record.")
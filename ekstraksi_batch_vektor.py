@@ -0,0 +1,230 @@
+import cv2
+import os
+import argparse
+import numpy as np
+import pandas as pd
+from ekstraksi_fitur_cahaya import daftar_file_gambar, hitung_fitur_kontur
+
+# Konstanta yang sama dengan findLightCentroid di kode_deteksi_cahaya.ino
+THRESHOLD_TERANG_FIRMWARE = 220
+RASIO_PIKSEL_MIN_FIRMWARE = 0.0005
+RASIO_PIKSEL_MAX_FIRMWARE = 0.25
+
+KOLOM_FITUR = ['area_norm', 'pusat_x_norm', 'pusat_y_norm', 'bbox_x_norm', 'bbox_y_norm',
+               'bbox_w_norm', 'bbox_h_norm', 'area_terang_ditemukan']
+
+def threshold_otsu_batch(batch):
+    """
+    Menghitung nilai ambang Otsu untuk setiap gambar dalam batch sekaligus.
+
+    Rumusnya sama dengan cv2.threshold(..., cv2.THRESH_OTSU): ambang t dipilih
+    yang memaksimalkan varians antar-kelas, dan piksel > t dianggap terang.
+
+    Args:
+        batch (np.ndarray): Array uint8 berukuran (N, H, W).
+
+    Returns:
+        np.ndarray: Ambang Otsu per gambar, array int berukuran (N,).
+    """
+    # Histogram per gambar dengan cv2.calcHist (lebih cepat daripada satu
+    # bincount besar), perhitungan Otsu selanjutnya vektor pada (N, 256).
+    histogram = np.stack([cv2.calcHist([gambar], [0], None, [256], [0, 256]).ravel() for gambar in batch])
+
+    p = histogram / histogram.sum(axis=1, keepdims=True)
+    level = np.arange(256, dtype=np.float64)
+    q1 = np.cumsum(p, axis=1)
+    q2 = 1.0 - q1
+    momen1 = np.cumsum(p * level, axis=1)
+    mu = momen1[:, -1:]
+
+    eps = np.finfo(np.float32).eps
+    valid = (np.minimum(q1, q2) >= eps) & (np.maximum(q1, q2) <= 1.0 - eps)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        mu1 = momen1 / q1
+        mu2 = (mu - momen1) / q2
+        sigma = q1 * q2 * (mu1 - mu2) ** 2
+    sigma = np.where(valid, sigma, 0.0)
+    # argmax mengambil indeks pertama yang maksimal, sama seperti OpenCV (perbandingan '>')
+    return np.argmax(sigma, axis=1)
+
+def _bbox_dari_mask(mask):
+    # Bounding box semua piksel True per gambar: (x, y, w, h), 0 jika kosong.
+    ada_kolom = mask.any(axis=1)  # (N, W)
+    ada_baris = mask.any(axis=2)  # (N, H)
+    lebar_img = mask.shape[2]
+    tinggi_img = mask.shape[1]
+    x_min = np.argmax(ada_kolom, axis=1)
+    x_max = lebar_img - 1 - np.argmax(ada_kolom[:, ::-1], axis=1)
+    y_min = np.argmax(ada_baris, axis=1)
+    y_max = tinggi_img - 1 - np.argmax(ada_baris[:, ::-1], axis=1)
+    kosong = ~ada_kolom.any(axis=1)
+    w = np.where(kosong, 0, x_max - x_min + 1)
+    h = np.where(kosong, 0, y_max - y_min + 1)
+    return np.where(kosong, 0, x_min), np.where(kosong, 0, y_min), w, h
+
+def ekstrak_fitur_firmware(batch):
+    """
+    Mereproduksi findLightCentroid (ESP32) untuk seluruh batch sekaligus.
+
+    Piksel > 220 dianggap terang. Centroid adalah rata-rata posisi semua piksel
+    terang (bukan kontur terbesar). Deteksi hanya valid jika jumlah piksel
+    terang > 0.05% dan < 25% luas frame. Perhitungan memakai float32, sama
+    seperti di firmware. Jika tidak terdeteksi, firmware mengirim
+    placeholder -1.0; di sini dipakai nilai default ekstraktor host (pusat
+    0.5, area 0, area_terang_ditemukan 0) agar skema fitur tetap sama.
+
+    Args:
+        batch (np.ndarray): Array uint8 grayscale berukuran (N, H, W).
+
+    Returns:
+        dict: Nama kolom -> np.ndarray berukuran (N,).
+    """
+    n_gambar, tinggi_img, lebar_img = batch.shape
+    terang = batch > THRESHOLD_TERANG_FIRMWARE
+
+    jumlah_per_kolom = terang.sum(axis=1, dtype=np.int64)  # (N, W)
+    jumlah_per_baris = terang.sum(axis=2, dtype=np.int64)  # (N, H)
+    jumlah_terang = jumlah_per_kolom.sum(axis=1)
+    sum_x = jumlah_per_kolom @ np.arange(lebar_img, dtype=np.int64)
+    sum_y = jumlah_per_baris @ np.arange(tinggi_img, dtype=np.int64)
+
+    luas = lebar_img * tinggi_img
+    piksel_min = int(luas * RASIO_PIKSEL_MIN_FIRMWARE)
+    piksel_max = int(luas * RASIO_PIKSEL_MAX_FIRMWARE)
+    terdeteksi = (jumlah_terang > piksel_min) & (jumlah_terang < piksel_max)
+
+    jumlah_f32 = np.maximum(jumlah_terang, 1).astype(np.float32)
+    with np.errstate(invalid='ignore'):
+        cx_norm = sum_x.astype(np.float32) / jumlah_f32 / np.float32(lebar_img)
+        cy_norm = sum_y.astype(np.float32) / jumlah_f32 / np.float32(tinggi_img)
+        area_norm = jumlah_terang.astype(np.float32) / np.float32(luas)
+
+    bx, by, bw, bh = _bbox_dari_mask(terang)
+    return {
+        'area_norm': np.where(terdeteksi, area_norm, 0.0),
+        'pusat_x_norm': np.where(terdeteksi, cx_norm, 0.5),
+        'pusat_y_norm': np.where(terdeteksi, cy_norm, 0.5),
+        'bbox_x_norm': np.where(terdeteksi, bx / lebar_img, 0.0),
+        'bbox_y_norm': np.where(terdeteksi, by / tinggi_img, 0.0),
+        'bbox_w_norm': np.where(terdeteksi, bw / lebar_img, 0.0),
+        'bbox_h_norm': np.where(terdeteksi, bh / tinggi_img, 0.0),
+        'area_terang_ditemukan': terdeteksi.astype(np.int64),
+    }
+
+def ekstrak_fitur_otsu_kontur(batch):
+    """
+    Ekstraksi seperti ekstrak_fitur_area_terang (Otsu + kontur terbesar) untuk batch.
+
+    Ambang Otsu dan thresholding dihitung vektor untuk seluruh batch; hanya
+    pencarian kontur yang tetap per gambar karena cv2.findContours tidak
+    bekerja pada batch.
+
+    Args:
+        batch (np.ndarray): Array uint8 grayscale berukuran (N, H, W).
+
+    Returns:
+        dict: Nama kolom -> np.ndarray berukuran (N,).
+    """
+    n_gambar, tinggi_img, lebar_img = batch.shape
+    ambang = threshold_otsu_batch(batch)
+    batch_thresh = (batch > ambang[:, None, None]).view(np.uint8)
+    batch_thresh *= 255
+
+    kolom = {nama: np.empty(n_gambar, dtype=np.float64) for nama in KOLOM_FITUR}
+    for i in range(n_gambar):
+        kontur, _ = cv2.findContours(batch_thresh[i], cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+        fitur = hitung_fitur_kontur(kontur, '', lebar_img, tinggi_img)
+        for nama in KOLOM_FITUR:
+            kolom[nama][i] = fitur[nama]
+    kolom['area_terang_ditemukan'] = kolom['area_terang_ditemukan'].astype(np.int64)
+    return kolom
+
+MODE_EKSTRAKSI = {
+    'otsu_contour': ekstrak_fitur_otsu_kontur,
+    'firmware': ekstrak_fitur_firmware,
+}
+
+def ekstrak_fitur_vektor(batch, mode='otsu_contour'):
+    """
+    Mengekstrak fitur area terang dari batch gambar grayscale (N, H, W).
+
+    Args:
+        batch (np.ndarray): Array uint8 berukuran (N, H, W).
+        mode (str): 'otsu_contour' (sama dengan ekstraktor host) atau
+                    'firmware' (sama dengan findLightCentroid di ESP32).
+
+    Returns:
+        dict: Nama kolom -> np.ndarray berukuran (N,).
+    """
+    if mode not in MODE_EKSTRAKSI:
+        raise ValueError(f"Mode '{mode}' tidak dikenal. Pilihan: {list(MODE_EKSTRAKSI)}")
+    batch = np.asarray(batch)
+    if batch.dtype != np.uint8 or batch.ndim != 3:
+        raise ValueError("Batch harus berupa array uint8 berukuran (N, H, W).")
+    return MODE_EKSTRAKSI[mode](batch)
+
+def muat_batch_gambar(daftar_path_gambar, ukuran=None):
+    """
+    Membaca beberapa gambar sebagai grayscale dan menumpuknya menjadi (N, H, W).
+
+    Args:
+        daftar_path_gambar (list): Daftar path gambar.
+        ukuran (tuple): (lebar, tinggi) tujuan; None = pakai ukuran gambar
+                        pertama. Gambar dengan ukuran berbeda di-resize.
+
+    Returns:
+        tuple: (batch, daftar_path_valid). Gambar yang gagal dibaca dilewati.
+    """
+    kumpulan = []
+    daftar_path_valid = []
+    for path_gambar in daftar_path_gambar:
+        img = cv2.imread(path_gambar, cv2.IMREAD_GRAYSCALE)
+        if img is None:
+            print(f"Error: Tidak dapat membaca gambar {path_gambar}")
+            continue
+        if ukuran is None:
+            ukuran = (img.shape[1], img.shape[0])
+        if (img.shape[1], img.shape[0]) != ukuran:
+            img = cv2.resize(img, ukuran, interpolation=cv2.INTER_AREA)
+        kumpulan.append(img)
+        daftar_path_valid.append(path_gambar)
+    if not kumpulan:
+        return np.empty((0, 0, 0), dtype=np.uint8), daftar_path_valid
+    return np.stack(kumpulan), daftar_path_valid
+
+# --- Program Utama ---
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Ekstraksi fitur area terang secara batch (vektor NumPy).")
+    parser.add_argument('folder', help="Folder berisi gambar yang akan diproses.")
+    parser.add_argument('--mode', choices=list(MODE_EKSTRAKSI), default='otsu_contour',
+                        help="'otsu_contour' = sama dengan ekstraktor host, 'firmware' = sama dengan ESP32.")
+    parser.add_argument('--ukuran', default=None,
+                        help="Resize ke LEBARxTINGGI sebelum ekstraksi, mis. 160x120 (QQVGA seperti ESP32-CAM).")
+    parser.add_argument('--batch', type=int, default=256, help="Jumlah gambar per batch.")
+    parser.add_argument('--output', default="fitur_area_terang_batch.csv", help="Nama file CSV output.")
+    args = parser.parse_args()
+
+    ukuran = tuple(int(v) for v in args.ukuran.lower().split('x')) if args.ukuran else None
+    daftar_path_gambar = daftar_file_gambar(args.folder)
+    print(f"Memproses {len(daftar_path_gambar)} gambar dengan mode '{args.mode}'...")
+
+    kumpulan_df = []
+    for mulai in range(0, len(daftar_path_gambar), args.batch):
+        batch, daftar_path_valid = muat_batch_gambar(daftar_path_gambar[mulai:mulai + args.batch], ukuran)
+        if not daftar_path_valid:
+            continue
+        # Tanpa --ukuran, ukuran batch berikutnya mengikuti batch pertama
+        ukuran = (batch.shape[2], batch.shape[1])
+        df_batch = pd.DataFrame(ekstrak_fitur_vektor(batch, mode=args.mode))
+        df_batch.insert(0, 'nama_file', [os.path.basename(path) for path in daftar_path_valid])
+        kumpulan_df.append(df_batch)
+
+    if not kumpulan_df:
+        print("Tidak ada gambar yang dapat diproses.")
+        exit()
+
+    df_hasil_fitur = pd.concat(kumpulan_df, ignore_index=True)
+    print(df_hasil_fitur.head())
+    path_output_csv = os.path.join(os.getcwd(), args.output)
+    df_hasil_fitur.to_csv(path_output_csv, index=False)
+    print(f"\nFitur berhasil disimpan ke file CSV: {path_output_csv}")
@@ -1,153 +1,379 @@
-import cv2
-import os
-import numpy as np
-import pandas as pd
-
-def ekstrak_fitur_area_terang(path_gambar):
-    """
-    Mengekstrak fitur ukuran dan posisi area terang dari sebuah gambar.
-
-    Args:
-        path_gambar (str): Path ke file gambar.
-
-    Returns:
-        dict: Dictionary berisi fitur-fitur yang diekstrak (nama_file, area_norm,
-              pusat_x_norm, pusat_y_norm, bbox_x_norm, bbox_y_norm,
-              bbox_w_norm, bbox_h_norm, area_terang_ditemukan)
-              atau None jika gambar tidak dapat diproses.
-    """
-    img = cv2.imread(path_gambar)
-    if img is None:
-        print(f"Error: Tidak dapat membaca gambar {path_gambar}")
-        return None
-
-    tinggi_img, lebar_img = img.shape[:2]
-    nama_file = os.path.basename(path_gambar)
-
-    # 1. Konversi ke Grayscale
-    gambar_gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
-
-    # 2. Thresholding (Otsu's Binarization untuk menentukan ambang batas otomatis)
-    # Ini akan memisahkan piksel terang (objek) dari piksel gelap (latar belakang)
-    # Piksel di atas ambang batas akan menjadi putih (255), di bawahnya hitam (0)
-    ret, gambar_thresh = cv2.threshold(gambar_gray, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
-
-    # 3. Operasi Morfologi (Opsional, untuk membersihkan noise)
-    # Anda bisa uncomment dan menyesuaikan kernel jika diperlukan
-    # kernel = np.ones((5,5), np.uint8)
-    # gambar_thresh = cv2.morphologyEx(gambar_thresh, cv2.MORPH_OPEN, kernel) # Menghilangkan noise kecil
-    # gambar_thresh = cv2.morphologyEx(gambar_thresh, cv2.MORPH_CLOSE, kernel) # Menutup lubang kecil pada objek
-
-    # 4. Deteksi Kontur
-    # Mencari bentuk-bentuk (kontur) pada gambar hasil thresholding
-    # cv2.RETR_EXTERNAL hanya mengambil kontur terluar
-    # cv2.CHAIN_APPROX_SIMPLE menyederhanakan titik-titik kontur
-    kontur, hirarki = cv2.findContours(gambar_thresh, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
-
-    fitur = {
-        'nama_file': nama_file,
-        'area_norm': 0.0,
-        'pusat_x_norm': 0.5, # Default ke tengah jika tidak ada kontur
-        'pusat_y_norm': 0.5, # Default ke tengah jika tidak ada kontur
-        'bbox_x_norm': 0.0,
-        'bbox_y_norm': 0.0,
-        'bbox_w_norm': 0.0,
-        'bbox_h_norm': 0.0,
-        'area_terang_ditemukan': 0 # 0 jika tidak ditemukan, 1 jika ditemukan
-    }
-
-    if not kontur:
-        print(f"Info: Tidak ada kontur signifikan ditemukan di {nama_file}")
-        return fitur # Mengembalikan nilai default
-
-    # 5. Identifikasi Area Terang Utama (berdasarkan kontur dengan area terbesar)
-    kontur_utama_terang = max(kontur, key=cv2.contourArea)
-    fitur['area_terang_ditemukan'] = 1
-
-    # --- Ekstraksi Fitur Numerik dari Kontur Utama ---
-
-    # A. Ukuran Area
-    area_piksel = cv2.contourArea(kontur_utama_terang)
-    fitur['area_norm'] = area_piksel / (lebar_img * tinggi_img)  # Normalisasi area (0-1)
-
-    # B. Posisi Pusat (Centroid)
-    M = cv2.moments(kontur_utama_terang)
-    if M["m00"] != 0:
-        pusat_x = M["m10"] / M["m00"]
-        pusat_y = M["m01"] / M["m00"]
-        fitur['pusat_x_norm'] = pusat_x / lebar_img    # Normalisasi posisi x (0-1)
-        fitur['pusat_y_norm'] = pusat_y / tinggi_img   # Normalisasi posisi y (0-1)
-    # else: (nilai default sudah diatur di atas)
-
-    # C. Bounding Box (Kotak Pembatas)
-    x, y, w, h = cv2.boundingRect(kontur_utama_terang)
-    fitur['bbox_x_norm'] = x / lebar_img      # Normalisasi x_min bounding box
-    fitur['bbox_y_norm'] = y / tinggi_img     # Normalisasi y_min bounding box
-    fitur['bbox_w_norm'] = w / lebar_img      # Normalisasi lebar bounding box
-    fitur['bbox_h_norm'] = h / tinggi_img     # Normalisasi tinggi bounding box
-
-    return fitur
-
-# --- Program Utama ---
-if __name__ == "__main__":
-    folder_input_gambar = "D:\\Kuliah\\SMV Matkupil\\Tubes\\Data benar\\Data"
-
-    # Cek apakah folder input valid
-    if not os.path.isdir(folder_input_gambar):
-        print(f"Error: Folder input '{folder_input_gambar}' tidak valid atau belum diatur.")
-        print("Silakan ganti 'PATH_FOLDER_GAMBAR_ANDA' dengan path yang benar ke folder gambar Anda.")
-        exit()
-
-    # Tentukan nama file CSV untuk output
-    file_csv_output = "fitur_area_terang_hasil_ekstraksi.csv"
-    # Selalu simpan file CSV di folder tempat script dijalankan
-    path_output_csv = os.path.join(os.getcwd(), file_csv_output)
-    # Jika ingin menyimpan di direktori yang sama dengan folder gambar, gunakan baris di bawah ini (commented):
-    # path_output_csv = os.path.join(os.path.dirname(folder_input_gambar), file_csv_output)
-
-
-    ekstensi_gambar_diizinkan = ('.png', '.jpg', '.jpeg', '.bmp', '.tiff', '.tif', '.gif')
-    kumpulan_semua_fitur = []
-
-    print(f"Memulai pemrosesan gambar di folder: {folder_input_gambar}")
-    # Iterasi semua file dalam folder yang ditentukan
-    for nama_file_gambar in os.listdir(folder_input_gambar):
-        if nama_file_gambar.lower().endswith(ekstensi_gambar_diizinkan):
-            path_lengkap_gambar = os.path.join(folder_input_gambar, nama_file_gambar)
-            print(f"  Memproses: {nama_file_gambar}...")
-
-            hasil_fitur = ekstrak_fitur_area_terang(path_lengkap_gambar)
-
-            if hasil_fitur:
-                kumpulan_semua_fitur.append(hasil_fitur)
-            else:
-                # Jika ada error pembacaan gambar, buat entri default agar jumlah baris tetap sama jika diperlukan
-                kumpulan_semua_fitur.append({
-                    'nama_file': nama_file_gambar, 'area_norm': 0.0,
-                    'pusat_x_norm': 0.5, 'pusat_y_norm': 0.5,
-                    'bbox_x_norm': 0.0, 'bbox_y_norm': 0.0,
-                    'bbox_w_norm': 0.0, 'bbox_h_norm': 0.0,
-                    'area_terang_ditemukan': -1 # -1 untuk menandakan error baca gambar
-                })
-
-
-    if not kumpulan_semua_fitur:
-        print("Tidak ada gambar yang diproses atau tidak ada fitur yang dapat diekstrak.")
-        exit()
-
-    # Konversi list of dictionaries ke Pandas DataFrame untuk kemudahan analisis dan penyimpanan
-    df_hasil_fitur = pd.DataFrame(kumpulan_semua_fitur)
-
-    # Tampilkan beberapa baris pertama dari DataFrame
-    print("\n--- Hasil Ekstraksi Fitur (Beberapa Baris Awal) ---")
-    print(df_hasil_fitur.head())
-
-    # Simpan DataFrame ke file CSV
-    try:
-        df_hasil_fitur.to_csv(path_output_csv, index=False)
-        print(f"\nFitur berhasil diekstrak dan disimpan ke file CSV: {path_output_csv}")
-    except Exception as e:
-        print(f"\nTerjadi error saat menyimpan file CSV: {e}")
-        print("Pastikan Anda memiliki izin tulis di lokasi tersebut.")
-        print("DataFrame yang akan disimpan:")
-        print(df_hasil_fitur)
\ No newline at end of file
+import cv2
+import os
+import time
+import argparse
+import functools
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+import cache_fitur
+import dataset_fitur
+
+EKSTENSI_GAMBAR_DIIZINKAN = ('.png', '.jpg', '.jpeg', '.bmp', '.tiff', '.tif', '.gif')
+
+# Flag cv2.imread untuk decode langsung ke grayscale pada resolusi tereduksi.
+# Untuk JPEG, reduksi dilakukan di dalam decoder (DCT scaling) sehingga jauh
+# lebih cepat dan hemat memori dibanding decode penuh lalu resize.
+FLAG_DECODE_SKALA = {
+    2: cv2.IMREAD_REDUCED_GRAYSCALE_2,
+    4: cv2.IMREAD_REDUCED_GRAYSCALE_4,
+    8: cv2.IMREAD_REDUCED_GRAYSCALE_8,
+}
+
+KOLOM_FITUR_NUMERIK = ['area_norm', 'pusat_x_norm', 'pusat_y_norm', 'bbox_x_norm', 'bbox_y_norm',
+                       'bbox_w_norm', 'bbox_h_norm']
+
+def ekstrak_fitur_area_terang(path_gambar, skala_decode=1):
+    """
+    Mengekstrak fitur ukuran dan posisi area terang dari sebuah gambar.
+
+    Args:
+        path_gambar (str): Path ke file gambar.
+        skala_decode (int): 1 = resolusi penuh, 2/4/8 = decode langsung ke
+                            grayscale pada 1/2, 1/4 atau 1/8 resolusi. Fitur
+                            tetap ternormalisasi terhadap frame asli.
+
+    Returns:
+        dict: Dictionary berisi fitur-fitur yang diekstrak (nama_file, area_norm,
+              pusat_x_norm, pusat_y_norm, bbox_x_norm, bbox_y_norm,
+              bbox_w_norm, bbox_h_norm, area_terang_ditemukan)
+              atau None jika gambar tidak dapat diproses.
+    """
+    if skala_decode == 1:
+        img = cv2.imread(path_gambar)
+    elif skala_decode in FLAG_DECODE_SKALA:
+        img = cv2.imread(path_gambar, FLAG_DECODE_SKALA[skala_decode])
+    else:
+        raise ValueError(f"skala_decode harus 1, 2, 4 atau 8 (diberikan: {skala_decode})")
+    if img is None:
+        print(f"Error: Tidak dapat membaca gambar {path_gambar}")
+        return None
+
+    tinggi_img, lebar_img = img.shape[:2]
+    nama_file = os.path.basename(path_gambar)
+
+    # 1. Konversi ke Grayscale (decode tereduksi sudah langsung grayscale)
+    gambar_gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY) if img.ndim == 3 else img
+
+    # 2. Thresholding (Otsu's Binarization untuk menentukan ambang batas otomatis)
+    # Ini akan memisahkan piksel terang (objek) dari piksel gelap (latar belakang)
+    # Piksel di atas ambang batas akan menjadi putih (255), di bawahnya hitam (0)
+    ret, gambar_thresh = cv2.threshold(gambar_gray, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+
+    # 3. Operasi Morfologi (Opsional, untuk membersihkan noise)
+    # Anda bisa uncomment dan menyesuaikan kernel jika diperlukan
+    # kernel = np.ones((5,5), np.uint8)
+    # gambar_thresh = cv2.morphologyEx(gambar_thresh, cv2.MORPH_OPEN, kernel) # Menghilangkan noise kecil
+    # gambar_thresh = cv2.morphologyEx(gambar_thresh, cv2.MORPH_CLOSE, kernel) # Menutup lubang kecil pada objek
+
+    # 4. Deteksi Kontur
+    # Mencari bentuk-bentuk (kontur) pada gambar hasil thresholding
+    # cv2.RETR_EXTERNAL hanya mengambil kontur terluar
+    # cv2.CHAIN_APPROX_SIMPLE menyederhanakan titik-titik kontur
+    kontur, hirarki = cv2.findContours(gambar_thresh, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+
+    if not kontur:
+        print(f"Info: Tidak ada kontur signifikan ditemukan di {nama_file}")
+
+    fitur = hitung_fitur_kontur(kontur, nama_file, lebar_img, tinggi_img)
+    if skala_decode > 1 and fitur['area_terang_ditemukan'] == 1:
+        # Piksel hasil decode tereduksi mewakili blok skala x skala piksel asli,
+        # jadi pusatnya bergeser setengah blok dibanding indeks piksel asli.
+        fitur['pusat_x_norm'] += (0.5 - 0.5 / skala_decode) / lebar_img
+        fitur['pusat_y_norm'] += (0.5 - 0.5 / skala_decode) / tinggi_img
+    return fitur
+
+def hitung_fitur_kontur(kontur, nama_file, lebar_img, tinggi_img):
+    """
+    Menghitung fitur ukuran dan posisi dari kontur terbesar.
+
+    Koordinat kontur harus dalam koordinat frame penuh (gunakan parameter
+    offset pada cv2.findContours jika kontur dicari di dalam ROI).
+
+    Args:
+        kontur (sequence): Hasil cv2.findContours.
+        nama_file (str): Nama file/sumber untuk kolom 'nama_file'.
+        lebar_img (int): Lebar frame penuh (piksel).
+        tinggi_img (int): Tinggi frame penuh (piksel).
+
+    Returns:
+        dict: Fitur ternormalisasi (nilai default jika kontur kosong).
+    """
+    fitur = {
+        'nama_file': nama_file,
+        'area_norm': 0.0,
+        'pusat_x_norm': 0.5, # Default ke tengah jika tidak ada kontur
+        'pusat_y_norm': 0.5, # Default ke tengah jika tidak ada kontur
+        'bbox_x_norm': 0.0,
+        'bbox_y_norm': 0.0,
+        'bbox_w_norm': 0.0,
+        'bbox_h_norm': 0.0,
+        'area_terang_ditemukan': 0 # 0 jika tidak ditemukan, 1 jika ditemukan
+    }
+
+    if not kontur:
+        return fitur # Mengembalikan nilai default
+
+    # 5. Identifikasi Area Terang Utama (berdasarkan kontur dengan area terbesar)
+    kontur_utama_terang = max(kontur, key=cv2.contourArea)
+    fitur['area_terang_ditemukan'] = 1
+
+    # --- Ekstraksi Fitur Numerik dari Kontur Utama ---
+
+    # A. Ukuran Area
+    area_piksel = cv2.contourArea(kontur_utama_terang)
+    fitur['area_norm'] = area_piksel / (lebar_img * tinggi_img)  # Normalisasi area (0-1)
+
+    # B. Posisi Pusat (Centroid)
+    M = cv2.moments(kontur_utama_terang)
+    if M["m00"] != 0:
+        pusat_x = M["m10"] / M["m00"]
+        pusat_y = M["m01"] / M["m00"]
+        fitur['pusat_x_norm'] = pusat_x / lebar_img    # Normalisasi posisi x (0-1)
+        fitur['pusat_y_norm'] = pusat_y / tinggi_img   # Normalisasi posisi y (0-1)
+    # else: (nilai default sudah diatur di atas)
+
+    # C. Bounding Box (Kotak Pembatas)
+    x, y, w, h = cv2.boundingRect(kontur_utama_terang)
+    fitur['bbox_x_norm'] = x / lebar_img      # Normalisasi x_min bounding box
+    fitur['bbox_y_norm'] = y / tinggi_img     # Normalisasi y_min bounding box
+    fitur['bbox_w_norm'] = w / lebar_img      # Normalisasi lebar bounding box
+    fitur['bbox_h_norm'] = h / tinggi_img     # Normalisasi tinggi bounding box
+
+    return fitur
+
+def fitur_gagal(nama_file):
+    """
+    Membuat entri fitur default untuk gambar yang gagal dibaca/diproses.
+
+    Args:
+        nama_file (str): Nama file gambar.
+
+    Returns:
+        dict: Fitur default dengan area_terang_ditemukan = -1 (error baca gambar).
+    """
+    return {
+        'nama_file': nama_file, 'area_norm': 0.0,
+        'pusat_x_norm': 0.5, 'pusat_y_norm': 0.5,
+        'bbox_x_norm': 0.0, 'bbox_y_norm': 0.0,
+        'bbox_w_norm': 0.0, 'bbox_h_norm': 0.0,
+        'area_terang_ditemukan': -1 # -1 untuk menandakan error baca gambar
+    }
+
+def daftar_file_gambar(folder_input_gambar):
+    """
+    Mengambil daftar path gambar di sebuah folder, diurutkan berdasarkan nama
+    agar urutan hasil ekstraksi selalu sama di setiap run.
+
+    Args:
+        folder_input_gambar (str): Path ke folder gambar.
+
+    Returns:
+        list: Daftar path lengkap file gambar.
+    """
+    return [
+        os.path.join(folder_input_gambar, nama_file_gambar)
+        for nama_file_gambar in sorted(os.listdir(folder_input_gambar))
+        if nama_file_gambar.lower().endswith(EKSTENSI_GAMBAR_DIIZINKAN)
+    ]
+
+def _inisialisasi_worker():
+    # Setiap proses worker cukup memakai satu thread OpenCV, supaya
+    # N proses tidak saling berebut core (oversubscription).
+    cv2.setNumThreads(1)
+
+def _ekstrak_aman(path_gambar, skala_decode=1):
+    # Dipanggil di proses worker: error apapun pada satu file tidak boleh
+    # menggagalkan seluruh batch, cukup ditandai dengan -1.
+    try:
+        hasil_fitur = ekstrak_fitur_area_terang(path_gambar, skala_decode)
+    except Exception as e:
+        print(f"Error: Gagal memproses {path_gambar}: {e}")
+        hasil_fitur = None
+    return hasil_fitur if hasil_fitur else fitur_gagal(os.path.basename(path_gambar))
+
+def ekstrak_fitur_batch(daftar_path_gambar, jumlah_worker=None, ukuran_chunk=64, skala_decode=1):
+    """
+    Mengekstrak fitur dari banyak gambar secara paralel menggunakan process pool.
+
+    Gambar dikirim ke worker dalam chunk agar overhead antar-proses kecil.
+    Urutan hasil selalu sama dengan urutan daftar_path_gambar.
+
+    Args:
+        daftar_path_gambar (list): Daftar path file gambar.
+        jumlah_worker (int): Jumlah proses worker. None = jumlah core CPU,
+                             1 = diproses berurutan tanpa process pool.
+        ukuran_chunk (int): Jumlah gambar per chunk yang dikirim ke worker.
+        skala_decode (int): Skala decode, lihat ekstrak_fitur_area_terang.
+
+    Returns:
+        list: List of dict fitur, satu per gambar (gagal baca ditandai
+              area_terang_ditemukan = -1).
+    """
+    if jumlah_worker is None:
+        jumlah_worker = os.cpu_count() or 1
+    ekstrak = functools.partial(_ekstrak_aman, skala_decode=skala_decode)
+    if jumlah_worker <= 1 or len(daftar_path_gambar) <= 1:
+        return [ekstrak(path) for path in daftar_path_gambar]
+
+    with ProcessPoolExecutor(max_workers=jumlah_worker, initializer=_inisialisasi_worker) as executor:
+        # executor.map mempertahankan urutan input, sehingga output deterministik
+        return list(executor.map(ekstrak, daftar_path_gambar, chunksize=max(1, ukuran_chunk)))
+
+def laporan_error_skala(daftar_path_gambar, daftar_skala=(2, 4, 8)):
+    """
+    Membandingkan fitur hasil decode tereduksi dengan fitur resolusi penuh.
+
+    Args:
+        daftar_path_gambar (list): Gambar sampel untuk dibandingkan.
+        daftar_skala (tuple): Skala decode yang diuji.
+
+    Returns:
+        pd.DataFrame: Satu baris per skala berisi waktu rata-rata per gambar,
+                      percepatan, jumlah gambar yang status deteksinya berbeda,
+                      serta error absolut rata-rata dan maksimum per fitur
+                      (hanya gambar yang terdeteksi di kedua resolusi).
+    """
+    def _ukur(skala):
+        kumpulan_fitur = []
+        waktu_mulai = time.perf_counter()
+        for path_gambar in daftar_path_gambar:
+            kumpulan_fitur.append(_ekstrak_aman(path_gambar, skala))
+        durasi = time.perf_counter() - waktu_mulai
+        return pd.DataFrame(kumpulan_fitur), durasi / max(1, len(daftar_path_gambar))
+
+    df_penuh, waktu_penuh = _ukur(1)
+    laporan = [{'skala_decode': 1, 'ms_per_gambar': waktu_penuh * 1000, 'percepatan': 1.0,
+                'deteksi_berbeda': 0}]
+    for skala in daftar_skala:
+        df_skala, waktu_skala = _ukur(skala)
+        baris = {'skala_decode': skala, 'ms_per_gambar': waktu_skala * 1000,
+                 'percepatan': waktu_penuh / waktu_skala if waktu_skala > 0 else np.nan}
+        ditemukan_penuh = df_penuh['area_terang_ditemukan'] == 1
+        ditemukan_skala = df_skala['area_terang_ditemukan'] == 1
+        baris['deteksi_berbeda'] = int((ditemukan_penuh != ditemukan_skala).sum())
+        sama = ditemukan_penuh & ditemukan_skala
+        for kolom in KOLOM_FITUR_NUMERIK:
+            selisih = (df_skala.loc[sama, kolom] - df_penuh.loc[sama, kolom]).abs()
+            baris[f'mae_{kolom}'] = selisih.mean() if len(selisih) else np.nan
+            baris[f'max_{kolom}'] = selisih.max() if len(selisih) else np.nan
+        laporan.append(baris)
+    return pd.DataFrame(laporan)
+
+# --- Program Utama ---
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Ekstraksi fitur area terang dari folder gambar.")
+    parser.add_argument('folder', nargs='?', default="D:\\Kuliah\\SMV Matkupil\\Tubes\\Data benar\\Data",
+                        help="Folder berisi gambar yang akan diproses.")
+    parser.add_argument('--output', default="fitur_area_terang_hasil_ekstraksi.csv",
+                        help="Nama file CSV output (disimpan di folder kerja saat ini).")
+    parser.add_argument('--workers', type=int, default=None,
+                        help="Jumlah proses worker (default: jumlah core CPU, 1 = tanpa paralel).")
+    parser.add_argument('--chunk', type=int, default=64,
+                        help="Jumlah gambar per chunk yang dikirim ke setiap worker.")
+    parser.add_argument('--skala-decode', type=int, choices=[1, 2, 4, 8], default=1,
+                        help="Decode langsung ke grayscale pada 1/N resolusi (lebih cepat, hemat memori).")
+    parser.add_argument('--laporan-skala', type=int, default=0, metavar='N',
+                        help="Hanya buat laporan error per fitur skala 2/4/8 vs resolusi penuh "
+                             "pada N gambar sampel, lalu keluar.")
+    parser.add_argument('--cache', default="fitur_area_terang_cache.sqlite",
+                        help="File SQLite cache fitur; hanya gambar baru/berubah yang diproses ulang.")
+    parser.add_argument('--tanpa-cache', action='store_true',
+                        help="Abaikan cache dan proses ulang semua gambar.")
+    parser.add_argument('--dataset', default="fitur_area_terang.fitur",
+                        help="File dataset biner (dibaca langsung oleh latih_model_regresi.py); "
+                             "baris gambar baru/berubah ditambahkan di akhir file "
+                             "(ditulis ulang jika --tanpa-cache).")
+    parser.add_argument('--tanpa-dataset', action='store_true',
+                        help="Jangan tulis ke file dataset, hanya CSV.")
+    args = parser.parse_args()
+
+    folder_input_gambar = args.folder
+
+    # Cek apakah folder input valid
+    if not os.path.isdir(folder_input_gambar):
+        print(f"Error: Folder input '{folder_input_gambar}' tidak valid atau belum diatur.")
+        print("Silakan ganti 'PATH_FOLDER_GAMBAR_ANDA' dengan path yang benar ke folder gambar Anda.")
+        exit()
+
+    # Selalu simpan file CSV di folder tempat script dijalankan
+    path_output_csv = os.path.join(os.getcwd(), args.output)
+    # Jika ingin menyimpan di direktori yang sama dengan folder gambar, gunakan baris di bawah ini (commented):
+    # path_output_csv = os.path.join(os.path.dirname(folder_input_gambar), args.output)
+
+    daftar_path_gambar = daftar_file_gambar(folder_input_gambar)
+
+    if args.laporan_skala > 0:
+        # Sampel tersebar merata di seluruh folder
+        langkah = max(1, len(daftar_path_gambar) // args.laporan_skala)
+        sampel = daftar_path_gambar[::langkah][:args.laporan_skala]
+        print(f"Membandingkan skala decode pada {len(sampel)} gambar sampel...")
+        with pd.option_context('display.max_columns', None, 'display.width', 200):
+            print(laporan_error_skala(sampel).T)
+        exit()
+
+    print(f"Memulai pemrosesan {len(daftar_path_gambar)} gambar di folder: {folder_input_gambar}")
+    if args.tanpa_cache:
+        kumpulan_semua_fitur = ekstrak_fitur_batch(daftar_path_gambar, jumlah_worker=args.workers,
+                                                   ukuran_chunk=args.chunk,
+                                                   skala_decode=args.skala_decode)
+    else:
+        conn_cache = cache_fitur.buka_cache(args.cache)
+        path_perlu_diproses, path_dihapus, info_stat = cache_fitur.periksa_perubahan(
+            conn_cache, folder_input_gambar, daftar_path_gambar, args.skala_decode)
+        print(f"  Cache: {len(daftar_path_gambar) - len(path_perlu_diproses)} gambar tidak berubah, "
+              f"{len(path_perlu_diproses)} baru/berubah, {len(path_dihapus)} dihapus.")
+
+        fitur_baru = []
+        if path_perlu_diproses:
+            fitur_baru = ekstrak_fitur_batch(path_perlu_diproses, jumlah_worker=args.workers,
+                                             ukuran_chunk=args.chunk,
+                                             skala_decode=args.skala_decode)
+            cache_fitur.simpan_ke_cache(conn_cache, path_perlu_diproses, fitur_baru, info_stat,
+                                        args.skala_decode)
+        if path_dihapus:
+            cache_fitur.hapus_dari_cache(conn_cache, path_dihapus)
+
+        # Gagal baca tidak disimpan di cache, tapi tetap muncul di CSV sebagai -1
+        fitur_gagal_baca = {path: fitur for path, fitur in zip(path_perlu_diproses, fitur_baru)
+                            if fitur['area_terang_ditemukan'] == -1}
+        kumpulan_semua_fitur = cache_fitur.ambil_fitur(conn_cache, daftar_path_gambar, fitur_gagal_baca)
+        conn_cache.close()
+
+    if not kumpulan_semua_fitur:
+        print("Tidak ada gambar yang diproses atau tidak ada fitur yang dapat diekstrak.")
+        exit()
+
+    jumlah_gagal = sum(1 for fitur in kumpulan_semua_fitur if fitur['area_terang_ditemukan'] == -1)
+    if jumlah_gagal:
+        print(f"Peringatan: {jumlah_gagal} gambar gagal dibaca (area_terang_ditemukan = -1).")
+
+    # Konversi list of dictionaries ke Pandas DataFrame untuk kemudahan analisis dan penyimpanan
+    df_hasil_fitur = pd.DataFrame(kumpulan_semua_fitur)
+
+    # Tampilkan beberapa baris pertama dari DataFrame
+    print("\n--- Hasil Ekstraksi Fitur (Beberapa Baris Awal) ---")
+    print(df_hasil_fitur.head())
+
+    # Simpan DataFrame ke file CSV
+    try:
+        df_hasil_fitur.to_csv(path_output_csv, index=False)
+        print(f"\nFitur berhasil diekstrak dan disimpan ke file CSV: {path_output_csv}")
+    except Exception as e:
+        print(f"\nTerjadi error saat menyimpan file CSV: {e}")
+        print("Pastikan Anda memiliki izin tulis di lokasi tersebut.")
+        print("DataFrame yang akan disimpan:")
+        print(df_hasil_fitur)
+
+    # Sinkronkan dataset biner untuk pelatihan: hanya baris baru/berubah yang ditambahkan,
+    # gambar yang sudah dihapus dari folder dibuang. Dikunci dengan path relatif, bukan
+    # nama file saja, agar gambar bernama sama di folder lain tidak tertimpa.
+    if not args.tanpa_dataset:
+        try:
+            baris_dataset = [dict(fitur, nama_file=dataset_fitur.kunci_file(path_gambar, args.dataset))
+                             for path_gambar, fitur in zip(daftar_path_gambar, kumpulan_semua_fitur)]
+            ditambah, dihapus = dataset_fitur.sinkronkan_folder(args.dataset, folder_input_gambar, baris_dataset,
+                                                                tulis_ulang=args.tanpa_cache)
+            print(f"Dataset {args.dataset}: {ditambah} baris baru/berubah, {dihapus} baris dihapus.")
+        except Exception as e:
+            print(f"\nTerjadi error saat menulis dataset: {e}")
@@ -0,0 +1,155 @@
+import cv2
+import os
+import time
+import argparse
+import numpy as np
+import pandas as pd
+from ekstraksi_fitur_cahaya import hitung_fitur_kontur
+
+def _kontur_di_area(gambar_gray, gambar_thresh, offset):
+    # Otsu + kontur terluar pada (sub)gambar; offset menggeser koordinat
+    # kontur ke koordinat frame penuh. Hasil threshold ditulis ke buffer
+    # gambar_thresh (view dengan ukuran sama) tanpa alokasi baru.
+    cv2.threshold(gambar_gray, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU, dst=gambar_thresh)
+    kontur, _ = cv2.findContours(gambar_thresh, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE,
+                                 offset=offset)
+    return kontur
+
+def _hitung_roi(fitur, lebar_img, tinggi_img, margin_roi, margin_min):
+    # ROI = bounding box area terang sebelumnya, diperbesar margin_roi kali
+    # ukurannya di setiap sisi (minimal margin_min piksel).
+    bx = fitur['bbox_x_norm'] * lebar_img
+    by = fitur['bbox_y_norm'] * tinggi_img
+    bw = fitur['bbox_w_norm'] * lebar_img
+    bh = fitur['bbox_h_norm'] * tinggi_img
+    mx = max(margin_min, bw * margin_roi)
+    my = max(margin_min, bh * margin_roi)
+    x0 = max(0, int(bx - mx))
+    y0 = max(0, int(by - my))
+    x1 = min(lebar_img, int(np.ceil(bx + bw + mx)))
+    y1 = min(tinggi_img, int(np.ceil(by + bh + my)))
+    return x0, y0, x1, y1
+
+def _menyentuh_tepi_roi(fitur, roi, lebar_img, tinggi_img):
+    # Jika bounding box menempel ke tepi ROI (yang bukan tepi frame), area
+    # terang kemungkinan terpotong dan harus dicari ulang di frame penuh.
+    x0, y0, x1, y1 = roi
+    bx = round(fitur['bbox_x_norm'] * lebar_img)
+    by = round(fitur['bbox_y_norm'] * tinggi_img)
+    bx1 = bx + round(fitur['bbox_w_norm'] * lebar_img)
+    by1 = by + round(fitur['bbox_h_norm'] * tinggi_img)
+    return ((x0 > 0 and bx <= x0) or (y0 > 0 and by <= y0) or
+            (x1 < lebar_img and bx1 >= x1) or (y1 < tinggi_img and by1 >= y1))
+
+def ekstrak_fitur_stream(sumber, gunakan_roi=True, margin_roi=1.0, margin_min=16):
+    """
+    Mengekstrak fitur area terang dari video atau urutan frame secara streaming.
+
+    Sumber dibaca dengan cv2.VideoCapture, jadi bisa berupa file video
+    (mis. 'sesi.mp4') maupun pola urutan gambar (mis. 'frame_%05d.png').
+    Buffer frame, grayscale dan threshold dialokasikan sekali lalu dipakai ulang.
+
+    Jika gunakan_roi aktif, area terang dicari di sekitar posisi sebelumnya
+    saja. Threshold Otsu dihitung pada ROI tersebut, sehingga nilainya bisa
+    sedikit berbeda dari Otsu frame penuh. Pencarian kembali ke frame penuh
+    jika area terang hilang atau terpotong di tepi ROI.
+
+    Args:
+        sumber (str): Path video atau pola urutan frame.
+        gunakan_roi (bool): Aktifkan pelacakan ROI.
+        margin_roi (float): Margin ROI relatif terhadap ukuran bounding box.
+        margin_min (int): Margin ROI minimum dalam piksel.
+
+    Yields:
+        dict: Fitur per frame (kolom sama dengan ekstrak_fitur_area_terang,
+              ditambah 'frame', 'waktu_ms' dan 'pakai_roi').
+    """
+    cap = cv2.VideoCapture(sumber)
+    if not cap.isOpened():
+        print(f"Error: Tidak dapat membuka sumber video {sumber}")
+        return
+
+    nama_sumber = os.path.basename(sumber)
+    frame = None
+    gambar_gray = None
+    gambar_thresh = None
+    roi = None
+    indeks_frame = 0
+    try:
+        while True:
+            ok, frame = cap.read(frame)
+            if not ok:
+                break
+
+            if frame.ndim == 2:
+                gambar_gray = frame
+            else:
+                if gambar_gray is None or gambar_gray.shape != frame.shape[:2]:
+                    gambar_gray = np.empty(frame.shape[:2], dtype=np.uint8)
+                cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY, dst=gambar_gray)
+            tinggi_img, lebar_img = gambar_gray.shape
+            if gambar_thresh is None or gambar_thresh.shape != gambar_gray.shape:
+                gambar_thresh = np.empty_like(gambar_gray)
+
+            fitur = None
+            if roi is not None:
+                x0, y0, x1, y1 = roi
+                kontur = _kontur_di_area(gambar_gray[y0:y1, x0:x1], gambar_thresh[y0:y1, x0:x1], (x0, y0))
+                if kontur:
+                    fitur = hitung_fitur_kontur(kontur, nama_sumber, lebar_img, tinggi_img)
+                    if _menyentuh_tepi_roi(fitur, roi, lebar_img, tinggi_img):
+                        fitur = None
+            pakai_roi = fitur is not None
+
+            if fitur is None:
+                # Fallback: cari di frame penuh
+                kontur = _kontur_di_area(gambar_gray, gambar_thresh, (0, 0))
+                fitur = hitung_fitur_kontur(kontur, nama_sumber, lebar_img, tinggi_img)
+
+            if gunakan_roi and fitur['area_terang_ditemukan'] == 1:
+                roi = _hitung_roi(fitur, lebar_img, tinggi_img, margin_roi, margin_min)
+            else:
+                roi = None
+
+            fitur['frame'] = indeks_frame
+            fitur['waktu_ms'] = cap.get(cv2.CAP_PROP_POS_MSEC)
+            fitur['pakai_roi'] = int(pakai_roi)
+            indeks_frame += 1
+            yield fitur
+    finally:
+        cap.release()
+
+# --- Program Utama ---
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Ekstraksi fitur area terang dari video/urutan frame.")
+    parser.add_argument('sumber', help="File video atau pola urutan frame (mis. 'frame_%%05d.png').")
+    parser.add_argument('--output', default="fitur_area_terang_video.csv",
+                        help="Nama file CSV output.")
+    parser.add_argument('--tanpa-roi', action='store_true',
+                        help="Selalu proses frame penuh (tanpa pelacakan ROI).")
+    parser.add_argument('--margin-roi', type=float, default=1.0,
+                        help="Margin ROI relatif terhadap ukuran bounding box sebelumnya.")
+    args = parser.parse_args()
+
+    print(f"Memulai ekstraksi streaming dari: {args.sumber}")
+    waktu_mulai = time.perf_counter()
+    kumpulan_semua_fitur = list(ekstrak_fitur_stream(args.sumber, gunakan_roi=not args.tanpa_roi,
+                                                     margin_roi=args.margin_roi))
+    durasi = time.perf_counter() - waktu_mulai
+
+    if not kumpulan_semua_fitur:
+        print("Tidak ada frame yang diproses.")
+        exit()
+
+    df_hasil_fitur = pd.DataFrame(kumpulan_semua_fitur)
+    print(f"{len(df_hasil_fitur)} frame diproses dalam {durasi:.2f} detik "
+          f"({len(df_hasil_fitur) / durasi:.1f} frame/detik, "
+          f"{df_hasil_fitur['pakai_roi'].mean() * 100:.0f}% memakai ROI).")
+    print(df_hasil_fitur.head())
+
+    path_output_csv = os.path.join(os.getcwd(), args.output)
+    try:
+        df_hasil_fitur.to_csv(path_output_csv, index=False)
+        print(f"\nFitur berhasil disimpan ke file CSV: {path_output_csv}")
+    except Exception as e:
+        print(f"\nTerjadi error saat menyimpan file CSV: {e}")
@@ -0,0 +1,175 @@
+import sys
+import json
+import math
+import zlib
+import struct
+from array import array
+
+# Encoding biner kolumnar untuk batch telemetri tracker (kirimDataKePC di servo.ino).
+#
+# Satu pesan MQTT membawa banyak pembacaan sekaligus:
+#
+#   header (16 byte, versi 2: 28 byte; little-endian)
+#     magic    4s   b'TLM\0'
+#     versi    B    VERSI_FORMAT
+#     flag     B    bit 0 = badan dikompres zlib, bit 1 = ada waktu_kirim
+#     jumlah   H    jumlah pembacaan N
+#     t0       d    waktu (epoch detik) pembacaan pertama
+#     id_spool I    (versi 2) identitas spool bridge
+#     seq0     Q    (versi 2) nomor urut pembacaan pertama
+#     waktu_kirim d (jika flag bit 1) waktu publish di bridge, untuk latensi
+#   badan
+#     offset   N x uint32   milidetik sejak t0
+#     seq      N x uint32   (versi 2) selisih seq terhadap seq0
+#     kolom    5 x N x float32, urutan KOLOM_TELEMETRI
+#
+# Versi 2 membawa nomor urut dari spool bridge (lihat spool_telemetri.py) agar
+# subscriber bisa membuang duplikat setelah bridge mengirim ulang.
+#
+# Satu pembacaan = 24 byte (JSON ~130 byte); kolom yang nyaris konstan (sudut
+# servo) dikompres zlib dengan baik. Decoder juga menerima payload JSON lama
+# sehingga bridge lama dan baru bisa berjalan bersamaan.
+
+MAGIC = b'TLM\0'
+VERSI_FORMAT = 1
+VERSI_FORMAT_SEQ = 2
+FLAG_ZLIB = 0x01
+FLAG_WAKTU_KIRIM = 0x02
+FORMAT_HEADER = '<4sBBHd'
+FORMAT_HEADER_SEQ = '<IQ' # Lanjutan header versi 2
+UKURAN_HEADER = struct.calcsize(FORMAT_HEADER)
+UKURAN_HEADER_SEQ = struct.calcsize(FORMAT_HEADER_SEQ)
+MAKS_JUMLAH = 0xFFFF
+
+KOLOM_TELEMETRI = [
+    'koordinat_x',
+    'koordinat_y',
+    'tegangan_v',
+    'rotasi_azimuth_deg',
+    'rotasi_elevasi_deg',
+]
+
+def _ke_little_endian(arr):
+    if sys.byteorder != 'little':
+        arr.byteswap()
+    return arr
+
+def enkode_batch(daftar_waktu, daftar_data, kompres=True, daftar_seq=None, id_spool=0, waktu_kirim=None):
+    """
+    Mengenkode sekumpulan pembacaan menjadi satu payload biner.
+
+    Args:
+        daftar_waktu (list): Waktu baca tiap pembacaan (epoch detik, naik).
+        daftar_data (list): Dict per pembacaan berisi kolom KOLOM_TELEMETRI;
+                            kolom yang tidak ada diisi NaN.
+        kompres (bool): Kompres badan pesan dengan zlib.
+        daftar_seq (list): Nomor urut tiap pembacaan (naik); jika diberikan,
+                           payload ditulis dengan format versi 2.
+        id_spool (int): Identitas spool bridge (versi 2).
+        waktu_kirim (float): Waktu publish (epoch detik) untuk mengukur latensi
+                             publish -> terima di subscriber.
+
+    Returns:
+        bytes: Payload siap dipublikasikan.
+    """
+    jumlah = len(daftar_data)
+    if jumlah != len(daftar_waktu):
+        raise ValueError("Jumlah waktu dan data tidak sama.")
+    if jumlah > MAKS_JUMLAH:
+        raise ValueError(f"Batch terlalu besar ({jumlah} > {MAKS_JUMLAH}).")
+    t0 = daftar_waktu[0] if jumlah else 0.0
+
+    badan = _ke_little_endian(array('I', (max(0, round((t - t0) * 1000)) for t in daftar_waktu))).tobytes()
+    header_seq = b''
+    versi = VERSI_FORMAT
+    if daftar_seq is not None:
+        seq0 = daftar_seq[0] if jumlah else 0
+        badan += _ke_little_endian(array('I', (seq - seq0 for seq in daftar_seq))).tobytes()
+        header_seq = struct.pack(FORMAT_HEADER_SEQ, id_spool, seq0)
+        versi = VERSI_FORMAT_SEQ
+    for kolom in KOLOM_TELEMETRI:
+        nilai = array('f', (float(data.get(kolom, math.nan)) for data in daftar_data))
+        badan += _ke_little_endian(nilai).tobytes()
+
+    flag = 0
+    if waktu_kirim is not None:
+        header_seq += struct.pack('<d', waktu_kirim)
+        flag |= FLAG_WAKTU_KIRIM
+    if kompres:
+        badan_kompres = zlib.compress(badan, 6)
+        if len(badan_kompres) < len(badan):
+            badan = badan_kompres
+            flag |= FLAG_ZLIB
+    return struct.pack(FORMAT_HEADER, MAGIC, versi, flag, jumlah, t0) + header_seq + badan
+
+def adalah_biner(payload):
+    return payload[:len(MAGIC)] == MAGIC
+
+def dekode_kolom(payload):
+    """
+    Mendekode payload biner menjadi kolom.
+
+    Untuk payload versi 2, dict kolom juga berisi 'seq' (list int) dan
+    'spool' (list id_spool); jika ada waktu publish, juga 'waktu_kirim'.
+
+    Returns:
+        tuple: (list waktu epoch detik, dict nama kolom -> list float)
+    """
+    if len(payload) < UKURAN_HEADER:
+        raise ValueError("Payload terlalu pendek.")
+    magic, versi, flag, jumlah, t0 = struct.unpack_from(FORMAT_HEADER, payload)
+    if magic != MAGIC:
+        raise ValueError("Magic payload tidak dikenal.")
+    if versi not in (VERSI_FORMAT, VERSI_FORMAT_SEQ):
+        raise ValueError(f"Versi format telemetri {versi} tidak didukung.")
+    awal_badan = UKURAN_HEADER
+    if versi == VERSI_FORMAT_SEQ:
+        if len(payload) < UKURAN_HEADER + UKURAN_HEADER_SEQ:
+            raise ValueError("Payload terlalu pendek.")
+        id_spool, seq0 = struct.unpack_from(FORMAT_HEADER_SEQ, payload, UKURAN_HEADER)
+        awal_badan += UKURAN_HEADER_SEQ
+    if flag & FLAG_WAKTU_KIRIM:
+        if len(payload) < awal_badan + 8:
+            raise ValueError("Payload terlalu pendek.")
+        waktu_kirim, = struct.unpack_from('<d', payload, awal_badan)
+        awal_badan += 8
+    badan = payload[awal_badan:]
+    if flag & FLAG_ZLIB:
+        badan = zlib.decompress(badan)
+    jumlah_kolom_int = 2 if versi == VERSI_FORMAT_SEQ else 1
+    if len(badan) != jumlah * 4 * (jumlah_kolom_int + len(KOLOM_TELEMETRI)):
+        raise ValueError("Ukuran badan payload tidak sesuai jumlah pembacaan.")
+
+    offset = _ke_little_endian(array('I', badan[:jumlah * 4]))
+    waktu = [t0 + ms / 1000.0 for ms in offset]
+    kolom = {}
+    if versi == VERSI_FORMAT_SEQ:
+        selisih_seq = _ke_little_endian(array('I', badan[jumlah * 4:2 * jumlah * 4]))
+        kolom['seq'] = [seq0 + d for d in selisih_seq]
+        kolom['spool'] = [id_spool] * jumlah
+    if flag & FLAG_WAKTU_KIRIM:
+        kolom['waktu_kirim'] = [waktu_kirim] * jumlah
+    for i, nama in enumerate(KOLOM_TELEMETRI, start=jumlah_kolom_int):
+        kolom[nama] = _ke_little_endian(array('f', badan[i * jumlah * 4:(i + 1) * jumlah * 4])).tolist()
+    return waktu, kolom
+
+def dekode_pesan(payload):
+    """
+    Mendekode payload MQTT (biner batch atau JSON satu pembacaan) menjadi list dict.
+
+    Dict hasil dekode biner berisi kolom KOLOM_TELEMETRI ditambah 'waktu'
+    (waktu baca di bridge, epoch detik), untuk versi 2 'seq' dan 'spool', serta
+    'waktu_kirim' (waktu publish) jika ada.
+
+    Args:
+        payload (bytes): msg.payload dari paho.
+
+    Returns:
+        list: Dict per pembacaan.
+    """
+    if adalah_biner(payload):
+        waktu, kolom = dekode_kolom(payload)
+        return [{'waktu': t, **{nama: nilai[i] for nama, nilai in kolom.items()}}
+                for i, t in enumerate(waktu)]
+    data = json.loads(payload.decode('utf-8'))
+    return data if isinstance(data, list) else [data]
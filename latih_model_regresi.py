@@ -1,260 +1,572 @@
-import pandas as pd
-import numpy as np
-from sklearn.model_selection import train_test_split
-from sklearn.linear_model import LinearRegression
-from sklearn.ensemble import RandomForestRegressor
-from sklearn.metrics import mean_squared_error, r2_score
-import matplotlib.pyplot as plt
-import itertools # Untuk membuat kombinasi grid search
-
-print("Script dimulai")
-# --- 1. Memuat Data dari File Excel ---
-try:
-    nama_file_excel = 'fitur_area_terang_hasil_ekstraksi.xlsx' # Pastikan nama file ini benar
-    # Pastikan juga nama sheet benar, atau hapus sheet_name jika hanya ada satu sheet default
-    df = pd.read_excel(nama_file_excel, sheet_name='Sheet1') 
-    print("Data berhasil dimuat dari Excel.")
-    print("Jumlah baris data awal:", len(df))
-    print("Nama kolom:", df.columns.tolist())
-except FileNotFoundError:
-    print(f"Error: File '{nama_file_excel}' tidak ditemukan. Pastikan path dan nama file benar.")
-    exit()
-except Exception as e:
-    print(f"Error saat memuat data: {e}")
-    exit()
-
-# --- 2. Eksplorasi Data Awal ---
-print("\n## Eksplorasi Data Awal ##")
-print("Beberapa baris pertama data Anda:")
-print(df.head())
-print("\nInformasi mengenai kolom data:")
-df.info()
-print("\nStatistik deskriptif data numerik:")
-print(df.describe())
-
-# --- 3. Pemilihan Fitur (X) dan Target (y) ---
-kolom_fitur_cahaya = [
-    'pusat_x_norm', 
-    'pusat_y_norm', 
-    'area_norm'
-    # Tambahkan fitur lain jika ada dan relevan, misal: 'bbox_w_norm', 'bbox_h_norm'
-]
-nama_kolom_tegangan = 'Tegangan' # PASTIKAN NAMA KOLOM INI SESUAI DENGAN FILE EXCEL ANDA
-
-# Validasi kolom
-kolom_yang_diperlukan = kolom_fitur_cahaya + [nama_kolom_tegangan]
-for kolom in kolom_yang_diperlukan:
-    if kolom not in df.columns:
-        print(f"\nError: Kolom '{kolom}' tidak ditemukan dalam file Excel Anda.")
-        print("Kolom yang tersedia adalah:", df.columns.tolist())
-        exit()
-
-# Hapus baris dengan nilai NaN
-df_bersih = df.dropna(subset=kolom_yang_diperlukan).copy() # Gunakan .copy() untuk menghindari SettingWithCopyWarning
-if len(df_bersih) < len(df):
-    print(f"\n{len(df) - len(df_bersih)} baris data dengan nilai kosong (NaN) telah dihapus.")
-if len(df_bersih) < 10: # Butuh cukup data untuk split dan train yang berarti
-    print(f"Error: Tidak cukup data (hanya {len(df_bersih)} baris) setelah menghapus nilai kosong. Model mungkin tidak bisa dilatih dengan baik.")
-    # Anda mungkin ingin keluar di sini jika datanya terlalu sedikit, atau setidaknya waspada
-    if len(df_bersih) < 2: exit()
-
-
-X = df_bersih[kolom_fitur_cahaya]
-y = df_bersih[nama_kolom_tegangan]
-
-print(f"\nJumlah sampel data yang akan digunakan untuk pelatihan: {len(X)}")
-if len(X) == 0:
-    print("Tidak ada data untuk dilatih. Skrip berhenti.")
-    exit()
-
-# --- 4. Pembagian Data ---
-# Pastikan ada cukup data untuk dibagi
-if len(X) < 5: # Misalnya, minimal 5 sampel untuk bisa dibagi
-    print("Jumlah data terlalu sedikit untuk dibagi menjadi training dan testing set.")
-    # Jika sangat sedikit, mungkin gunakan semua data untuk training dan evaluasi secara kualitatif
-    # atau pertimbangkan cross-validation jika datanya sedikit lebih banyak.
-    # Untuk contoh ini, kita akan lanjutkan, tapi ini adalah peringatan.
-    X_train, X_test, y_train, y_test = X, X, y, y # Gunakan semua data jika sangat sedikit
-else:
-    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
-
-print(f"Jumlah data latih: {len(X_train)}")
-print(f"Jumlah data uji: {len(X_test)}")
-
-# --- 5. Pemilihan dan Pelatihan Model Regresi ---
-
-# A. Model Regresi Linear
-print("\n\n## OUTPUT 1: Interpretasi Model Regresi Linear ##")
-model_linear = LinearRegression()
-model_linear.fit(X_train, y_train)
-
-if X_train.shape[1] == 1:
-    k_linear = model_linear.coef_[0]
-    intercept_linear = model_linear.intercept_
-    print(f"Koefisien (k) dari Regresi Linear: {k_linear:.4f}")
-    print(f"Intercept (c) dari Regresi Linear: {intercept_linear:.4f}")
-    print(f"Persamaan: Tegangan ≈ {k_linear:.4f} * [{X_train.columns[0]}] + {intercept_linear:.4f}")
-else:
-    print("Koefisien (bobot fitur) dari Regresi Linear:")
-    for fitur, koef in zip(kolom_fitur_cahaya, model_linear.coef_):
-        print(f"  - Fitur '{fitur}': {koef:.4f}")
-    print(f"Intercept (c) dari Regresi Linear: {model_linear.intercept_:.4f}")
-
-# B. Model Random Forest Regressor
-print("\n\n## OUTPUT 2: Pentingnya Fitur dari Model Random Forest ##")
-model_rf = RandomForestRegressor(n_estimators=100, random_state=42, oob_score=True, n_jobs=-1)
-model_rf.fit(X_train, y_train)
-print(f"Random Forest OOB Score (mirip R^2 pada data training): {model_rf.oob_score_:.4f}")
-
-if hasattr(model_rf, 'feature_importances_'):
-    print("Pentingnya Fitur dari Random Forest:")
-    importances = sorted(zip(kolom_fitur_cahaya, model_rf.feature_importances_), key=lambda x: x[1], reverse=True)
-    for fitur, importansi in importances:
-        print(f"  - Fitur '{fitur}': {importansi:.4f}")
-
-# --- 6. Evaluasi Model ---
-
-# Evaluasi Model Linear
-y_pred_linear_train = model_linear.predict(X_train)
-y_pred_linear_test = model_linear.predict(X_test)
-mse_linear_train = mean_squared_error(y_train, y_pred_linear_train)
-r2_linear_train = r2_score(y_train, y_pred_linear_train)
-mse_linear_test = mean_squared_error(y_test, y_pred_linear_test) if len(X_test)>0 else np.nan
-r2_linear_test = r2_score(y_test, y_pred_linear_test) if len(X_test)>0 else np.nan
-
-print("\n\n## OUTPUT 3: Evaluasi Model Regresi Linear ##")
-print(f"  Training - RMSE: {np.sqrt(mse_linear_train):.4f}, R^2: {r2_linear_train:.4f}")
-if len(X_test) > 0:
-    print(f"  Testing  - RMSE: {np.sqrt(mse_linear_test):.4f}, R^2: {r2_linear_test:.4f}")
-else:
-    print("  Testing  - Tidak ada data uji untuk evaluasi.")
-
-
-# Evaluasi Model Random Forest
-y_pred_rf_train = model_rf.predict(X_train)
-y_pred_rf_test = model_rf.predict(X_test)
-mse_rf_train = mean_squared_error(y_train, y_pred_rf_train)
-r2_rf_train = r2_score(y_train, y_pred_rf_train)
-mse_rf_test = mean_squared_error(y_test, y_pred_rf_test) if len(X_test)>0 else np.nan
-r2_rf_test = r2_score(y_test, y_pred_rf_test) if len(X_test)>0 else np.nan
-
-print("\n\n## OUTPUT 4: Evaluasi Model Random Forest Regressor ##")
-print(f"  Training - RMSE: {np.sqrt(mse_rf_train):.4f}, R^2: {r2_rf_train:.4f}")
-if len(X_test) > 0:
-    print(f"  Testing  - RMSE: {np.sqrt(mse_rf_test):.4f}, R^2: {r2_rf_test:.4f}")
-else:
-    print("  Testing  - Tidak ada data uji untuk evaluasi.")
-
-# --- 7. Visualisasi (Opsional, tapi berguna) ---
-if len(X_test) > 0:
-    model_terbaik_untuk_plot = model_rf # Asumsi RF lebih baik, bisa diganti
-    pred_terbaik_untuk_plot = y_pred_rf_test
-    nama_model_plot = "Random Forest"
-    
-    # Jika model linear lebih baik (berdasarkan R^2 test), gunakan itu untuk plot
-    if r2_linear_test > r2_rf_test:
-        model_terbaik_untuk_plot = model_linear
-        pred_terbaik_untuk_plot = y_pred_linear_test
-        nama_model_plot = "Regresi Linear"
-
-    plt.figure(figsize=(10, 6))
-    plt.scatter(y_test, pred_terbaik_untuk_plot, alpha=0.7, edgecolors='k', label='Prediksi vs Aktual')
-    min_val = min(y_test.min(), pred_terbaik_untuk_plot.min())
-    max_val = max(y_test.max(), pred_terbaik_untuk_plot.max())
-    plt.plot([min_val, max_val], [min_val, max_val], '--k', lw=2, label='Prediksi Sempurna (y=x)')
-    plt.xlabel("Tegangan Aktual (Volt) - Data Uji")
-    plt.ylabel(f"Tegangan Prediksi ({nama_model_plot}) (Volt)")
-    plt.title(f"Perbandingan Tegangan Aktual vs. Prediksi ({nama_model_plot})")
-    plt.legend()
-    plt.grid(True)
-    plt.tight_layout()
-    plt.show()
-else:
-    print("\nVisualisasi tidak ditampilkan karena tidak ada data uji.")
-
-# --- BARU: Mencari Titik Penghasil Tegangan Maksimal ---
-print("\n\n## OUTPUT 5: Mencari Titik Penghasil Tegangan Maksimal ##")
-
-# Pendekatan 1: Berdasarkan Data Aktual yang Diobservasi
-print("\n--- A. Berdasarkan Data Aktual ---")
-if not df_bersih.empty:
-    idx_max_tegangan_aktual = df_bersih[nama_kolom_tegangan].idxmax()
-    data_optimal_aktual = df_bersih.loc[idx_max_tegangan_aktual]
-    
-    print(f"Tegangan aktual maksimum yang terobservasi: {data_optimal_aktual[nama_kolom_tegangan]:.4f} Volt")
-    print("Pada kondisi fitur cahaya (aktual):")
-    for fitur in kolom_fitur_cahaya:
-        print(f"  - {fitur}: {data_optimal_aktual[fitur]:.4f}")
-else:
-    print("Tidak ada data bersih untuk dianalisis.")
-
-# Pendekatan 2: Berdasarkan Prediksi Model AI Terbaik (misalnya Random Forest)
-print("\n--- B. Berdasarkan Prediksi Model AI Terbaik (Random Forest) ---")
-# Kita akan membuat grid sederhana dari nilai fitur dan mencari prediksi tertinggi
-# Tentukan model terbaik (misalnya, berdasarkan R^2 pada data test)
-model_terbaik = model_rf
-nama_model_terbaik = "Random Forest"
-if len(X_test)>0 and r2_linear_test > r2_rf_test: # Hanya bandingkan jika ada data test
-    model_terbaik = model_linear
-    nama_model_terbaik = "Regresi Linear"
-print(f"Menggunakan model terbaik: {nama_model_terbaik} (berdasarkan R^2 test jika ada, jika tidak default ke RF)")
-
-# Buat rentang nilai untuk setiap fitur untuk dijelajahi
-# Gunakan min dan max dari data aktual sebagai batas, dan bagi menjadi beberapa titik
-# Jumlah titik per fitur (N_POINTS) bisa disesuaikan. Semakin banyak, semakin lama tapi detail.
-N_POINTS_PER_FEATURE = 5 # Kurangi jika ingin lebih cepat, tambah jika ingin lebih detail
-
-grid_search_values = []
-for fitur in kolom_fitur_cahaya:
-    if X[fitur].nunique() > 1: # Hanya buat linspace jika ada lebih dari 1 nilai unik
-        grid_search_values.append(np.linspace(X[fitur].min(), X[fitur].max(), N_POINTS_PER_FEATURE))
-    else: # Jika hanya satu nilai unik, gunakan nilai itu saja
-        grid_search_values.append(np.array([X[fitur].unique()[0]]))
-
-# Buat semua kombinasi fitur dari grid
-kombinasi_fitur = list(itertools.product(*grid_search_values))
-df_grid_search = pd.DataFrame(kombinasi_fitur, columns=kolom_fitur_cahaya)
-
-print(f"Melakukan prediksi pada {len(df_grid_search)} kombinasi fitur (grid search)...")
-
-# Prediksi menggunakan model terbaik
-prediksi_tegangan_grid = model_terbaik.predict(df_grid_search)
-df_grid_search['prediksi_tegangan'] = prediksi_tegangan_grid
-
-# Cari baris dengan prediksi tegangan tertinggi
-idx_max_prediksi = df_grid_search['prediksi_tegangan'].idxmax()
-data_optimal_prediksi = df_grid_search.loc[idx_max_prediksi]
-
-print(f"Prediksi tegangan maksimum oleh model ({nama_model_terbaik}): {data_optimal_prediksi['prediksi_tegangan']:.4f} Volt")
-print(f"Pada kondisi fitur cahaya (prediksi model {nama_model_terbaik}):")
-for fitur in kolom_fitur_cahaya:
-    print(f"  - {fitur}: {data_optimal_prediksi[fitur]:.4f}")
-
-
-# --- Contoh Penggunaan Model untuk Prediksi Baru (Bagian ini sudah ada sebelumnya) ---
-print("\n\n--- Contoh Prediksi untuk Data Cahaya Baru (Menggunakan model terlatih) ---")
-if len(kolom_fitur_cahaya) == X_train.shape[1]: # Pastikan jumlah fitur benar
-    # Buat contoh data baru dengan nilai tengah untuk posisi dan area sedang
-    contoh_input_dict = {}
-    for i, fitur in enumerate(kolom_fitur_cahaya):
-        if X[fitur].nunique() > 1:
-             contoh_input_dict[fitur] = (X[fitur].min() + X[fitur].max()) / 2 # Nilai tengah dari data asli
-        else:
-             contoh_input_dict[fitur] = X[fitur].unique()[0]
-        if 'area' in fitur: # Jika area, mungkin nilai yang lebih kecil
-            contoh_input_dict[fitur] = contoh_input_dict[fitur] * 0.5 
-
-
-    data_cahaya_baru_list = [list(contoh_input_dict.values())]
-    data_cahaya_baru = pd.DataFrame(data_cahaya_baru_list, columns=kolom_fitur_cahaya)
-    
-    prediksi_linear_baru = model_linear.predict(data_cahaya_baru)
-    prediksi_rf_baru = model_rf.predict(data_cahaya_baru)
-    
-    print(f"Data Input Baru: {data_cahaya_baru.iloc[0].to_dict()}")
-    print(f"  Prediksi Tegangan (Regresi Linear): {prediksi_linear_baru[0]:.2f} Volt")
-    print(f"  Prediksi Tegangan (Random Forest): {prediksi_rf_baru[0]:.2f} Volt")
-else:
-    print("Jumlah fitur untuk contoh prediksi baru tidak sesuai dengan model yang dilatih.")
-
-print("\nScript selesai.")
\ No newline at end of file
+import os
+import sys
+import json
+import time
+import hashlib
+import argparse
+
+# Pelatihan model regresi tegangan dalam tahap-tahap terpisah:
+#
+#   load -> fit -> evaluate -> optimize -> predict
+#
+# Setiap tahap menyimpan hasilnya di folder cache (default .cache_latih) beserta
+# kunci yang diturunkan dari input tahap tersebut. Tahap yang diminta akan
+# menjalankan ulang tahap sebelumnya hanya jika cache-nya tidak ada atau basi.
+# Modul berat (pandas, sklearn, matplotlib) hanya di-import oleh tahap yang
+# membutuhkannya, jadi 'predict' atau 'optimize' saja bisa langsung memakai
+# artefak model tanpa memuat sklearn.
+#
+# Contoh:
+#   python latih_model_regresi.py                    # semua tahap
+#   python latih_model_regresi.py predict --input 0.46,0.10,0.02
+#   python latih_model_regresi.py optimize --n-titik 40
+
+TAHAP = ['load', 'fit', 'evaluate', 'optimize', 'predict']
+DEPENDENSI = {
+    'load': [],
+    'fit': ['load'],
+    'evaluate': ['load', 'fit'],
+    'optimize': ['load', 'fit', 'evaluate'],
+    'predict': ['load', 'fit'],
+}
+
+KOLOM_FITUR_DEFAULT = [
+    'pusat_x_norm',
+    'pusat_y_norm',
+    'area_norm'
+    # Tambahkan fitur lain jika ada dan relevan, misal: 'bbox_w_norm', 'bbox_h_norm'
+]
+NAMA_KOLOM_TEGANGAN = 'Tegangan' # PASTIKAN NAMA KOLOM INI SESUAI DENGAN DATA ANDA
+# Sama dengan pencarian_optimum.ANGGARAN_EVALUASI_DEFAULT (tidak di-import agar numpy tidak dimuat di sini)
+ANGGARAN_EVALUASI_DEFAULT = 100_000
+
+# Kandidat seleksi_model.py untuk setiap slot model (--seleksi-model); hanya model
+# yang bisa diekspor ke artefak prediktor_tegangan.py
+KANDIDAT_SLOT = {
+    'linear': ['linear', 'ridge'],
+    'rf': ['random_forest', 'extra_trees'],
+}
+
+def _kunci(*bagian):
+    return hashlib.sha256(json.dumps(bagian, sort_keys=True, default=str).encode('utf-8')).hexdigest()[:16]
+
+def _path_cache(cfg, nama):
+    return os.path.join(cfg.cache, nama)
+
+def _baca_cache(cfg, tahap):
+    try:
+        with open(_path_cache(cfg, f"{tahap}.json")) as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+def _tulis_cache(cfg, tahap, hasil):
+    os.makedirs(cfg.cache, exist_ok=True)
+    path_sementara = _path_cache(cfg, f"{tahap}.json.tmp")
+    with open(path_sementara, 'w') as f:
+        json.dump(hasil, f, indent=2)
+    os.replace(path_sementara, _path_cache(cfg, f"{tahap}.json"))
+
+def _berhenti(pesan):
+    print(pesan)
+    sys.exit(1)
+
+# --- 1. Memuat Data ---
+
+def _sumber_data(cfg):
+    # Utamakan dataset biner hasil ekstraksi (dimuat via memmap, tanpa parsing).
+    # File Excel lama hanya dipakai jika dataset belum ada; gunakan
+    # 'python dataset_fitur.py impor <file.xlsx> <dataset>' untuk memindahkannya sekali.
+    if os.path.exists(cfg.dataset):
+        return cfg.dataset
+    if os.path.exists(cfg.excel):
+        return cfg.excel
+    _berhenti(f"Error: File '{cfg.dataset}' maupun '{cfg.excel}' tidak ditemukan. Pastikan path dan nama file benar.")
+
+def kunci_load(cfg, hasil_sebelumnya):
+    sumber = _sumber_data(cfg)
+    # Penyimpanan telemetri SQLite menulis ke file -wal dulu; ikutkan agar data baru terdeteksi
+    identitas = [(os.stat(path).st_size, os.stat(path).st_mtime_ns)
+                 for path in (sumber, sumber + '-wal') if os.path.exists(path)]
+    return _kunci('load', os.path.abspath(sumber), identitas, cfg.fitur, cfg.target, cfg.sheet)
+
+def hitung_load(cfg, hasil_sebelumnya):
+    import numpy as np
+    import pandas as pd
+    import dataset_fitur
+    import penyimpanan_telemetri
+
+    sumber = _sumber_data(cfg)
+    try:
+        if sumber.lower().endswith(('.xlsx', '.xls')):
+            # Pastikan juga nama sheet benar
+            df = pd.read_excel(sumber, sheet_name=cfg.sheet)
+        elif sumber.lower().endswith('.csv'):
+            df = pd.read_csv(sumber)
+        elif penyimpanan_telemetri.adalah_penyimpanan(sumber):
+            # Pembacaan mentah dari mqtt_sub.py --simpan (tanpa placeholder -1.0)
+            df = penyimpanan_telemetri.muat_dataset(sumber)
+        else:
+            df = dataset_fitur.muat_dataset(sumber)
+    except Exception as e:
+        _berhenti(f"Error saat memuat data: {e}")
+
+    # Validasi kolom
+    kolom_yang_diperlukan = cfg.fitur + [cfg.target]
+    for kolom in kolom_yang_diperlukan:
+        if kolom not in df.columns:
+            _berhenti(f"\nError: Kolom '{kolom}' tidak ditemukan dalam data Anda.\n"
+                      f"Kolom yang tersedia adalah: {df.columns.tolist()}")
+
+    # Hapus baris dengan nilai NaN
+    df_bersih = df.dropna(subset=kolom_yang_diperlukan).copy() # Gunakan .copy() untuk menghindari SettingWithCopyWarning
+    if len(df_bersih) < 2:
+        _berhenti(f"Error: Tidak cukup data (hanya {len(df_bersih)} baris) setelah menghapus nilai kosong.")
+
+    X = df_bersih[cfg.fitur].to_numpy(dtype=np.float64)
+    y = df_bersih[cfg.target].to_numpy(dtype=np.float64)
+    os.makedirs(cfg.cache, exist_ok=True)
+    np.savez(_path_cache(cfg, 'data.npz'), X=X, y=y)
+
+    with pd.option_context('display.width', 160, 'display.max_columns', 20):
+        ringkasan = (f"Beberapa baris pertama data Anda:\n{df.head()}\n\n"
+                     f"Statistik deskriptif data numerik:\n{df.describe()}")
+    return {
+        'sumber': sumber,
+        'jumlah_baris_awal': len(df),
+        'jumlah_baris_bersih': len(df_bersih),
+        'kolom': df.columns.tolist(),
+        'ringkasan': ringkasan,
+        'batas_fitur': {fitur: [float(X[:, i].min()), float(X[:, i].max())] for i, fitur in enumerate(cfg.fitur)},
+    }
+
+def tampilkan_load(cfg, hasil):
+    print(f"Data berhasil dimuat dari '{hasil['sumber']}'.")
+    print("Jumlah baris data awal:", hasil['jumlah_baris_awal'])
+    print("Nama kolom:", hasil['kolom'])
+    # --- 2. Eksplorasi Data Awal ---
+    print("\n## Eksplorasi Data Awal ##")
+    print(hasil['ringkasan'])
+    if hasil['jumlah_baris_bersih'] < hasil['jumlah_baris_awal']:
+        print(f"\n{hasil['jumlah_baris_awal'] - hasil['jumlah_baris_bersih']} baris data dengan nilai kosong (NaN) telah dihapus.")
+    if hasil['jumlah_baris_bersih'] < 10: # Butuh cukup data untuk split dan train yang berarti
+        print(f"Peringatan: Tidak cukup data (hanya {hasil['jumlah_baris_bersih']} baris) setelah menghapus nilai kosong. "
+              "Model mungkin tidak bisa dilatih dengan baik.")
+    print(f"\nJumlah sampel data yang akan digunakan untuk pelatihan: {hasil['jumlah_baris_bersih']}")
+
+def _muat_data(cfg):
+    import numpy as np
+    with np.load(_path_cache(cfg, 'data.npz')) as data:
+        return data['X'], data['y']
+
+# --- 3-5. Pembagian Data dan Pelatihan Model ---
+
+def _versi_sklearn():
+    # Tanpa meng-import sklearn, agar menghitung kunci tetap ringan
+    from importlib.metadata import version, PackageNotFoundError
+    try:
+        return version('scikit-learn')
+    except PackageNotFoundError:
+        return None
+
+def kunci_fit(cfg, hasil_sebelumnya):
+    return _kunci('fit', hasil_sebelumnya['load']['kunci'], cfg.test_size, cfg.random_state, cfg.n_estimators,
+                  cfg.seleksi_model, cfg.k_fold, _versi_sklearn())
+
+def _pilih_model(cfg, X_train, y_train):
+    # k-fold CV hanya pada data latih, agar data uji tetap tidak terlihat saat memilih model
+    from seleksi_model import jalankan_seleksi, buat_model_terbaik
+    semua_kandidat = [nama for kandidat in KANDIDAT_SLOT.values() for nama in kandidat]
+    leaderboard, _ = jalankan_seleksi(X_train, y_train, semua_kandidat, k=cfg.k_fold, seed=cfg.random_state,
+                                      **({'folder_cache': cfg.cache_seleksi} if cfg.cache_seleksi else {}))
+    terpilih = {}
+    for slot, kandidat in KANDIDAT_SLOT.items():
+        nama_model, parameter, model, rmse_cv = buat_model_terbaik(leaderboard, kandidat)
+        terpilih[slot] = (model, {'model': nama_model, 'parameter': parameter, 'rmse_cv': rmse_cv})
+    return terpilih
+
+def hitung_fit(cfg, hasil_sebelumnya):
+    import numpy as np
+    import pandas as pd
+    from sklearn.model_selection import train_test_split
+    from sklearn.linear_model import LinearRegression
+    from sklearn.ensemble import RandomForestRegressor
+    from prediktor_tegangan import simpan_artefak
+
+    X_semua, y_semua = _muat_data(cfg)
+    X = pd.DataFrame(X_semua, columns=cfg.fitur)
+    y = pd.Series(y_semua, name=cfg.target)
+
+    # --- 4. Pembagian Data ---
+    indeks = np.arange(len(X))
+    if len(X) < 5: # Misalnya, minimal 5 sampel untuk bisa dibagi
+        # Jika sangat sedikit, gunakan semua data untuk training dan evaluasi secara kualitatif
+        indeks_latih, indeks_uji = indeks, indeks
+    else:
+        indeks_latih, indeks_uji = train_test_split(indeks, test_size=cfg.test_size, random_state=cfg.random_state)
+    X_train, y_train = X.iloc[indeks_latih], y.iloc[indeks_latih]
+
+    # --- 5. Pemilihan dan Pelatihan Model Regresi ---
+    # A. Model Regresi Linear
+    model_linear = LinearRegression()
+    # B. Model Random Forest Regressor
+    model_rf = RandomForestRegressor(n_estimators=cfg.n_estimators, random_state=cfg.random_state,
+                                     oob_score=True, n_jobs=-1)
+    model_terpilih = None
+    if cfg.seleksi_model:
+        if len(X_train) < 4:
+            print("Data latih terlalu sedikit untuk seleksi model k-fold; model bawaan dipakai.")
+        else:
+            # Model + hyperparameter terbaik per slot dari leaderboard seleksi_model.py
+            terpilih = _pilih_model(cfg, X_train, y_train)
+            model_linear = terpilih['linear'][0]
+            model_rf = terpilih['rf'][0].set_params(random_state=cfg.random_state, n_jobs=-1)
+            if model_rf.get_params().get('bootstrap'):
+                model_rf.set_params(oob_score=True) # ExtraTrees tanpa bootstrap tidak punya OOB
+            model_terpilih = {slot: info for slot, (_, info) in terpilih.items()}
+    model_linear.fit(X_train, y_train)
+    model_rf.fit(X_train, y_train)
+    oob_score_rf = float(model_rf.oob_score_) if hasattr(model_rf, 'oob_score_') else None
+
+    # Artefak .npz dapat dimuat oleh prediktor_tegangan.py tanpa sklearn/pandas
+    path_artefak_linear = simpan_artefak(model_linear, cfg.fitur, 'model_tegangan_linear', cfg.folder_artefak,
+                                         info={'jumlah_data_latih': len(X_train),
+                                               'seleksi': model_terpilih and model_terpilih['linear']})
+    path_artefak_rf = simpan_artefak(model_rf, cfg.fitur, 'model_tegangan_rf', cfg.folder_artefak,
+                                     info={'oob_score': oob_score_rf, 'jumlah_data_latih': len(X_train),
+                                           'seleksi': model_terpilih and model_terpilih['rf']})
+    return {
+        'indeks_latih': [int(i) for i in indeks_latih],
+        'indeks_uji': [int(i) for i in indeks_uji],
+        'data_terlalu_sedikit': len(X) < 5,
+        'koefisien_linear': [float(v) for v in model_linear.coef_],
+        'intercept_linear': float(model_linear.intercept_),
+        'oob_score_rf': oob_score_rf,
+        'model_terpilih': model_terpilih,
+        'importansi_rf': [float(v) for v in model_rf.feature_importances_],
+        'artefak': {'linear': path_artefak_linear, 'rf': path_artefak_rf},
+    }
+
+def tampilkan_fit(cfg, hasil):
+    if hasil['data_terlalu_sedikit']:
+        print("Jumlah data terlalu sedikit untuk dibagi menjadi training dan testing set; semua data dipakai.")
+    print(f"Jumlah data latih: {len(hasil['indeks_latih'])}")
+    print(f"Jumlah data uji: {len(hasil['indeks_uji'])}")
+    if hasil.get('model_terpilih'):
+        print(f"\nModel terpilih dari {cfg.k_fold}-fold CV pada data latih:")
+        for slot, info in hasil['model_terpilih'].items():
+            print(f"  - {slot}: {info['model']} {info['parameter']} (RMSE CV {info['rmse_cv']:.4f})")
+
+    print("\n\n## OUTPUT 1: Interpretasi Model Regresi Linear ##")
+    if len(cfg.fitur) == 1:
+        k_linear = hasil['koefisien_linear'][0]
+        intercept_linear = hasil['intercept_linear']
+        print(f"Koefisien (k) dari Regresi Linear: {k_linear:.4f}")
+        print(f"Intercept (c) dari Regresi Linear: {intercept_linear:.4f}")
+        print(f"Persamaan: Tegangan ≈ {k_linear:.4f} * [{cfg.fitur[0]}] + {intercept_linear:.4f}")
+    else:
+        print("Koefisien (bobot fitur) dari Regresi Linear:")
+        for fitur, koef in zip(cfg.fitur, hasil['koefisien_linear']):
+            print(f"  - Fitur '{fitur}': {koef:.4f}")
+        print(f"Intercept (c) dari Regresi Linear: {hasil['intercept_linear']:.4f}")
+
+    print("\n\n## OUTPUT 2: Pentingnya Fitur dari Model Random Forest ##")
+    if hasil['oob_score_rf'] is not None:
+        print(f"Random Forest OOB Score (mirip R^2 pada data training): {hasil['oob_score_rf']:.4f}")
+    print("Pentingnya Fitur dari Random Forest:")
+    importances = sorted(zip(cfg.fitur, hasil['importansi_rf']), key=lambda x: x[1], reverse=True)
+    for fitur, importansi in importances:
+        print(f"  - Fitur '{fitur}': {importansi:.4f}")
+    print(f"\nModel disimpan sebagai artefak: {hasil['artefak']['linear']}, {hasil['artefak']['rf']}")
+
+# --- 6-7. Evaluasi dan Visualisasi ---
+
+def kunci_evaluate(cfg, hasil_sebelumnya):
+    return _kunci('evaluate', hasil_sebelumnya['fit']['kunci'])
+
+def _metrik(y_aktual, y_prediksi):
+    import numpy as np
+    if len(y_aktual) == 0:
+        return {'rmse': None, 'r2': None}
+    rmse = float(np.sqrt(np.mean((y_aktual - y_prediksi) ** 2)))
+    ss_tot = float(np.sum((y_aktual - y_aktual.mean()) ** 2))
+    r2 = 1.0 - float(np.sum((y_aktual - y_prediksi) ** 2)) / ss_tot if ss_tot > 0 else None
+    return {'rmse': rmse, 'r2': r2}
+
+def _simpan_plot(cfg, y_test, y_pred, nama_model_plot):
+    try:
+        import matplotlib
+        if not cfg.tampilkan_plot:
+            matplotlib.use('Agg') # Tanpa jendela (headless)
+        import matplotlib.pyplot as plt
+    except ImportError:
+        print("\nmatplotlib tidak terpasang; visualisasi dilewati.")
+        return None
+
+    plt.figure(figsize=(10, 6))
+    plt.scatter(y_test, y_pred, alpha=0.7, edgecolors='k', label='Prediksi vs Aktual')
+    min_val = min(y_test.min(), y_pred.min())
+    max_val = max(y_test.max(), y_pred.max())
+    plt.plot([min_val, max_val], [min_val, max_val], '--k', lw=2, label='Prediksi Sempurna (y=x)')
+    plt.xlabel("Tegangan Aktual (Volt) - Data Uji")
+    plt.ylabel(f"Tegangan Prediksi ({nama_model_plot}) (Volt)")
+    plt.title(f"Perbandingan Tegangan Aktual vs. Prediksi ({nama_model_plot})")
+    plt.legend()
+    plt.grid(True)
+    plt.tight_layout()
+    plt.savefig(cfg.plot)
+    if cfg.tampilkan_plot:
+        plt.show()
+    plt.close()
+    return cfg.plot
+
+def hitung_evaluate(cfg, hasil_sebelumnya):
+    from prediktor_tegangan import PrediktorTegangan
+
+    hasil_fit = hasil_sebelumnya['fit']
+    X, y = _muat_data(cfg)
+    X_train, y_train = X[hasil_fit['indeks_latih']], y[hasil_fit['indeks_latih']]
+    X_test, y_test = X[hasil_fit['indeks_uji']], y[hasil_fit['indeks_uji']]
+
+    # Prediksi lewat artefak identik dengan model.predict sklearn
+    hasil = {'metrik': {}}
+    prediksi_uji = {}
+    for nama in ('linear', 'rf'):
+        prediktor = PrediktorTegangan.muat(hasil_fit['artefak'][nama])
+        prediksi_uji[nama] = prediktor.prediksi_batch(X_test) if len(X_test) else X_test[:, 0]
+        hasil['metrik'][nama] = {'train': _metrik(y_train, prediktor.prediksi_batch(X_train)),
+                                 'test': _metrik(y_test, prediksi_uji[nama])}
+
+    # Tentukan model terbaik (berdasarkan R^2 pada data test; default RF)
+    r2_linear = hasil['metrik']['linear']['test']['r2']
+    r2_rf = hasil['metrik']['rf']['test']['r2']
+    hasil['model_terbaik'] = 'rf'
+    if r2_linear is not None and r2_rf is not None and r2_linear > r2_rf:
+        hasil['model_terbaik'] = 'linear'
+
+    hasil['plot'] = None
+    if len(X_test) > 0:
+        nama_model_plot = NAMA_MODEL[hasil['model_terbaik']]
+        hasil['plot'] = _simpan_plot(cfg, y_test, prediksi_uji[hasil['model_terbaik']], nama_model_plot)
+    return hasil
+
+NAMA_MODEL = {'linear': "Regresi Linear", 'rf': "Random Forest"}
+
+def _format_metrik(nilai):
+    return "N/A" if nilai is None else f"{nilai:.4f}"
+
+def tampilkan_evaluate(cfg, hasil):
+    for nomor, nama in ((3, 'linear'), (4, 'rf')):
+        judul = "Regresi Linear" if nama == 'linear' else "Random Forest Regressor"
+        metrik = hasil['metrik'][nama]
+        print(f"\n\n## OUTPUT {nomor}: Evaluasi Model {judul} ##")
+        print(f"  Training - RMSE: {_format_metrik(metrik['train']['rmse'])}, R^2: {_format_metrik(metrik['train']['r2'])}")
+        if metrik['test']['rmse'] is not None:
+            print(f"  Testing  - RMSE: {_format_metrik(metrik['test']['rmse'])}, R^2: {_format_metrik(metrik['test']['r2'])}")
+        else:
+            print("  Testing  - Tidak ada data uji untuk evaluasi.")
+    if hasil['plot']:
+        print(f"\nPlot prediksi vs aktual disimpan ke: {hasil['plot']}")
+    else:
+        print("\nVisualisasi tidak dibuat karena tidak ada data uji.")
+
+# --- Mencari Titik Penghasil Tegangan Maksimal ---
+
+def kunci_optimize(cfg, hasil_sebelumnya):
+    # 'nms': top-k dipilih dengan jarak minimum; hasil cache versi lama dihitung ulang
+    return _kunci('optimize', hasil_sebelumnya['evaluate']['kunci'], cfg.n_titik, cfg.n_refinement, cfg.top_k,
+                  'nms', cfg.anggaran_evaluasi)
+
+def hitung_optimize(cfg, hasil_sebelumnya):
+    import numpy as np
+    from prediktor_tegangan import PrediktorTegangan
+    from pencarian_optimum import cari_titik_optimum # Grid search bertahap (chunk + coarse-to-fine)
+
+    # Pendekatan 1: Berdasarkan Data Aktual yang Diobservasi
+    X, y = _muat_data(cfg)
+    idx_max = int(np.argmax(y))
+    optimal_aktual = {'tegangan': float(y[idx_max]), 'fitur': dict(zip(cfg.fitur, X[idx_max].tolist()))}
+
+    # Pendekatan 2: Berdasarkan Prediksi Model AI Terbaik.
+    # Tahap kasar (grid per chunk, atau Latin hypercube jika grid melebihi anggaran),
+    # lalu area di sekitar titik-titik terbaik dipersempit dan dicari ulang.
+    nama_model_terbaik = hasil_sebelumnya['evaluate']['model_terbaik']
+    prediktor = PrediktorTegangan.muat(hasil_sebelumnya['fit']['artefak'][nama_model_terbaik])
+    batas_fitur = {fitur: tuple(batas) for fitur, batas in hasil_sebelumnya['load']['batas_fitur'].items()}
+    df_top_prediksi, jumlah_evaluasi = cari_titik_optimum(prediktor, batas_fitur, n_titik=cfg.n_titik,
+                                                          top_k=cfg.top_k, n_refinement=cfg.n_refinement,
+                                                          anggaran_evaluasi=cfg.anggaran_evaluasi)
+    return {
+        'optimal_aktual': optimal_aktual,
+        'model_terbaik': nama_model_terbaik,
+        'jumlah_evaluasi': jumlah_evaluasi,
+        'top_prediksi': df_top_prediksi.to_dict('records'),
+    }
+
+def tampilkan_optimize(cfg, hasil):
+    print("\n\n## OUTPUT 5: Mencari Titik Penghasil Tegangan Maksimal ##")
+    print("\n--- A. Berdasarkan Data Aktual ---")
+    print(f"Tegangan aktual maksimum yang terobservasi: {hasil['optimal_aktual']['tegangan']:.4f} Volt")
+    print("Pada kondisi fitur cahaya (aktual):")
+    for fitur, nilai in hasil['optimal_aktual']['fitur'].items():
+        print(f"  - {fitur}: {nilai:.4f}")
+
+    nama_model_terbaik = NAMA_MODEL[hasil['model_terbaik']]
+    print(f"\n--- B. Berdasarkan Prediksi Model AI Terbaik ({nama_model_terbaik}) ---")
+    print(f"Menggunakan model terbaik: {nama_model_terbaik} (berdasarkan R^2 test jika ada, jika tidak default ke RF)")
+    print(f"Melakukan prediksi pada {hasil['jumlah_evaluasi']} kombinasi fitur "
+          f"(pencarian bertahap, anggaran {cfg.anggaran_evaluasi})...")
+    data_optimal_prediksi = hasil['top_prediksi'][0]
+    print(f"Prediksi tegangan maksimum oleh model ({nama_model_terbaik}): {data_optimal_prediksi['prediksi_tegangan']:.4f} Volt")
+    print(f"Pada kondisi fitur cahaya (prediksi model {nama_model_terbaik}):")
+    for fitur in cfg.fitur:
+        print(f"  - {fitur}: {data_optimal_prediksi[fitur]:.4f}")
+    print(f"\n{len(hasil['top_prediksi'])} titik prediksi tegangan tertinggi:")
+    for baris in hasil['top_prediksi']:
+        print("  " + ", ".join(f"{kolom}={nilai:.4f}" for kolom, nilai in baris.items()))
+
+# --- Prediksi untuk Data Cahaya Baru ---
+
+def hitung_predict(cfg, hasil_sebelumnya):
+    from prediktor_tegangan import PrediktorTegangan
+
+    if cfg.input:
+        nilai_input_baru = [float(v) for v in cfg.input.split(',')]
+        if len(nilai_input_baru) != len(cfg.fitur):
+            _berhenti(f"Jumlah nilai --input ({len(nilai_input_baru)}) tidak sesuai dengan fitur {cfg.fitur}.")
+    else:
+        # Contoh data baru dengan nilai tengah dari data asli untuk posisi dan area sedang
+        nilai_input_baru = []
+        for fitur in cfg.fitur:
+            bawah, atas = hasil_sebelumnya['load']['batas_fitur'][fitur]
+            nilai = (bawah + atas) / 2
+            if 'area' in fitur: # Jika area, mungkin nilai yang lebih kecil
+                nilai *= 0.5
+            nilai_input_baru.append(nilai)
+
+    # Prediksi langsung dari nilai float lewat prediktor ringan (tanpa DataFrame)
+    prediksi = {}
+    for nama, path_artefak in hasil_sebelumnya['fit']['artefak'].items():
+        prediksi[nama] = PrediktorTegangan.muat(path_artefak).prediksi(*nilai_input_baru)
+    return {'input': dict(zip(cfg.fitur, nilai_input_baru)), 'prediksi': prediksi}
+
+def tampilkan_predict(cfg, hasil):
+    print("\n\n--- Prediksi untuk Data Cahaya Baru (Menggunakan model terlatih) ---")
+    print(f"Data Input Baru: {hasil['input']}")
+    print(f"  Prediksi Tegangan (Regresi Linear): {hasil['prediksi']['linear']:.2f} Volt")
+    print(f"  Prediksi Tegangan (Random Forest): {hasil['prediksi']['rf']:.2f} Volt")
+
+# --- Orkestrasi Tahap ---
+
+FUNGSI_TAHAP = {
+    'load': (kunci_load, hitung_load, tampilkan_load),
+    'fit': (kunci_fit, hitung_fit, tampilkan_fit),
+    'evaluate': (kunci_evaluate, hitung_evaluate, tampilkan_evaluate),
+    'optimize': (kunci_optimize, hitung_optimize, tampilkan_optimize),
+    'predict': (None, hitung_predict, tampilkan_predict), # Murah, selalu dihitung
+}
+
+def _cache_masih_valid(cfg, tahap, hasil):
+    if tahap == 'load':
+        return os.path.exists(_path_cache(cfg, 'data.npz'))
+    if tahap == 'fit':
+        return all(os.path.exists(path) for path in hasil['artefak'].values())
+    return True
+
+def jalankan_tahap(cfg, tahap_diminta):
+    """
+    Menjalankan tahap yang diminta beserta tahap prasyaratnya.
+
+    Tahap prasyarat diambil dari cache jika kuncinya masih cocok; tahap yang
+    diminta juga memakai cache (kecuali --paksa) dan hanya menampilkan hasilnya.
+
+    Args:
+        cfg (argparse.Namespace): Konfigurasi dari command line.
+        tahap_diminta (list): Nama tahap yang ingin dijalankan/ditampilkan.
+
+    Returns:
+        dict: nama tahap -> hasil tahap.
+    """
+    hasil = {}
+
+    def _pastikan(tahap):
+        if tahap in hasil:
+            return
+        for prasyarat in DEPENDENSI[tahap]:
+            _pastikan(prasyarat)
+        fungsi_kunci, fungsi_hitung, fungsi_tampilkan = FUNGSI_TAHAP[tahap]
+
+        kunci = fungsi_kunci(cfg, hasil) if fungsi_kunci else None
+        tersimpan = _baca_cache(cfg, tahap) if kunci else None
+        if (tersimpan and tersimpan.get('kunci') == kunci and not cfg.paksa
+                and _cache_masih_valid(cfg, tahap, tersimpan)):
+            hasil[tahap] = tersimpan
+            sumber = "cache"
+        else:
+            waktu_mulai = time.perf_counter()
+            hasil[tahap] = fungsi_hitung(cfg, hasil)
+            hasil[tahap]['kunci'] = kunci
+            if kunci:
+                _tulis_cache(cfg, tahap, hasil[tahap])
+            sumber = f"dihitung dalam {time.perf_counter() - waktu_mulai:.2f} detik"
+
+        if tahap in tahap_diminta:
+            print(f"\n===== Tahap '{tahap}' ({sumber}) =====")
+            fungsi_tampilkan(cfg, hasil[tahap])
+        else:
+            print(f"[{tahap}: {sumber}]")
+
+    for tahap in TAHAP:
+        if tahap in tahap_diminta:
+            _pastikan(tahap)
+    return hasil
+
+def buat_parser():
+    parser = argparse.ArgumentParser(description="Pelatihan dan pemakaian model regresi tegangan per tahap.")
+    parser.add_argument('tahap', nargs='*', default=[],
+                        help=f"Tahap yang dijalankan (default semua): {', '.join(TAHAP)}")
+    parser.add_argument('--dataset', default='fitur_area_terang.fitur',
+                        help="Dataset biner (.fitur), CSV, atau penyimpanan telemetri (.sqlite, mis. "
+                             "dengan --fitur koordinat_x,koordinat_y --target tegangan_v).")
+    parser.add_argument('--excel', default='fitur_area_terang_hasil_ekstraksi.xlsx',
+                        help="File Excel lama, dipakai jika dataset tidak ada.")
+    parser.add_argument('--sheet', default='Sheet1', help="Nama sheet Excel.")
+    parser.add_argument('--fitur', default=','.join(KOLOM_FITUR_DEFAULT),
+                        help="Kolom fitur dipisah koma (mis. tambah bbox_w_norm,bbox_h_norm).")
+    parser.add_argument('--target', default=NAMA_KOLOM_TEGANGAN, help="Nama kolom target.")
+    parser.add_argument('--test-size', type=float, default=0.2)
+    parser.add_argument('--random-state', type=int, default=42)
+    parser.add_argument('--n-estimators', type=int, default=100)
+    parser.add_argument('--seleksi-model', action='store_true',
+                        help="Pilih model dan hyperparameter slot linear/rf dengan k-fold CV (seleksi_model.py) "
+                             "pada data latih, menggantikan LinearRegression dan --n-estimators tetap.")
+    parser.add_argument('--k-fold', type=int, default=5, help="Jumlah fold untuk --seleksi-model.")
+    parser.add_argument('--cache-seleksi', default=None,
+                        help="Folder cache hasil fold seleksi model (default seperti seleksi_model.py).")
+    parser.add_argument('--n-titik', type=int, default=25, help="Jumlah titik grid kasar per fitur (optimize).")
+    parser.add_argument('--n-refinement', type=int, default=3, help="Putaran penyempitan grid (optimize).")
+    parser.add_argument('--top-k', type=int, default=5, help="Jumlah titik terbaik (optimize).")
+    parser.add_argument('--anggaran-evaluasi', type=int, default=ANGGARAN_EVALUASI_DEFAULT,
+                        help="Batas total prediksi model saat optimize; grid yang melebihinya diganti "
+                             "sampel Latin hypercube.")
+    parser.add_argument('--input', default=None, help="Nilai fitur dipisah koma untuk tahap predict.")
+    parser.add_argument('--plot', default='plot_prediksi_tegangan.png', help="File output plot evaluasi.")
+    parser.add_argument('--tampilkan-plot', action='store_true', help="Tampilkan jendela plot (blocking).")
+    parser.add_argument('--folder-artefak', default='artefak_model')
+    parser.add_argument('--cache', default='.cache_latih', help="Folder cache hasil tahap.")
+    parser.add_argument('--paksa', action='store_true', help="Abaikan cache dan hitung ulang semua tahap.")
+    return parser
+
+# --- Program Utama ---
+if __name__ == "__main__":
+    parser = buat_parser()
+    cfg = parser.parse_args()
+    for tahap in cfg.tahap:
+        if tahap not in TAHAP:
+            parser.error(f"tahap '{tahap}' tidak dikenal (pilih dari: {', '.join(TAHAP)})")
+    cfg.fitur = [kolom.strip() for kolom in cfg.fitur.split(',') if kolom.strip()]
+    tahap_diminta = cfg.tahap or TAHAP
+
+    print("Script dimulai")
+    jalankan_tahap(cfg, tahap_diminta)
+    print("\nScript selesai.")
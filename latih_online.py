@@ -0,0 +1,286 @@
+import json
+import time
+import argparse
+import threading
+from collections import deque
+import numpy as np
+import paho.mqtt.client as mqtt
+from prediktor_tegangan import simpan_artefak
+from enkode_telemetri import dekode_pesan
+from spool_telemetri import PenyaringDuplikat
+
+# --- KONFIGURASI (SESUAIKAN DI SINI) ---
+MQTT_BROKER_HOST = '192.168.205.248' # IP broker, sama dengan mqtt_sub.py
+MQTT_BROKER_PORT = 1883
+MQTT_TOPIC = 'projek/data_cahaya'         # Topik telemetri dari mqtt_bridge.py
+MQTT_TOPIC_MODEL = 'projek/model_tegangan' # Topik untuk snapshot model terbaru
+
+# Fitur dari kirimDataKePC (servo.ino) yang dipakai untuk memprediksi tegangan_v
+KOLOM_FITUR_ONLINE = ['koordinat_x', 'koordinat_y']
+KOLOM_TARGET_ONLINE = 'tegangan_v'
+# Snapshot berkala menimpa artefak lama: hanya sekian versi terbaru yang disimpan
+MAKS_VERSI_SNAPSHOT = 1
+
+class PenskalaEWMA:
+    """
+    Standardisasi dengan rata-rata dan varians EWMA (melupakan data lama), pengganti
+    StandardScaler.partial_fit yang kumulatif. Atribut mean_ dan scale_ sama dengan
+    StandardScaler sehingga bisa digabung ke koefisien saat ekspor.
+
+    Di awal, bobot 1/n dipakai (rata-rata biasa) sampai n mencapai 1/alpha.
+    """
+
+    def __init__(self, alpha=0.001):
+        self.alpha = alpha
+        self.n = 0
+        self.mean_ = None
+        self._var = None
+
+    @property
+    def scale_(self):
+        return np.where(self._var > 0, np.sqrt(self._var), 1.0)
+
+    def partial_fit(self, X):
+        for x in np.asarray(X, dtype=np.float64):
+            self.n += 1
+            if self.mean_ is None:
+                self.mean_ = x.copy()
+                self._var = np.zeros_like(x)
+                continue
+            bobot = max(self.alpha, 1.0 / self.n)
+            selisih = x - self.mean_
+            self.mean_ += bobot * selisih
+            self._var = (1 - bobot) * (self._var + bobot * selisih * selisih)
+        return self
+
+    def transform(self, X):
+        return (np.asarray(X, dtype=np.float64) - self.mean_) / self.scale_
+
+class PelatihOnline:
+    """
+    Regressor tegangan yang diperbarui sampel demi sampel dengan memori terbatas.
+
+    Mode:
+        'sgd'     : PenskalaEWMA + SGDRegressor dengan partial_fit (memori konstan).
+                    Laju belajar konstan dan skala yang melupakan data lama, agar
+                    model terus mengikuti penuaan panel dan perubahan cuaca.
+        'jendela' : Sliding window N sampel terakhir; RandomForest dilatih ulang
+                    di thread latar setiap M sampel baru.
+
+    Error prequential (prediksi dulu, lalu belajar) dilacak sebagai EWMA RMSE,
+    sehingga kualitas model terhadap data terbaru selalu terlihat.
+    """
+
+    def __init__(self, mode='sgd', kolom_fitur=KOLOM_FITUR_ONLINE, ukuran_jendela=2000,
+                 interval_latih_ulang=100, alpha_ewma=0.02, eta0=0.01, alpha_skala=0.001):
+        self.mode = mode
+        self.kolom_fitur = list(kolom_fitur)
+        self.alpha_ewma = alpha_ewma
+        self.jumlah_sampel = 0
+        self.mse_ewma = None
+        self._kunci = threading.Lock()
+
+        if mode == 'sgd':
+            from sklearn.linear_model import SGDRegressor
+            self._scaler = PenskalaEWMA(alpha_skala)
+            # 'invscaling' mengecilkan langkah ke nol seiring waktu; 'constant' tetap adaptif
+            self._model = SGDRegressor(learning_rate='constant', eta0=eta0, random_state=42)
+            self._siap = False
+        elif mode == 'jendela':
+            self._jendela_X = deque(maxlen=ukuran_jendela)
+            self._jendela_y = deque(maxlen=ukuran_jendela)
+            self._interval_latih_ulang = interval_latih_ulang
+            self._sampel_sejak_latih = 0
+            self._model = None
+            self._sedang_latih = False
+        else:
+            raise ValueError(f"Mode '{mode}' tidak dikenal (pilih 'sgd' atau 'jendela').")
+
+    def prediksi(self, x):
+        """Prediksi tegangan untuk satu sampel, atau None jika model belum siap."""
+        with self._kunci:
+            if self.mode == 'sgd':
+                if not self._siap:
+                    return None
+                return float(self._model.predict(self._scaler.transform([x]))[0])
+            if self._model is None:
+                return None
+            return float(self._model.predict([x])[0])
+
+    def tambah_sampel(self, x, y):
+        """
+        Menambahkan satu sampel (fitur x, tegangan y) dan memperbarui model.
+
+        Args:
+            x (list): Nilai fitur sesuai self.kolom_fitur.
+            y (float): Tegangan terukur.
+        """
+        prediksi = self.prediksi(x)
+        if prediksi is not None:
+            error_kuadrat = (prediksi - y) ** 2
+            self.mse_ewma = error_kuadrat if self.mse_ewma is None else (
+                (1 - self.alpha_ewma) * self.mse_ewma + self.alpha_ewma * error_kuadrat)
+
+        self.jumlah_sampel += 1
+        if self.mode == 'sgd':
+            with self._kunci:
+                self._scaler.partial_fit([x])
+                self._model.partial_fit(self._scaler.transform([x]), [y])
+                self._siap = True
+            return
+
+        self._jendela_X.append(x)
+        self._jendela_y.append(y)
+        self._sampel_sejak_latih += 1
+        if (self._sampel_sejak_latih >= self._interval_latih_ulang or self._model is None) \
+                and not self._sedang_latih and len(self._jendela_y) >= 10:
+            self._sampel_sejak_latih = 0
+            self._sedang_latih = True
+            X_salinan, y_salinan = np.array(self._jendela_X), np.array(self._jendela_y)
+            threading.Thread(target=self._latih_ulang, args=(X_salinan, y_salinan), daemon=True).start()
+
+    def _latih_ulang(self, X, y):
+        from sklearn.ensemble import RandomForestRegressor
+        try:
+            model = RandomForestRegressor(n_estimators=50, min_samples_leaf=3, random_state=42, n_jobs=1)
+            model.fit(X, y)
+            with self._kunci:
+                self._model = model
+        finally:
+            self._sedang_latih = False
+
+    @property
+    def rmse(self):
+        return None if self.mse_ewma is None else float(np.sqrt(self.mse_ewma))
+
+    def model_untuk_ekspor(self):
+        """
+        Mengembalikan model dalam ruang fitur asli (tanpa scaler) untuk disimpan
+        sebagai artefak, atau None jika belum ada model.
+        """
+        with self._kunci:
+            if self.mode == 'jendela':
+                return self._model
+            if not self._siap:
+                return None
+            from sklearn.linear_model import LinearRegression
+            # Gabungkan standardisasi ke dalam koefisien: y = w.(x - mean)/scale + b
+            model = LinearRegression()
+            model.coef_ = self._model.coef_ / self._scaler.scale_
+            model.intercept_ = float(self._model.intercept_[0] - np.sum(model.coef_ * self._scaler.mean_))
+            return model
+
+    def snapshot(self, folder_artefak, maks_versi=MAKS_VERSI_SNAPSHOT):
+        """
+        Menyimpan model saat ini sebagai artefak berversi.
+
+        Args:
+            folder_artefak (str): Folder artefak.
+            maks_versi (int): Jumlah versi snapshot terbaru yang disimpan; versi
+                              lebih lama dihapus (None = simpan semua).
+
+        Returns:
+            dict: Ringkasan snapshot (untuk dipublikasikan), atau None jika belum ada model.
+        """
+        model = self.model_untuk_ekspor()
+        if model is None:
+            return None
+        nama_model = f"model_tegangan_online_{self.mode}"
+        info = {'jumlah_sampel': self.jumlah_sampel, 'rmse_prequential': self.rmse}
+        path_artefak = simpan_artefak(model, self.kolom_fitur, nama_model, folder_artefak, info=info,
+                                      maks_versi=maks_versi)
+        ringkasan = {'nama_model': nama_model, 'path_artefak': path_artefak, 'kolom_fitur': self.kolom_fitur,
+                     'waktu': time.time(), **info}
+        if hasattr(model, 'coef_'):
+            ringkasan['koefisien'] = [float(v) for v in model.coef_]
+            ringkasan['intercept'] = float(model.intercept_)
+        return ringkasan
+
+def ambil_sampel(data, kolom_fitur=KOLOM_FITUR_ONLINE):
+    """
+    Mengambil (x, y) dari satu pesan telemetri, atau None jika tidak valid.
+
+    Pesan dengan placeholder -1.0 (cahaya tidak terdeteksi) diabaikan.
+    """
+    try:
+        x = [float(data[kolom]) for kolom in kolom_fitur]
+        y = float(data[KOLOM_TARGET_ONLINE])
+    except (KeyError, TypeError, ValueError):
+        return None
+    if data.get('koordinat_x') == -1.0 and data.get('koordinat_y') == -1.0:
+        return None
+    if not np.all(np.isfinite(x)) or not np.isfinite(y):
+        return None
+    return x, y
+
+# --- Program Utama ---
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Pelatihan online model tegangan dari telemetri MQTT.")
+    parser.add_argument('--mode', choices=['sgd', 'jendela'], default='sgd')
+    parser.add_argument('--jendela', type=int, default=2000, help="Ukuran sliding window (mode 'jendela').")
+    parser.add_argument('--eta0', type=float, default=0.01, help="Laju belajar konstan SGD (mode 'sgd').")
+    parser.add_argument('--alpha-skala', type=float, default=0.001,
+                        help="Bobot EWMA rata-rata/varians fitur (mode 'sgd'); ~1/alpha sampel terakhir.")
+    parser.add_argument('--interval-snapshot', type=float, default=300.0,
+                        help="Interval (detik) penyimpanan dan publikasi snapshot model.")
+    parser.add_argument('--folder-artefak', default='artefak_model')
+    parser.add_argument('--simpan-versi', type=int, default=MAKS_VERSI_SNAPSHOT,
+                        help="Jumlah versi snapshot terbaru yang disimpan (0 = simpan semua).")
+    parser.add_argument('--broker', default=MQTT_BROKER_HOST)
+    parser.add_argument('--port', type=int, default=MQTT_BROKER_PORT)
+    args = parser.parse_args()
+
+    pelatih = PelatihOnline(mode=args.mode, ukuran_jendela=args.jendela, eta0=args.eta0,
+                            alpha_skala=args.alpha_skala)
+    maks_versi = args.simpan_versi or None
+    penyaring_duplikat = PenyaringDuplikat() # Buang pembacaan yang dikirim ulang bridge
+    waktu_snapshot_terakhir = time.monotonic()
+
+    def on_connect(client, userdata, flags, rc):
+        if rc == 0:
+            print("Berhasil terhubung ke MQTT Broker!")
+            # '#' mencakup topik dasar dan sub-topik per perangkat (bridge multi-perangkat)
+            print(f"Berlangganan (subscribing) ke topik: '{MQTT_TOPIC}/#'")
+            client.subscribe(MQTT_TOPIC + '/#', qos=1)
+        else:
+            print(f"Gagal terhubung, kode: {rc}")
+
+    def on_message(client, userdata, msg):
+        global waktu_snapshot_terakhir
+        try:
+            daftar_data = penyaring_duplikat.saring(msg.topic, dekode_pesan(msg.payload)) # JSON atau batch biner
+        except Exception as e:
+            print(f"Gagal memproses pesan. Error: {e}")
+            return
+        for data in daftar_data:
+            sampel = ambil_sampel(data)
+            if sampel is not None:
+                pelatih.tambah_sampel(*sampel)
+
+        if time.monotonic() - waktu_snapshot_terakhir >= args.interval_snapshot:
+            waktu_snapshot_terakhir = time.monotonic()
+            ringkasan = pelatih.snapshot(args.folder_artefak, maks_versi)
+            if ringkasan is not None:
+                client.publish(MQTT_TOPIC_MODEL, json.dumps(ringkasan), qos=1, retain=True)
+                rmse = f"{ringkasan['rmse_prequential']:.4f}" if ringkasan['rmse_prequential'] is not None else "N/A"
+                print(f"Snapshot model disimpan: {ringkasan['path_artefak']} "
+                      f"({ringkasan['jumlah_sampel']} sampel, RMSE prequential {rmse})")
+
+    client = mqtt.Client(mqtt.CallbackAPIVersion.VERSION1, "pelatih_online")
+    client.on_connect = on_connect
+    client.on_message = on_message
+
+    print(f"Mencoba terhubung ke MQTT Broker di {args.broker}...")
+    try:
+        client.connect(args.broker, args.port, 60)
+    except Exception as e:
+        print(f"GAGAL terhubung. Error: {e}")
+        exit()
+
+    try:
+        client.loop_forever()
+    except KeyboardInterrupt:
+        print("\nProgram dihentikan.")
+        ringkasan = pelatih.snapshot(args.folder_artefak, maks_versi)
+        if ringkasan is not None:
+            print(f"Snapshot terakhir disimpan: {ringkasan['path_artefak']}")
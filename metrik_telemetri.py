@@ -0,0 +1,294 @@
+import json
+import time
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Metrik ringan untuk mqtt_bridge.py dan mqtt_sub.py: counter, gauge, dan
+# histogram latensi dengan bucket tetap. Update di jalur panas hanya berupa
+# penambahan di bawah lock (tanpa I/O); metrik dibaca lewat endpoint HTTP format
+# teks Prometheus (/metrics) dan/atau ringkasan JSON berkala ke topik MQTT.
+
+# Batas atas bucket latensi (detik)
+BUCKET_LATENSI = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+def _label_str(nama_label, nilai_label, tambahan=()):
+    pasangan = list(zip(nama_label, nilai_label)) + list(tambahan)
+    if not pasangan:
+        return ''
+    return '{' + ','.join(f'{nama}="{nilai}"' for nama, nilai in pasangan) + '}'
+
+def kuantil_bucket(batas, jumlah_bucket, q):
+    """
+    Perkiraan kuantil q (0..1) dari jumlah per bucket (interpolasi linear di
+    dalam bucket), atau None jika belum ada data.
+
+    Args:
+        batas (tuple): Batas atas bucket (tanpa +Inf).
+        jumlah_bucket (list): Jumlah per bucket, len(batas) + 1 (terakhir = +Inf).
+    """
+    n = sum(jumlah_bucket)
+    if n == 0:
+        return None
+    target = q * n
+    kumulatif = 0
+    for i, jumlah in enumerate(jumlah_bucket):
+        if jumlah and kumulatif + jumlah >= target:
+            bawah = batas[i - 1] if i > 0 else 0.0
+            atas = batas[i] if i < len(batas) else batas[-1]
+            return bawah + (atas - bawah) * (target - kumulatif) / jumlah
+        kumulatif += jumlah
+    return batas[-1]
+
+class _Metrik:
+    jenis = None
+
+    def __init__(self, nama, bantuan, label=()):
+        self.nama = nama
+        self.bantuan = bantuan
+        self.label = tuple(label)
+        self._kunci = threading.Lock()
+
+    def _kunci_label(self, label):
+        return tuple(str(label.get(nama, '')) for nama in self.label)
+
+class Penghitung(_Metrik):
+    """Counter yang hanya naik, opsional per label (mis. perangkat)."""
+    jenis = 'counter'
+
+    def __init__(self, nama, bantuan, label=()):
+        super().__init__(nama, bantuan, label)
+        self._nilai = {}
+
+    def tambah(self, jumlah=1, **label):
+        kunci = self._kunci_label(label)
+        with self._kunci:
+            self._nilai[kunci] = self._nilai.get(kunci, 0) + jumlah
+
+    def nilai(self, **label):
+        return self._nilai.get(self._kunci_label(label), 0)
+
+    def total(self):
+        return sum(self._nilai.values())
+
+    def baris_prometheus(self):
+        with self._kunci:
+            salinan = dict(self._nilai) or {self._kunci_label({}): 0}
+        return [f"{self.nama}{_label_str(self.label, kunci)} {nilai}" for kunci, nilai in salinan.items()]
+
+    def ringkasan(self):
+        return self.total()
+
+class Gauge(Penghitung):
+    """
+    Nilai sesaat (mis. jumlah baris di spool). Jika `fungsi` diberikan, nilai
+    dibaca dari fungsi tersebut saat metrik diambil, bukan di jalur panas.
+    Untuk gauge berlabel, `fungsi` mengembalikan dict nilai label -> nilai
+    (tuple nilai label jika labelnya lebih dari satu).
+    """
+    jenis = 'gauge'
+
+    def __init__(self, nama, bantuan, label=(), fungsi=None):
+        super().__init__(nama, bantuan, label)
+        self.fungsi = fungsi
+
+    def atur(self, nilai, **label):
+        with self._kunci:
+            self._nilai[self._kunci_label(label)] = nilai
+
+    def _baca_fungsi(self):
+        if self.fungsi is None:
+            return
+        nilai = self.fungsi()
+        if not self.label:
+            self.atur(nilai)
+            return
+        baru = {}
+        for label, v in nilai.items():
+            if v is not None:
+                baru[tuple(map(str, label if isinstance(label, tuple) else (label,)))] = v
+        with self._kunci:
+            self._nilai = baru
+
+    def baris_prometheus(self):
+        self._baca_fungsi()
+        return super().baris_prometheus()
+
+    def ringkasan(self):
+        self._baca_fungsi()
+        if self.label:
+            with self._kunci:
+                return {','.join(kunci): nilai for kunci, nilai in self._nilai.items()}
+        return super().ringkasan()
+
+class Histogram(_Metrik):
+    """Histogram dengan bucket tetap; kuantil diperkirakan dengan interpolasi di dalam bucket."""
+    jenis = 'histogram'
+
+    def __init__(self, nama, bantuan, batas=BUCKET_LATENSI):
+        super().__init__(nama, bantuan)
+        self.batas = tuple(batas)
+        self._jumlah_bucket = [0] * (len(self.batas) + 1) # +1 untuk +Inf
+        self._total = 0.0
+        self._n = 0
+
+    def amati(self, nilai):
+        # Pencarian linear cukup cepat untuk ~15 bucket dan tanpa alokasi
+        i = 0
+        for batas in self.batas:
+            if nilai <= batas:
+                break
+            i += 1
+        with self._kunci:
+            self._jumlah_bucket[i] += 1
+            self._total += nilai
+            self._n += 1
+
+    def kuantil(self, q):
+        """Perkiraan kuantil q (0..1), atau None jika belum ada data."""
+        with self._kunci:
+            bucket = list(self._jumlah_bucket)
+        return kuantil_bucket(self.batas, bucket, q)
+
+    def baris_prometheus(self):
+        with self._kunci:
+            bucket, total, n = list(self._jumlah_bucket), self._total, self._n
+        baris, kumulatif = [], 0
+        for batas, jumlah in zip(self.batas + ('+Inf',), bucket):
+            kumulatif += jumlah
+            baris.append(f"{self.nama}_bucket{_label_str((), (), [('le', batas)])} {kumulatif}")
+        baris.append(f"{self.nama}_sum {total}")
+        baris.append(f"{self.nama}_count {n}")
+        return baris
+
+    def ringkasan(self):
+        return {'jumlah': self._n, 'rata2': self._total / self._n if self._n else None,
+                'p50': self.kuantil(0.5), 'p99': self.kuantil(0.99)}
+
+class RegistriMetrik:
+    """
+    Kumpulan metrik satu proses.
+
+    Contoh:
+        metrik = RegistriMetrik('bridge')
+        dibaca = metrik.penghitung('baris_dibaca_total', "Baris serial terbaca.", label=('perangkat',))
+        dibaca.tambah(perangkat='tracker01')
+        latensi = metrik.histogram('latensi_baca_publish_detik', "Latensi baca serial -> publish.")
+        latensi.amati(0.004)
+    """
+
+    def __init__(self, awalan):
+        self.awalan = awalan
+        self.waktu_mulai = time.time()
+        self._metrik = []
+
+    def _daftar(self, metrik):
+        self._metrik.append(metrik)
+        return metrik
+
+    def penghitung(self, nama, bantuan, label=()):
+        return self._daftar(Penghitung(f"{self.awalan}_{nama}", bantuan, label))
+
+    def gauge(self, nama, bantuan, label=(), fungsi=None):
+        return self._daftar(Gauge(f"{self.awalan}_{nama}", bantuan, label, fungsi))
+
+    def histogram(self, nama, bantuan, batas=BUCKET_LATENSI):
+        return self._daftar(Histogram(f"{self.awalan}_{nama}", bantuan, batas))
+
+    def format_prometheus(self):
+        baris = []
+        for metrik in self._metrik:
+            baris.append(f"# HELP {metrik.nama} {metrik.bantuan}")
+            baris.append(f"# TYPE {metrik.nama} {metrik.jenis}")
+            baris.extend(metrik.baris_prometheus())
+        return '\n'.join(baris) + '\n'
+
+    def ringkasan(self):
+        """Dict ringkas semua metrik (untuk topik statistik / log berkala)."""
+        hasil = {'waktu': time.time(), 'uptime_detik': time.time() - self.waktu_mulai}
+        for metrik in self._metrik:
+            hasil[metrik.nama[len(self.awalan) + 1:]] = metrik.ringkasan()
+        return hasil
+
+def jalankan_server_http(registri, port, host='127.0.0.1'):
+    """
+    Menjalankan endpoint /metrics (format teks Prometheus) di thread latar.
+
+    Returns:
+        ThreadingHTTPServer: Server yang berjalan (panggil .shutdown() untuk berhenti).
+    """
+    class _Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split('?')[0] not in ('/metrics', '/'):
+                self.send_error(404)
+                return
+            isi = registri.format_prometheus().encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+            self.send_header('Content-Length', str(len(isi)))
+            self.end_headers()
+            self.wfile.write(isi)
+
+        def log_message(self, format, *args):
+            pass # Jangan cetak satu baris per request
+
+    server = ThreadingHTTPServer((host, port), _Handler)
+    threading.Thread(target=server.serve_forever, name="server_metrik", daemon=True).start()
+    return server
+
+def baca_prometheus(teks):
+    """
+    Mengurai teks format Prometheus (mis. dari /metrics bridge atau subscriber).
+
+    Returns:
+        tuple: (dict 'nama{label}' -> nilai, dict nama histogram -> (batas, jumlah_bucket))
+               dengan jumlah_bucket per bucket (bukan kumulatif), siap untuk kuantil_bucket().
+    """
+    nilai, kumulatif = {}, {}
+    for baris in teks.splitlines():
+        if not baris or baris.startswith('#'):
+            continue
+        nama, _, angka = baris.rpartition(' ')
+        nilai[nama] = float(angka)
+        if '_bucket{le="' in nama:
+            nama_histogram, _, le = nama.partition('_bucket{le="')
+            kumulatif.setdefault(nama_histogram, []).append((float(le.rstrip('"}')), float(angka)))
+    histogram = {}
+    for nama, daftar in kumulatif.items():
+        daftar.sort()
+        batas = tuple(le for le, _ in daftar if le != float('inf'))
+        jumlah = [k - (daftar[i - 1][1] if i else 0) for i, (_, k) in enumerate(daftar)]
+        histogram[nama] = (batas, jumlah)
+    return nilai, histogram
+
+def _format_detik(nilai):
+    return "N/A" if nilai is None else f"{nilai * 1000:.1f} ms"
+
+def _format_angka(nilai):
+    return f"{nilai:.4g}" if isinstance(nilai, float) else str(nilai)
+
+def format_ringkasan(ringkasan):
+    """Satu baris teks dari RegistriMetrik.ringkasan() untuk log berkala."""
+    bagian = []
+    for nama, nilai in ringkasan.items():
+        if nama in ('waktu', 'uptime_detik'):
+            continue
+        if isinstance(nilai, dict) and 'p50' not in nilai:
+            # Gauge berlabel, mis. per perangkat
+            bagian.extend(f"{nama}[{label or '-'}]={_format_angka(v)}" for label, v in nilai.items())
+        elif isinstance(nilai, dict):
+            bagian.append(f"{nama} p50={_format_detik(nilai['p50'])} p99={_format_detik(nilai['p99'])}")
+        else:
+            bagian.append(f"{nama}={nilai}")
+    return ', '.join(bagian)
+
+def laporkan_berkala(registri, interval, berhenti, client=None, topik=None):
+    """
+    Mencetak satu baris ringkasan dan (opsional) mempublikasikan ringkasan JSON
+    ke `topik` setiap `interval` detik sampai `berhenti` di-set. Dijalankan
+    di thread tersendiri.
+    """
+    while not berhenti.wait(timeout=interval):
+        ringkasan = registri.ringkasan()
+        print(f"[statistik] {format_ringkasan(ringkasan)}")
+        if client is not None and topik:
+            client.publish(topik, json.dumps(ringkasan), qos=0)
@@ -1,70 +1,568 @@
-import serial
-import paho.mqtt.client as mqtt
-import time
-import json
-
-# --- KONFIGURASI (SESUAIKAN DI SINI) ---
-# Temukan port ini di Device Manager (Windows) atau dengan 'ls /dev/tty.*' (Mac/Linux)
-SERIAL_PORT = 'COM13'  # CONTOH: 'COM3' atau '/dev/ttyUSB0' atau '/dev/tty.usbmodem14201'
-BAUD_RATE = 9600
-
-# Jika broker (Mosquitto) ada di komputer ini, biarkan 'localhost'.
-MQTT_BROKER_HOST = '192.168.28.10'
-MQTT_BROKER_PORT = 1883
-MQTT_TOPIC = 'projek/data_cahaya' # Topik yang akan digunakan
-
-# --- INISIALISASI ---
-print("Memulai MQTT Bridge...")
-
-# Inisialisasi Koneksi Serial
-try:
-    ser = serial.Serial(SERIAL_PORT, BAUD_RATE, timeout=2)
-    print(f"Berhasil terhubung ke port serial {SERIAL_PORT}")
-    time.sleep(2) # Beri waktu agar koneksi stabil
-except serial.SerialException as e:
-    print(f"GAGAL terhubung ke port serial {SERIAL_PORT}. Error: {e}")
-    print("Pastikan Arduino terhubung, port sudah benar, dan tidak ada program lain yang menggunakannya.")
-    exit()
-
-# Inisialisasi MQTT Client
-def on_connect(client, userdata, flags, rc):
-    if rc == 0:
-        print("Berhasil terhubung ke MQTT Broker!")
-    else:
-        print(f"Gagal terhubung ke MQTT Broker. Kode: {rc}")
-
-client = mqtt.Client(mqtt.CallbackAPIVersion.VERSION1, "arduino_bridge_publisher")
-client.on_connect = on_connect
-try:
-    client.connect(MQTT_BROKER_HOST, MQTT_BROKER_PORT, 60)
-except Exception as e:
-    print(f"GAGAL terhubung ke MQTT Broker di {MQTT_BROKER_HOST}. Error: {e}")
-    print("Pastikan Mosquitto atau broker lain sudah berjalan.")
-    exit()
-
-client.loop_start()
-
-# --- LOOP UTAMA ---
-try:
-    while True:
-        if ser.in_waiting > 0:
-            # Baca satu baris data dari Arduino
-            line = ser.readline().decode('utf-8', errors='ignore').strip()
-
-            if line:
-                print(f"Diterima dari Arduino: {line}")
-                # Kirim data mentah (yang sudah berupa JSON) ke broker
-                result = client.publish(MQTT_TOPIC, line)
-                if result.rc != mqtt.MQTT_ERR_SUCCESS:
-                    print(f"   -> Gagal mempublikasikan pesan.")
-                else:
-                    print(f"   -> Dipublikasikan ke topik '{MQTT_TOPIC}'")
-
-except KeyboardInterrupt:
-    print("\nProgram dihentikan.")
-finally:
-    # Membersihkan koneksi
-    ser.close()
-    client.loop_stop()
-    client.disconnect()
-    print("Koneksi serial dan MQTT ditutup.")
+import os
+import glob
+import serial
+import paho.mqtt.client as mqtt
+import time
+import json
+import queue
+import argparse
+import threading
+from enkode_telemetri import enkode_batch, KOLOM_TELEMETRI, MAKS_JUMLAH
+from spool_telemetri import SpoolTelemetri, PATH_SPOOL_DEFAULT, MAKS_BARIS_DEFAULT
+from metrik_telemetri import RegistriMetrik, jalankan_server_http, laporkan_berkala
+
+# --- KONFIGURASI (SESUAIKAN DI SINI) ---
+# Temukan port ini di Device Manager (Windows) atau dengan 'ls /dev/tty.*' (Mac/Linux)
+SERIAL_PORT = 'COM13'  # CONTOH: 'COM3' atau '/dev/ttyUSB0' atau '/dev/tty.usbmodem14201'
+BAUD_RATE = 9600
+
+# Jika broker (Mosquitto) ada di komputer ini, biarkan 'localhost'.
+MQTT_BROKER_HOST = '192.168.28.10'
+MQTT_BROKER_PORT = 1883
+MQTT_TOPIC = 'projek/data_cahaya' # Topik yang akan digunakan
+
+# Arsitektur: thread pembaca serial (readline blocking, tanpa polling) menulis
+# setiap baris ke spool SQLite di disk (spool_telemetri.py); thread penerbit
+# membaca spool berurutan dan mempublikasikannya dengan QoS 1. Baris baru
+# dihapus dari spool setelah PUBACK diterima, jadi tidak ada data yang hilang
+# saat broker mati atau bridge di-restart; setelah reconnect backlog dikirim
+# ulang sesuai urutan seq sebagai batch biner dengan laju dibatasi, sedangkan
+# pembacaan baru tetap dikirim tanpa batas laju. Saat idle kedua thread tidur di
+# dalam blocking call. Spool yang penuh (maks_baris) membuang baris tertua.
+#
+# Dengan --config, satu proses melayani banyak tracker: satu thread pembaca per
+# port serial (dipantau hot-plug), satu spool, dan satu koneksi MQTT bersama;
+# perangkat bernama dipublikasikan ke topik '<MQTT_TOPIC>/<nama perangkat>'.
+TIMEOUT_BACA_SERIAL = 1.0      # Detik; batas blocking readline agar thread bisa berhenti
+MAKS_INFLIGHT = 100            # Pesan QoS 1 yang boleh menunggu PUBACK sekaligus
+LAJU_MAKS_DEFAULT = 100.0      # Pesan/detik saat replay backlog (data live tidak dibatasi)
+UKURAN_BATCH_REPLAY = 500      # Pembacaan per pesan biner saat replay backlog (juga untuk --batch 1)
+INTERVAL_PINDAI = 2.0          # Detik antar pemeriksaan port serial (hot-plug)
+JEDA_BUKA_ULANG_MAKS = 60.0    # Detik; batas jeda (naik dua kali lipat) membuka ulang port yang gagal dibuka
+MQTT_TOPIC_STATISTIK = 'projek/statistik/bridge' # Ringkasan metrik berkala (JSON)
+
+# --- METRIK ---
+# Jalur panas hanya menaikkan counter/histogram; log per pesan hanya dengan --verbose
+LOG_PER_PESAN = False
+METRIK = RegistriMetrik('bridge')
+BARIS_DIBACA = METRIK.penghitung('baris_dibaca_total', "Baris terbaca dari serial.", label=('perangkat',))
+PESAN_DIPUBLIKASIKAN = METRIK.penghitung('pesan_dipublikasikan_total', "Pesan MQTT yang dipublikasikan.")
+PEMBACAAN_DIPUBLIKASIKAN = METRIK.penghitung('pembacaan_dipublikasikan_total',
+                                             "Pembacaan yang dipublikasikan (termasuk kirim ulang).",
+                                             label=('perangkat',))
+PEMBACAAN_DIKONFIRMASI = METRIK.penghitung('pembacaan_dikonfirmasi_total', "Pembacaan yang di-PUBACK broker.")
+PUBLISH_GAGAL = METRIK.penghitung('publish_gagal_total', "Publish yang gagal (mis. broker terputus).")
+LATENSI_BACA_PUBLISH = METRIK.histogram('latensi_baca_publish_detik',
+                                        "Latensi dari baris terbaca di serial sampai dipublikasikan.")
+
+# --- INISIALISASI ---
+def buka_serial(port, baud_rate, cetak_error=True):
+    """
+    Membuka port serial Arduino.
+
+    Args:
+        port (str): Nama port serial.
+        baud_rate (int): Baud rate.
+        cetak_error (bool): Cetak pesan jika gagal (False saat mencoba ulang).
+
+    Returns:
+        serial.Serial: Port yang terbuka, atau None jika gagal.
+    """
+    try:
+        ser = serial.Serial(port, baud_rate, timeout=TIMEOUT_BACA_SERIAL)
+        print(f"Berhasil terhubung ke port serial {port}")
+        time.sleep(2) # Beri waktu agar koneksi stabil
+        return ser
+    except serial.SerialException as e:
+        if cetak_error:
+            print(f"GAGAL terhubung ke port serial {port}. Error: {e}")
+            print("Pastikan Arduino terhubung, port sudah benar, dan tidak ada program lain yang menggunakannya.")
+        return None
+
+def buat_client_mqtt(client_id="arduino_bridge_publisher"):
+    client = mqtt.Client(mqtt.CallbackAPIVersion.VERSION1, client_id)
+    client.max_inflight_messages_set(MAKS_INFLIGHT)
+    # Reconnect otomatis oleh loop paho, dengan jeda naik sampai 30 detik
+    client.reconnect_delay_set(min_delay=1, max_delay=30)
+    return client
+
+# --- THREAD PEMBACA ---
+def baca_serial(ser, spool, berhenti, perangkat=''):
+    """
+    Membaca baris dari serial dan menyimpannya ke spool sampai `berhenti` di-set
+    atau port serial terputus.
+
+    Args:
+        ser (serial.Serial): Port serial (timeout baca > 0).
+        spool (SpoolTelemetri): Spool tujuan.
+        berhenti (threading.Event): Sinyal berhenti untuk semua thread.
+        perangkat (str): Nama perangkat ('' = bridge satu perangkat).
+    """
+    label = f"[{perangkat}] " if perangkat else ""
+    while not berhenti.is_set():
+        try:
+            # Blocking sampai ada satu baris atau timeout; tidak memakan CPU saat idle
+            data = ser.readline()
+        except serial.SerialException as e:
+            print(f"{label}Koneksi serial terputus. Error: {e}")
+            return
+        line = data.decode('utf-8', errors='ignore').strip()
+        if not line:
+            continue
+
+        BARIS_DIBACA.tambah(perangkat=perangkat)
+        if LOG_PER_PESAN:
+            print(f"{label}Diterima dari Arduino: {line}")
+        jumlah_dibuang = spool.jumlah_dibuang
+        spool.tambah(time.time(), line, perangkat)
+        if jumlah_dibuang == 0 and spool.jumlah_dibuang > 0:
+            # Hanya sekali; jumlah selanjutnya terlihat di metrik baris_dibuang_spool
+            print(f"Peringatan: spool penuh ({spool.maks_baris} baris); baris tertua mulai dibuang.")
+
+# --- THREAD PENERBIT ---
+def _parse_pembacaan(line):
+    # Nilai kolom telemetri sebagai float, atau None jika baris bukan JSON telemetri
+    try:
+        data = json.loads(line)
+        return {kolom: float(data[kolom]) for kolom in KOLOM_TELEMETRI if kolom in data} or None
+    except (json.JSONDecodeError, TypeError, ValueError):
+        return None
+
+class PenerbitSpool:
+    """
+    Mempublikasikan isi spool ke broker secara berurutan dengan QoS 1.
+
+    Baris dihapus dari spool hanya setelah PUBACK. Setelah reconnect, paho
+    sendiri mengirim ulang pesan yang belum di-ack (dengan mid yang sama), jadi
+    penerbit hanya melanjutkan dari baris yang belum pernah diserahkan ke paho.
+    Setelah bridge di-restart seluruh isi spool dikirim ulang; subscriber
+    membuang duplikatnya lewat 'seq' (PenyaringDuplikat).
+
+    Args:
+        client (mqtt.Client): Client paho (callback dipasang oleh kelas ini).
+        spool (SpoolTelemetri): Sumber baris.
+        topic (str): Topik dasar; pembacaan perangkat bernama dikirim ke '<topic>/<perangkat>'.
+        ukuran_batch (int): Pembacaan per pesan biner (1 = satu pesan JSON per baris).
+        jendela_batch (float): Batas umur (detik) pembacaan tertua sebelum batch dikirim.
+        kompres (bool): Kompres batch dengan zlib.
+        laju_maks (float): Batas pesan per detik saat mengirim ulang backlog.
+    """
+
+    def __init__(self, client, spool, topic, ukuran_batch=1, jendela_batch=1.0, kompres=True,
+                 laju_maks=LAJU_MAKS_DEFAULT):
+        self.client = client
+        self.spool = spool
+        self.topic = topic
+        self.ukuran_batch = ukuran_batch
+        self.jendela_batch = jendela_batch
+        self.kompres = kompres
+        self.laju_maks = laju_maks
+        self.jumlah_perangkat = 1     # Diperbarui oleh PengelolaPerangkat
+        self.terhubung = threading.Event()
+        self._kirim_ulang = False
+        self._mid_ke_seq = {}         # mid paho -> seq yang dibawa pesan tersebut
+        self._ack = queue.SimpleQueue()
+        # Penerbit tidur pada event spool; dibangunkan oleh baris baru, PUBACK, atau connect
+        self._bangun = spool.ada_data
+
+        client.on_connect = self.on_connect
+        client.on_disconnect = self.on_disconnect
+        client.on_publish = self.on_publish
+
+    def on_connect(self, client, userdata, flags, rc):
+        if rc == 0:
+            print("Berhasil terhubung ke MQTT Broker!")
+            self._kirim_ulang = True
+            self.terhubung.set()
+            self._bangun.set()
+        else:
+            print(f"Gagal terhubung ke MQTT Broker. Kode: {rc}")
+
+    def on_disconnect(self, client, userdata, rc):
+        self.terhubung.clear()
+        if rc != 0:
+            print(f"Koneksi ke MQTT Broker terputus (kode {rc}); data tetap disimpan di spool.")
+
+    def on_publish(self, client, userdata, mid):
+        # Dipanggil dari thread jaringan paho; pemrosesan dilakukan di thread penerbit
+        self._ack.put(mid)
+        self._bangun.set()
+
+    def _proses_ack(self):
+        seq_selesai = []
+        while True:
+            try:
+                mid = self._ack.get_nowait()
+            except queue.Empty:
+                break
+            # mid tercatat di thread ini sebelum ack-nya diproses; mid tak dikenal
+            # (mis. pesan statistik QoS 0) diabaikan
+            seq_selesai.extend(self._mid_ke_seq.pop(mid, []))
+        if seq_selesai:
+            PEMBACAAN_DIKONFIRMASI.tambah(len(seq_selesai))
+        self.spool.hapus(seq_selesai)
+
+    def _buat_pesan(self, baris_spool, sebagai_batch=False):
+        # Kelompokkan baris menjadi pesan per perangkat:
+        #   (perangkat, daftar seq, daftar waktu baca, fungsi payload(waktu_kirim)).
+        # Payload dibuat tepat sebelum publish agar waktu_kirim akurat.
+        # sebagai_batch memaksa batch biner walau ukuran_batch = 1 (replay backlog).
+        # Urutan seq tetap terjaga di dalam setiap perangkat (= setiap topik).
+        id_spool = self.spool.id_spool
+
+        def payload_mentah(line):
+            return lambda waktu_kirim: line
+
+        def payload_json(data_asli, seq, waktu):
+            return lambda waktu_kirim: json.dumps({**data_asli, 'seq': seq, 'spool': id_spool, 'waktu': waktu,
+                                                   'waktu_kirim': waktu_kirim})
+
+        def payload_batch(seq_batch, waktu_batch, data_batch):
+            return lambda waktu_kirim: enkode_batch(waktu_batch, data_batch, self.kompres, seq_batch, id_spool,
+                                                    waktu_kirim)
+
+        if self.ukuran_batch <= 1 and not sebagai_batch:
+            pesan = []
+            for seq, waktu, line, perangkat in baris_spool:
+                if _parse_pembacaan(line) is None:
+                    pesan.append((perangkat, [seq], [waktu], payload_mentah(line)))
+                else:
+                    pesan.append((perangkat, [seq], [waktu], payload_json(json.loads(line), seq, waktu)))
+            return pesan
+
+        pesan, batch = [], {} # perangkat -> (seq, waktu, data)
+
+        def tutup_batch(perangkat):
+            seq_batch, waktu_batch, data_batch = batch.pop(perangkat)
+            pesan.append((perangkat, seq_batch, waktu_batch, payload_batch(seq_batch, waktu_batch, data_batch)))
+
+        for seq, waktu, line, perangkat in baris_spool:
+            data = _parse_pembacaan(line)
+            if data is None:
+                # Baris bukan telemetri (mis. pesan debug) diteruskan apa adanya
+                if perangkat in batch:
+                    tutup_batch(perangkat)
+                pesan.append((perangkat, [seq], [waktu], payload_mentah(line)))
+                continue
+            seq_batch, waktu_batch, data_batch = batch.setdefault(perangkat, ([], [], []))
+            seq_batch.append(seq)
+            waktu_batch.append(waktu)
+            data_batch.append(data)
+        for perangkat in list(batch):
+            tutup_batch(perangkat)
+        return pesan
+
+    def topik(self, perangkat):
+        # Bridge satu perangkat memakai topik dasar; multi-perangkat memakai sub-topik per perangkat
+        return f"{self.topic}/{perangkat}" if perangkat else self.topic
+
+    def _publikasikan(self, topik, payload, daftar_seq, berhenti):
+        info = self.client.publish(topik, payload, qos=1)
+        while info.rc == mqtt.MQTT_ERR_QUEUE_SIZE and not berhenti.is_set():
+            time.sleep(0.01) # Antrian paho penuh: tunggu sampai pesan lama terkirim
+            info = self.client.publish(topik, payload, qos=1)
+        # MQTT_ERR_NO_CONN: pesan tetap di antrian paho dan dikirim setelah reconnect
+        if info.rc not in (mqtt.MQTT_ERR_SUCCESS, mqtt.MQTT_ERR_NO_CONN):
+            return False
+        self._mid_ke_seq[info.mid] = daftar_seq
+        return True
+
+    def jalankan(self, berhenti):
+        """Loop thread penerbit sampai `berhenti` di-set."""
+        kursor = 0 # seq terakhir yang sudah dipublikasikan (belum tentu dikonfirmasi)
+        batas_replay = 0 # Baris sampai seq ini adalah backlog saat (re)connect
+        menunggu_ack_lama = False
+        waktu_kirim_berikut = time.monotonic()
+        while not berhenti.is_set():
+            self._bangun.clear()
+            self._proses_ack()
+            if not self.terhubung.is_set():
+                self.terhubung.wait(timeout=TIMEOUT_BACA_SERIAL)
+                continue
+            if self._kirim_ulang:
+                # Pesan yang sudah diserahkan ke paho dikirim ulang oleh paho (mid sama, tetap
+                # tercatat di _mid_ke_seq); lanjutkan dari kursor agar tidak terkirim dua kali
+                self._kirim_ulang = False
+                menunggu_ack_lama = bool(self._mid_ke_seq)
+                batas_replay = self.spool.seq_terakhir()
+                jumlah_backlog = self.spool.jumlah(kursor)
+                if jumlah_backlog:
+                    print(f"Mengirim {jumlah_backlog} baris dari spool...")
+            if menunggu_ack_lama:
+                if self._mid_ke_seq:
+                    # Seq baru menunggu sampai kiriman ulang paho di-ack, agar subscriber
+                    # (penyaring seq tertinggi per topik) tidak membuang seq lama
+                    self._bangun.wait(timeout=TIMEOUT_BACA_SERIAL)
+                    continue
+                menunggu_ack_lama = False
+            if len(self._mid_ke_seq) >= MAKS_INFLIGHT:
+                self._bangun.wait(timeout=TIMEOUT_BACA_SERIAL)
+                continue
+
+            replay = kursor < batas_replay
+            if replay:
+                # Backlog: batch biner besar (tanpa menunggu jendela), laju dibatasi laju_maks
+                batas_ambil = min(MAKS_JUMLAH, UKURAN_BATCH_REPLAY * max(1, self.jumlah_perangkat))
+                baris_spool = [baris for baris in self.spool.ambil(kursor, batas_ambil) if baris[0] <= batas_replay]
+            else:
+                # Satu batch penuh untuk setiap perangkat aktif
+                batas_ambil = max(1, self.ukuran_batch) * max(1, self.jumlah_perangkat)
+                baris_spool = self.spool.ambil(kursor, batas_ambil)
+            if not baris_spool:
+                if replay:
+                    batas_replay = kursor # Backlog sudah terhapus (spool penuh membuang baris tertua)
+                    continue
+                self._bangun.wait(timeout=TIMEOUT_BACA_SERIAL)
+                continue
+            if not replay and self.ukuran_batch > 1 and len(baris_spool) < batas_ambil:
+                sisa_jendela = baris_spool[0][1] + self.jendela_batch - time.time()
+                if sisa_jendela > 0:
+                    # Batch belum penuh dan pembacaan tertua masih baru: tunggu data lain
+                    self._bangun.wait(timeout=sisa_jendela)
+                    continue
+
+            semua_terkirim = True
+            for perangkat, daftar_seq, daftar_waktu, buat_payload in self._buat_pesan(baris_spool, replay):
+                if replay:
+                    jeda = waktu_kirim_berikut - time.monotonic()
+                    if jeda > 0 and berhenti.wait(timeout=jeda):
+                        return
+                    waktu_kirim_berikut = max(waktu_kirim_berikut, time.monotonic()) + 1.0 / self.laju_maks
+                topik = self.topik(perangkat)
+                waktu_kirim = time.time()
+                if not self._publikasikan(topik, buat_payload(waktu_kirim), daftar_seq, berhenti):
+                    PUBLISH_GAGAL.tambah()
+                    print(f"   -> Gagal mempublikasikan pesan; disimpan di spool untuk dikirim ulang.")
+                    semua_terkirim = False
+                    break
+                PESAN_DIPUBLIKASIKAN.tambah()
+                PEMBACAAN_DIPUBLIKASIKAN.tambah(len(daftar_seq), perangkat=perangkat)
+                for waktu_baca in daftar_waktu:
+                    LATENSI_BACA_PUBLISH.amati(waktu_kirim - waktu_baca)
+                if LOG_PER_PESAN:
+                    print(f"   -> Dipublikasikan ke topik '{topik}' (seq {daftar_seq[0]}"
+                          + (f"-{daftar_seq[-1]}" if len(daftar_seq) > 1 else "") + ")")
+            if semua_terkirim:
+                kursor = baris_spool[-1][0]
+
+# --- PENGELOLA PERANGKAT (MULTI-PORT, HOT-PLUG) ---
+class PengelolaPerangkat:
+    """
+    Menjalankan satu thread pembaca per port serial dan memantau port yang
+    muncul/hilang (hot-plug). Semua perangkat berbagi satu spool dan satu
+    koneksi MQTT; pembacaan setiap perangkat dipublikasikan ke '<topic>/<nama>'.
+    Port yang ada tetapi gagal dibuka dicoba ulang dengan jeda yang naik dua
+    kali lipat (maks JEDA_BUKA_ULANG_MAKS), dan error-nya dicetak sekali.
+
+    Args:
+        spool (SpoolTelemetri): Spool bersama.
+        penerbit (PenerbitSpool): Penerbit bersama (jumlah_perangkat diperbarui).
+        berhenti (threading.Event): Sinyal berhenti global.
+        perangkat (list): Dict {'nama', 'serial', 'baud'} dari konfigurasi.
+        pola_pindai (list): Pola glob port yang ditambahkan otomatis
+                            (nama perangkat = nama file port), mis. '/dev/ttyUSB*'.
+        baud_default (int): Baud rate untuk port hasil pindai.
+    """
+
+    def __init__(self, spool, penerbit, berhenti, perangkat, pola_pindai=(), baud_default=BAUD_RATE):
+        self.spool = spool
+        self.penerbit = penerbit
+        self.berhenti = berhenti
+        self.perangkat = {p['nama']: p for p in perangkat}
+        self.pola_pindai = list(pola_pindai)
+        self.baud_default = baud_default
+        self._thread = {}
+        self._menunggu = set() # Perangkat yang sudah dilaporkan belum tersedia
+        self._gagal_buka = {}  # nama -> (jumlah gagal berturut-turut, waktu monotonic coba berikutnya)
+
+    def _port_tersedia(self):
+        from serial.tools import list_ports
+        tersedia = {port.device for port in list_ports.comports()}
+        for pola in self.pola_pindai:
+            for port in glob.glob(pola):
+                tersedia.add(port)
+                nama = os.path.basename(port)
+                if nama not in self.perangkat:
+                    self.perangkat[nama] = {'nama': nama, 'serial': port, 'baud': self.baud_default}
+        return tersedia
+
+    def _jalankan_perangkat(self, konfigurasi):
+        nama = konfigurasi['nama']
+        gagal = self._gagal_buka.get(nama)
+        # Error hanya dicetak pada kegagalan pertama; percobaan ulang berikutnya diam
+        ser = buka_serial(konfigurasi['serial'], konfigurasi.get('baud', self.baud_default),
+                          cetak_error=gagal is None)
+        if ser is None:
+            jumlah_gagal = 1 if gagal is None else gagal[0] + 1
+            jeda = min(JEDA_BUKA_ULANG_MAKS, INTERVAL_PINDAI * 2 ** (jumlah_gagal - 1))
+            if gagal is None:
+                print(f"Port {konfigurasi['serial']} dicoba lagi dengan jeda bertahap "
+                      f"(maks {JEDA_BUKA_ULANG_MAKS:g} detik).")
+            self._gagal_buka[nama] = (jumlah_gagal, time.monotonic() + jeda)
+            return
+        self._gagal_buka.pop(nama, None)
+        try:
+            baca_serial(ser, self.spool, self.berhenti, konfigurasi['nama'])
+        finally:
+            ser.close()
+
+    def periksa(self):
+        """Memulai thread untuk port yang (kembali) tersedia; dipanggil berkala."""
+        tersedia = self._port_tersedia()
+        for nama, konfigurasi in self.perangkat.items():
+            thread = self._thread.get(nama)
+            if thread is not None and thread.is_alive():
+                continue
+            port = konfigurasi['serial']
+            # Port Windows (COMx) hanya terlihat lewat list_ports; path lain dicek langsung
+            if port not in tersedia and not os.path.exists(port):
+                if nama not in self._menunggu:
+                    print(f"Menunggu perangkat '{nama or port}' di port {port}...")
+                    self._menunggu.add(nama)
+                self._gagal_buka.pop(nama, None) # Port dicabut: saat muncul lagi langsung dicoba
+                continue
+            self._menunggu.discard(nama)
+            gagal = self._gagal_buka.get(nama)
+            if gagal is not None:
+                if time.monotonic() < gagal[1]:
+                    continue # Port ada tapi gagal dibuka: tunggu jeda backoff
+            elif thread is None:
+                print(f"Perangkat '{nama or port}' ditemukan di {port}.")
+            else:
+                print(f"Perangkat '{nama or port}' di {port} tersambung kembali.")
+            self._thread[nama] = threading.Thread(target=self._jalankan_perangkat, args=(konfigurasi,),
+                                                  name=f"pembaca_{nama or 'serial'}", daemon=True)
+            self._thread[nama].start()
+        self.penerbit.jumlah_perangkat = max(1, sum(t.is_alive() for t in self._thread.values()))
+
+    def tunggu_selesai(self):
+        for thread in self._thread.values():
+            thread.join()
+
+def muat_konfigurasi(path):
+    """
+    Memuat konfigurasi bridge multi-perangkat (JSON), contoh:
+
+        {
+          "broker": "192.168.28.10",
+          "port": 1883,
+          "topic": "projek/data_cahaya",
+          "perangkat": [
+            {"nama": "tracker01", "serial": "/dev/ttyUSB0", "baud": 9600},
+            {"nama": "tracker02", "serial": "COM14"}
+          ],
+          "pindai": ["/dev/serial/by-id/usb-Arduino*"]
+        }
+
+    Kunci lain (batch, jendela_batch, spool, maks_spool, laju_maks) menimpa
+    nilai default command line.
+    """
+    with open(path) as f:
+        konfigurasi = json.load(f)
+    for i, perangkat in enumerate(konfigurasi.get('perangkat', [])):
+        if 'serial' not in perangkat:
+            raise ValueError(f"Perangkat ke-{i + 1} di '{path}' tidak punya kunci 'serial'.")
+        perangkat.setdefault('nama', os.path.basename(perangkat['serial']))
+    return konfigurasi
+
+# --- PROGRAM UTAMA ---
+def main():
+    parser = argparse.ArgumentParser(description="Bridge data serial Arduino ke MQTT.")
+    parser.add_argument('--config', default=None,
+                        help="File JSON konfigurasi multi-perangkat (lihat muat_konfigurasi).")
+    parser.add_argument('--serial', default=SERIAL_PORT, help="Port serial Arduino (mode satu perangkat).")
+    parser.add_argument('--baud', type=int, default=BAUD_RATE)
+    parser.add_argument('--broker', default=MQTT_BROKER_HOST)
+    parser.add_argument('--port', type=int, default=MQTT_BROKER_PORT)
+    parser.add_argument('--topic', default=MQTT_TOPIC)
+    parser.add_argument('--batch', type=int, default=1,
+                        help="Jumlah pembacaan per pesan biner (1 = satu pesan JSON per baris, seperti semula).")
+    parser.add_argument('--jendela-batch', type=float, default=1.0,
+                        help="Batas waktu (detik) pengumpulan satu batch.")
+    parser.add_argument('--tanpa-kompres', action='store_true', help="Jangan kompres batch dengan zlib.")
+    parser.add_argument('--spool', default=PATH_SPOOL_DEFAULT, help="File spool SQLite (store-and-forward).")
+    parser.add_argument('--maks-spool', type=int, default=MAKS_BARIS_DEFAULT,
+                        help="Jumlah baris maksimum di spool; baris tertua dibuang jika penuh.")
+    parser.add_argument('--laju-maks', type=float, default=LAJU_MAKS_DEFAULT,
+                        help="Batas pesan per detik saat mengirim ulang backlog (data live tidak dibatasi).")
+    parser.add_argument('--interval-pindai', type=float, default=INTERVAL_PINDAI,
+                        help="Interval (detik) pemeriksaan port serial yang muncul/hilang.")
+    parser.add_argument('--verbose', action='store_true', help="Cetak log untuk setiap baris/pesan.")
+    parser.add_argument('--port-metrik', type=int, default=0,
+                        help="Port HTTP lokal untuk endpoint /metrics (0 = nonaktif).")
+    parser.add_argument('--interval-statistik', type=float, default=10.0,
+                        help="Interval (detik) ringkasan metrik di log dan topik statistik (0 = nonaktif).")
+    parser.add_argument('--topik-statistik', default=MQTT_TOPIC_STATISTIK,
+                        help="Topik ringkasan metrik berkala ('' = hanya log).")
+    args = parser.parse_args()
+
+    if args.config:
+        try:
+            konfigurasi = muat_konfigurasi(args.config)
+        except (OSError, ValueError) as e:
+            parser.error(f"konfigurasi '{args.config}' tidak valid: {e}")
+        for kunci, nilai in konfigurasi.items():
+            if kunci not in ('perangkat', 'pindai'):
+                setattr(args, kunci, nilai)
+        daftar_perangkat = konfigurasi.get('perangkat', [])
+        pola_pindai = konfigurasi.get('pindai', [])
+    else:
+        # Mode satu perangkat: topik tanpa sub-topik, sama seperti semula
+        daftar_perangkat = [{'nama': '', 'serial': args.serial, 'baud': args.baud}]
+        pola_pindai = []
+    if not 1 <= args.batch <= MAKS_JUMLAH:
+        parser.error(f"--batch harus antara 1 dan {MAKS_JUMLAH}")
+
+    global LOG_PER_PESAN
+    LOG_PER_PESAN = args.verbose
+
+    print("Memulai MQTT Bridge...")
+    spool = SpoolTelemetri(args.spool, args.maks_spool)
+    METRIK.gauge('spool_backlog', "Baris di spool yang belum dikonfirmasi broker.",
+                 fungsi=lambda: spool.jumlah_tersimpan)
+    METRIK.gauge('baris_dibuang_spool', "Baris tertua yang dibuang karena spool penuh.",
+                 fungsi=lambda: spool.jumlah_dibuang)
+    jumlah_backlog = spool.jumlah()
+    if jumlah_backlog:
+        print(f"Spool '{args.spool}' berisi {jumlah_backlog} baris yang belum terkirim.")
+
+    # Satu koneksi MQTT untuk semua perangkat
+    client = buat_client_mqtt()
+    penerbit = PenerbitSpool(client, spool, args.topic, args.batch, args.jendela_batch,
+                             not args.tanpa_kompres, args.laju_maks)
+    # connect_async: bridge tetap berjalan (dan menyimpan ke spool) walau broker belum terjangkau
+    client.connect_async(args.broker, args.port, 60)
+    client.loop_start()
+    print(f"Menghubungkan ke MQTT Broker di {args.broker} di latar belakang...")
+
+    berhenti = threading.Event()
+    pengelola = PengelolaPerangkat(spool, penerbit, berhenti, daftar_perangkat, pola_pindai, args.baud)
+    thread_penerbit = threading.Thread(target=penerbit.jalankan, args=(berhenti,), name="penerbit_mqtt")
+    thread_penerbit.start()
+    if args.port_metrik:
+        jalankan_server_http(METRIK, args.port_metrik)
+        print(f"Metrik tersedia di http://127.0.0.1:{args.port_metrik}/metrics")
+    if args.interval_statistik > 0:
+        threading.Thread(target=laporkan_berkala, name="laporan_statistik", daemon=True,
+                         args=(METRIK, args.interval_statistik, berhenti, client, args.topik_statistik)).start()
+
+    try:
+        # Thread utama memeriksa port serial yang muncul/hilang sampai Ctrl+C
+        pengelola.periksa()
+        while not berhenti.wait(timeout=args.interval_pindai):
+            pengelola.periksa()
+    except KeyboardInterrupt:
+        print("\nProgram dihentikan.")
+    finally:
+        berhenti.set()
+        spool.ada_data.set()
+        pengelola.tunggu_selesai()
+        thread_penerbit.join()
+        # Membersihkan koneksi
+        client.loop_stop()
+        client.disconnect()
+        print(f"Koneksi serial dan MQTT ditutup. {spool.jumlah()} baris tersisa di spool.")
+        spool.tutup()
+
+if __name__ == "__main__":
+    main()
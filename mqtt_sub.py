@@ -1,5 +1,13 @@
 import paho.mqtt.client as mqtt
 import json
+import time
+import argparse
+import threading
+from enkode_telemetri import dekode_pesan
+from spool_telemetri import PenyaringDuplikat
+from penyimpanan_telemetri import PenyimpananTelemetri
+from analitik_telemetri import AnalitikTelemetri
+from metrik_telemetri import RegistriMetrik, jalankan_server_http, laporkan_berkala
 
 # --- KONFIGURASI (SESUAIKAN DI SINI) ---
 # GANTI dengan IP Address LOKAL dari komputer yang menjalankan broker
@@ -7,49 +15,152 @@ import json
 MQTT_BROKER_HOST = '192.168.205.248' # CONTOH! GANTI DENGAN IP ANDA
 MQTT_BROKER_PORT = 1883
 MQTT_TOPIC = 'projek/data_cahaya' # Harus sama persis dengan di bridge
+MQTT_TOPIC_STATISTIK = 'projek/statistik/subscriber' # Ringkasan metrik berkala (JSON)
+MQTT_TOPIC_PERINGATAN = 'projek/peringatan' # Peringatan anomali (JSON), per perangkat di '<topik>/<nama>'
+
+# Bridge mengirim ulang pesan yang belum dikonfirmasi setelah reconnect;
+# pembacaan dengan seq yang sudah diterima dibuang
+penyaring_duplikat = PenyaringDuplikat()
+# Diisi di program utama jika --simpan diberikan
+penyimpanan = None
+# Statistik bergulir dan deteksi anomali per perangkat
+analitik = AnalitikTelemetri()
+
+# --- METRIK ---
+# Cetak 6 baris per pesan hanya dengan --verbose; selain itu ringkasan berkala
+LOG_PER_PESAN = False
+METRIK = RegistriMetrik('subscriber')
+PESAN_DITERIMA = METRIK.penghitung('pesan_diterima_total', "Pesan MQTT yang diterima.")
+PEMBACAAN_DITERIMA = METRIK.penghitung('pembacaan_diterima_total', "Pembacaan unik yang diterima.",
+                                       label=('perangkat',))
+DECODE_GAGAL = METRIK.penghitung('decode_gagal_total', "Pesan yang gagal didekode.")
+METRIK.gauge('duplikat_total', "Pembacaan duplikat (kirim ulang bridge) yang dibuang.",
+             fungsi=lambda: penyaring_duplikat.jumlah_duplikat)
+# Latensi memakai timestamp di payload; butuh jam bridge dan subscriber yang sinkron (NTP)
+LATENSI_PUBLISH_TERIMA = METRIK.histogram('latensi_publish_terima_detik',
+                                          "Latensi dari publish di bridge sampai diterima subscriber.")
+LATENSI_BACA_TERIMA = METRIK.histogram('latensi_baca_terima_detik',
+                                       "Latensi dari baris terbaca di serial bridge sampai diterima subscriber.")
+PERINGATAN = METRIK.penghitung('peringatan_total', "Anomali yang terdeteksi.", label=('jenis',))
+for _nama, _bantuan in [('tegangan_rata2', "Rata-rata tegangan_v di jendela analitik."),
+                        ('tegangan_std', "Simpangan baku tegangan_v di jendela analitik."),
+                        ('error_centroid_rata2', "Rata-rata jarak centroid ke target optimal."),
+                        ('jitter_azimuth_deg', "RMS langkah sudut azimuth per pembacaan."),
+                        ('jitter_elevasi_deg', "RMS langkah sudut elevasi per pembacaan.")]:
+    METRIK.gauge(_nama, _bantuan, label=('perangkat',), fungsi=lambda kunci=_nama: analitik.nilai(kunci))
 
 # --- FUNGSI CALLBACK ---
 def on_connect(client, userdata, flags, rc):
     """Callback yang dipanggil saat berhasil terhubung ke broker."""
     if rc == 0:
         print("Berhasil terhubung ke MQTT Broker!")
-        print(f"Berlangganan (subscribing) ke topik: '{MQTT_TOPIC}'")
-        client.subscribe(MQTT_TOPIC)
+        # '#' juga mencakup topik dasar (bridge satu perangkat)
+        print(f"Berlangganan (subscribing) ke topik: '{MQTT_TOPIC}/#'")
+        client.subscribe(MQTT_TOPIC + '/#', qos=1)
     else:
         print(f"Gagal terhubung, kode: {rc}")
 
 def on_message(client, userdata, msg):
     """Callback yang dipanggil saat ada pesan baru di topik yang dilanggani."""
-    print("\n--- Pesan Baru Diterima ---")
+    waktu_terima = time.time()
+    PESAN_DITERIMA.tambah()
     try:
-        # Decode pesan dari bytes menjadi string, lalu parse sebagai JSON
-        payload_str = msg.payload.decode('utf-8')
-        data = json.loads(payload_str)
+        # Payload berupa JSON satu pembacaan atau batch biner dari bridge (--batch)
+        daftar_data = penyaring_duplikat.saring(msg.topic, dekode_pesan(msg.payload))
+    except Exception as e:
+        DECODE_GAGAL.tambah()
+        if LOG_PER_PESAN:
+            print("\n--- Pesan Baru Diterima ---")
+            print(f"Gagal memproses pesan. Error: {e}")
+            print(f"Payload mentah: {msg.payload}")
+        return
 
-        # Tampilkan data dengan rapi menggunakan metode .get() untuk keamanan
-        print(f"  Koordinat X  : {data.get('koordinat_x', 'N/A'):.4f}")
-        print(f"  Koordinat Y  : {data.get('koordinat_y', 'N/A'):.4f}")
-        print(f"  Tegangan     : {data.get('tegangan_v', 'N/A'):.2f} V")
-        print(f"  Sudut Azimuth: {data.get('rotasi_azimuth_deg', 'N/A'):.1f}°")
-        print(f"  Sudut Elevasi: {data.get('rotasi_elevasi_deg', 'N/A'):.1f}°")
+    # Bridge multi-perangkat mempublikasikan ke '<MQTT_TOPIC>/<nama perangkat>'
+    perangkat = msg.topic[len(MQTT_TOPIC) + 1:] if msg.topic.startswith(MQTT_TOPIC + '/') else ''
+    if daftar_data and penyimpanan is not None:
+        penyimpanan.tambah(perangkat, daftar_data, waktu_terima)
+    for peringatan in analitik.proses(perangkat, daftar_data):
+        if peringatan['status'] == 'aktif':
+            PERINGATAN.tambah(jenis=peringatan['jenis'])
+        print(f"[PERINGATAN] {peringatan['perangkat'] or '-'} {peringatan['jenis']} "
+              f"{peringatan['status']}: {peringatan['pesan']}")
+        if client is not None:
+            topik = MQTT_TOPIC_PERINGATAN + (f"/{perangkat}" if perangkat else '')
+            client.publish(topik, json.dumps(peringatan), qos=1)
+    if daftar_data:
+        PEMBACAAN_DITERIMA.tambah(len(daftar_data), perangkat=perangkat)
+        if 'waktu_kirim' in daftar_data[0]:
+            LATENSI_PUBLISH_TERIMA.amati(waktu_terima - daftar_data[0]['waktu_kirim'])
+    for data in daftar_data:
+        if 'waktu' in data:
+            LATENSI_BACA_TERIMA.amati(waktu_terima - data['waktu'])
+        if not LOG_PER_PESAN:
+            continue
+        print(f"\n--- Pesan Baru Diterima{f' dari {perangkat}' if perangkat else ''} ---")
+        try:
+            # Tampilkan data dengan rapi menggunakan metode .get() untuk keamanan
+            print(f"  Koordinat X  : {data.get('koordinat_x', 'N/A'):.4f}")
+            print(f"  Koordinat Y  : {data.get('koordinat_y', 'N/A'):.4f}")
+            print(f"  Tegangan     : {data.get('tegangan_v', 'N/A'):.2f} V")
+            print(f"  Sudut Azimuth: {data.get('rotasi_azimuth_deg', 'N/A'):.1f}°")
+            print(f"  Sudut Elevasi: {data.get('rotasi_elevasi_deg', 'N/A'):.1f}°")
 
-    except Exception as e:
-        print(f"Gagal memproses pesan. Error: {e}")
-        print(f"Payload mentah: {msg.payload}")
+        except Exception as e:
+            print(f"Gagal memproses pesan. Error: {e}")
+            print(f"Data: {data}")
 
 
 # --- INISIALISASI DAN LOOP ---
-client = mqtt.Client(mqtt.CallbackAPIVersion.VERSION1, "laptop_subscriber")
-client.on_connect = on_connect
-client.on_message = on_message
-
-print(f"Mencoba terhubung ke MQTT Broker di {MQTT_BROKER_HOST}...")
-try:
-    client.connect(MQTT_BROKER_HOST, MQTT_BROKER_PORT, 60)
-except Exception as e:
-    print(f"GAGAL terhubung. Error: {e}")
-    print("Pastikan IP Broker sudah benar dan kedua komputer berada di jaringan WiFi yang sama.")
-    exit()
-
-# loop_forever() akan menahan program agar terus berjalan dan mendengarkan pesan
-client.loop_forever()
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Subscriber telemetri tracker cahaya.")
+    parser.add_argument('--broker', default=MQTT_BROKER_HOST)
+    parser.add_argument('--port', type=int, default=MQTT_BROKER_PORT)
+    parser.add_argument('--verbose', action='store_true', help="Cetak setiap pembacaan yang diterima.")
+    parser.add_argument('--port-metrik', type=int, default=0,
+                        help="Port HTTP lokal untuk endpoint /metrics (0 = nonaktif).")
+    parser.add_argument('--interval-statistik', type=float, default=10.0,
+                        help="Interval (detik) ringkasan metrik di log dan topik statistik (0 = nonaktif).")
+    parser.add_argument('--topik-statistik', default=MQTT_TOPIC_STATISTIK,
+                        help="Topik ringkasan metrik berkala ('' = hanya log).")
+    parser.add_argument('--simpan', default=None, metavar='PATH',
+                        help="Simpan telemetri ke file SQLite time-series (mis. telemetri.sqlite).")
+    args = parser.parse_args()
+    LOG_PER_PESAN = args.verbose
+
+    if args.simpan:
+        penyimpanan = PenyimpananTelemetri(args.simpan)
+        METRIK.gauge('pembacaan_tersimpan_total', "Pembacaan yang sudah ditulis ke penyimpanan.",
+                     fungsi=lambda: penyimpanan.jumlah_ditulis)
+        METRIK.gauge('buffer_penyimpanan', "Pembacaan yang menunggu ditulis ke penyimpanan.",
+                     fungsi=penyimpanan.jumlah_buffer)
+        print(f"Telemetri disimpan ke {args.simpan}")
+
+    client = mqtt.Client(mqtt.CallbackAPIVersion.VERSION1, "laptop_subscriber")
+    client.on_connect = on_connect
+    client.on_message = on_message
+
+    print(f"Mencoba terhubung ke MQTT Broker di {args.broker}...")
+    try:
+        client.connect(args.broker, args.port, 60)
+    except Exception as e:
+        print(f"GAGAL terhubung. Error: {e}")
+        print("Pastikan IP Broker sudah benar dan kedua komputer berada di jaringan WiFi yang sama.")
+        exit()
+
+    berhenti = threading.Event()
+    if args.port_metrik:
+        jalankan_server_http(METRIK, args.port_metrik)
+        print(f"Metrik tersedia di http://127.0.0.1:{args.port_metrik}/metrics")
+    if args.interval_statistik > 0:
+        threading.Thread(target=laporkan_berkala, name="laporan_statistik", daemon=True,
+                         args=(METRIK, args.interval_statistik, berhenti, client, args.topik_statistik)).start()
+
+    # loop_forever() akan menahan program agar terus berjalan dan mendengarkan pesan
+    try:
+        client.loop_forever()
+    except KeyboardInterrupt:
+        print("\nProgram dihentikan.")
+    finally:
+        berhenti.set()
+        if penyimpanan is not None:
+            penyimpanan.tutup()
@@ -0,0 +1,166 @@
+import numpy as np
+
+# Pencarian titik fitur cahaya yang menghasilkan prediksi tegangan tertinggi.
+#
+# Jumlah prediksi model dibatasi anggaran tetap (anggaran_evaluasi), berapa pun
+# jumlah fiturnya. Tahap kasar memakai grid penuh n_titik^d jika muat dalam
+# anggaran; jika tidak (mis. 5 fitur x 25 titik = 9,8 juta), titik diambil dengan
+# Latin hypercube sebanyak anggaran. Grid tidak pernah dibentuk utuh di memori:
+# indeks grid dibangkitkan per chunk (np.unravel_index), diprediksi, lalu hanya
+# top-k terbaik yang disimpan. Setelah tahap kasar, area di sekitar setiap
+# kandidat terbaik dipersempit dan dicari ulang dengan cara yang sama
+# (coarse-to-fine), tetap di dalam batas fitur yang diobservasi.
+# Top-k dipilih dengan non-maximum suppression: kandidat yang terlalu dekat dengan
+# kandidat yang lebih baik dibuang, sehingga hasilnya optimum yang berbeda, bukan
+# beberapa titik bertetangga di puncak yang sama.
+
+UKURAN_POOL_MAKS = 10_000 # Batas kandidat yang disimpan selama pencarian grid
+ANGGARAN_EVALUASI_DEFAULT = 100_000 # Batas total prediksi model (separuh tahap kasar, separuh refinement)
+
+def _prediksi(model, X, kolom_fitur):
+    # Model sklearn yang dilatih dengan DataFrame mengharapkan nama kolom yang sama
+    if hasattr(model, 'feature_names_in_'):
+        import pandas as pd
+        return model.predict(pd.DataFrame(X, columns=kolom_fitur))
+    return model.predict(X)
+
+def _gabung_top_k(X_terbaik, y_terbaik, X_baru, y_baru, top_k):
+    X = np.vstack([X_terbaik, X_baru])
+    y = np.concatenate([y_terbaik, y_baru])
+    if len(y) > top_k:
+        indeks = np.argpartition(-y, top_k - 1)[:top_k]
+        X, y = X[indeks], y[indeks]
+    return X, y
+
+def _pilih_berjauhan(X, y, top_k, skala, jarak_min):
+    # Non-maximum suppression: ambil titik terbaik, buang yang jarak Chebyshev
+    # ternormalisasinya ke titik terpilih < jarak_min, ulangi
+    X_norm = X / skala
+    dipilih = []
+    for i in np.argsort(-y, kind='stable'):
+        if dipilih and np.abs(X_norm[dipilih] - X_norm[i]).max(axis=1).min() < jarak_min:
+            continue
+        dipilih.append(i)
+        if len(dipilih) == top_k:
+            break
+    return X[dipilih], y[dipilih]
+
+def _sampel_lhs(batas_bawah, batas_atas, n_sampel, rng):
+    # Latin hypercube: rentang setiap fitur dibagi n_sampel strata, tiap stratum terisi tepat sekali
+    d = len(batas_bawah)
+    strata = np.column_stack([rng.permutation(n_sampel) for _ in range(d)])
+    u = (strata + rng.random((n_sampel, d))) / n_sampel
+    return batas_bawah + u * (batas_atas - batas_bawah)
+
+def _cari_sampel(model, kolom_fitur, X, top_k, ukuran_chunk):
+    X_terbaik = np.empty((0, len(kolom_fitur)))
+    y_terbaik = np.empty(0)
+    for mulai in range(0, len(X), ukuran_chunk):
+        X_chunk = X[mulai:mulai + ukuran_chunk]
+        y_chunk = _prediksi(model, X_chunk, kolom_fitur)
+        X_terbaik, y_terbaik = _gabung_top_k(X_terbaik, y_terbaik, X_chunk, y_chunk, top_k)
+    return X_terbaik, y_terbaik, len(X)
+
+def _cari_grid(model, kolom_fitur, nilai_grid, top_k, ukuran_chunk):
+    bentuk = tuple(len(nilai) for nilai in nilai_grid)
+    total = int(np.prod(bentuk, dtype=np.int64))
+    X_terbaik = np.empty((0, len(kolom_fitur)))
+    y_terbaik = np.empty(0)
+    for mulai in range(0, total, ukuran_chunk):
+        indeks = np.arange(mulai, min(total, mulai + ukuran_chunk))
+        koordinat = np.unravel_index(indeks, bentuk)
+        X_chunk = np.column_stack([nilai[k] for nilai, k in zip(nilai_grid, koordinat)])
+        y_chunk = _prediksi(model, X_chunk, kolom_fitur)
+        X_terbaik, y_terbaik = _gabung_top_k(X_terbaik, y_terbaik, X_chunk, y_chunk, top_k)
+    return X_terbaik, y_terbaik, total
+
+def _buat_grid(batas_bawah, batas_atas, n_titik):
+    return [np.linspace(bawah, atas, n_titik) if atas > bawah else np.array([bawah])
+            for bawah, atas in zip(batas_bawah, batas_atas)]
+
+def _cari_kotak(model, kolom_fitur, batas_bawah, batas_atas, n_titik, anggaran, top_k, ukuran_chunk, rng):
+    # Grid penuh jika muat dalam anggaran, selain itu Latin hypercube sebanyak anggaran.
+    # Mengembalikan juga resolusi efektif (titik per fitur) untuk lebar langkah berikutnya.
+    d = int(np.sum(batas_atas > batas_bawah))
+    if n_titik ** d <= anggaran:
+        X, y, n = _cari_grid(model, kolom_fitur, _buat_grid(batas_bawah, batas_atas, n_titik), top_k, ukuran_chunk)
+        return X, y, n, n_titik
+    X, y, n = _cari_sampel(model, kolom_fitur, _sampel_lhs(batas_bawah, batas_atas, anggaran, rng),
+                           top_k, ukuran_chunk)
+    return X, y, n, max(2, int(anggaran ** (1.0 / d)))
+
+def cari_titik_optimum(model, batas_fitur, n_titik=25, top_k=5, n_refinement=3, n_titik_refinement=None,
+                       ukuran_chunk=20_000, jarak_min=None, anggaran_evaluasi=ANGGARAN_EVALUASI_DEFAULT, seed=0):
+    """
+    Mencari top-k titik fitur dengan prediksi tegangan tertinggi.
+
+    Args:
+        model: Model terlatih dengan metode predict (mis. sklearn regressor).
+        batas_fitur (dict): nama fitur -> (min, max), biasanya dari data aktual.
+                            Urutan kunci harus sama dengan urutan fitur saat pelatihan.
+        n_titik (int): Jumlah titik per fitur pada grid kasar (jika n_titik^d
+                       melebihi anggaran, diganti sampel Latin hypercube).
+        top_k (int): Jumlah titik terbaik yang dikembalikan.
+        n_refinement (int): Jumlah putaran penyempitan (0 = hanya grid kasar).
+        n_titik_refinement (int): Jumlah titik per fitur di setiap grid halus
+                                  (default sama dengan n_titik, maksimal 11).
+        ukuran_chunk (int): Jumlah titik grid yang diprediksi sekaligus;
+                            membatasi pemakaian memori (prediktor pohon
+                            mengalokasikan array chunk x jumlah pohon per level).
+        jarak_min (float): Jarak minimum antar titik top-k, relatif terhadap
+                           rentang tiap fitur (jarak Chebyshev). Default satu
+                           langkah tahap kasar, 1 / (n_titik - 1) untuk grid penuh.
+        anggaran_evaluasi (int): Batas total prediksi model; separuh untuk tahap
+                                 kasar, separuh dibagi rata ke setiap pencarian
+                                 lokal refinement (seluruhnya jika n_refinement=0).
+        seed (int): Seed sampel Latin hypercube.
+
+    Returns:
+        tuple: (pd.DataFrame top-k berisi kolom fitur + 'prediksi_tegangan',
+                diurutkan menurun, jumlah total titik yang dievaluasi)
+    """
+    kolom_fitur = list(batas_fitur)
+    batas_bawah = np.array([batas_fitur[kolom][0] for kolom in kolom_fitur], dtype=float)
+    batas_atas = np.array([batas_fitur[kolom][1] for kolom in kolom_fitur], dtype=float)
+    if n_titik_refinement is None:
+        n_titik_refinement = min(n_titik, 11)
+    rng = np.random.default_rng(seed)
+    skala = np.where(batas_atas > batas_bawah, batas_atas - batas_bawah, 1.0)
+    # Simpan cukup kandidat agar top-k tetap terisi setelah tetangga satu puncak dibuang
+    ukuran_pool = min(UKURAN_POOL_MAKS, top_k * 3 ** len(kolom_fitur))
+    anggaran_kasar = anggaran_evaluasi // 2 if n_refinement > 0 else anggaran_evaluasi
+    anggaran_lokal = max(1, (anggaran_evaluasi - anggaran_kasar) // max(1, n_refinement * top_k))
+
+    X_pool, y_pool, total_evaluasi, n_efektif = _cari_kotak(model, kolom_fitur, batas_bawah, batas_atas, n_titik,
+                                                            max(ukuran_pool, anggaran_kasar), ukuran_pool,
+                                                            ukuran_chunk, rng)
+    langkah = (batas_atas - batas_bawah) / max(1, n_efektif - 1)
+    if jarak_min is None:
+        jarak_min = 1.0 / max(1, n_efektif - 1)
+    X_terbaik, y_terbaik = _pilih_berjauhan(X_pool, y_pool, top_k, skala, jarak_min)
+
+    for _ in range(n_refinement):
+        if not np.any(langkah > 0):
+            break
+        X_kandidat, y_kandidat = X_pool, y_pool
+        for titik in X_terbaik:
+            # Grid halus selebar satu langkah grid sebelumnya di sekitar titik
+            bawah = np.maximum(batas_bawah, titik - langkah)
+            atas = np.minimum(batas_atas, titik + langkah)
+            X_lokal, y_lokal, n_lokal, n_efektif = _cari_kotak(model, kolom_fitur, bawah, atas, n_titik_refinement,
+                                                               anggaran_lokal, 1, ukuran_chunk, rng)
+            total_evaluasi += n_lokal
+            X_kandidat = np.vstack([X_kandidat, X_lokal])
+            y_kandidat = np.concatenate([y_kandidat, y_lokal])
+        # Dua kandidat yang menyempit ke puncak yang sama: yang lebih rendah dibuang
+        # dan digantikan kandidat berikutnya dari pool
+        X_pool, y_pool = _gabung_top_k(np.empty((0, len(kolom_fitur))), np.empty(0),
+                                       X_kandidat, y_kandidat, ukuran_pool)
+        X_terbaik, y_terbaik = _pilih_berjauhan(X_pool, y_pool, top_k, skala, jarak_min)
+        langkah = 2 * langkah / max(1, n_efektif - 1)
+
+    import pandas as pd # Di-import saat dibutuhkan agar modul ini ringan dimuat
+    urutan = np.argsort(-y_terbaik)
+    df_hasil = pd.DataFrame(X_terbaik[urutan], columns=kolom_fitur)
+    df_hasil['prediksi_tegangan'] = y_terbaik[urutan]
+    return df_hasil, total_evaluasi
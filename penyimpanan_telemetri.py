@@ -0,0 +1,375 @@
+import os
+import sys
+import math
+import time
+import sqlite3
+import argparse
+import threading
+from enkode_telemetri import KOLOM_TELEMETRI
+
+# Penyimpanan time-series telemetri tracker untuk mqtt_sub.py (--simpan).
+#
+# Pembacaan yang diterima subscriber ditampung di memori lalu ditulis oleh satu
+# thread penulis dalam satu transaksi per batch (SQLite mode WAL), sehingga
+# on_message tidak pernah menunggu disk. Bersamaan dengan data mentah, tabel
+# ringkasan per 1 detik dan per 1 menit (n, jumlah/min/max tegangan dan sudut)
+# diperbarui secara inkremental lewat upsert; rata-rata = jumlah / n. Query
+# rentang waktu membaca tabel ringkasan lewat primary key (perangkat, ember),
+# tanpa memindai data mentah.
+#
+# Data mentah bisa langsung dipakai untuk pelatihan:
+#   python latih_model_regresi.py --dataset telemetri.sqlite \
+#       --fitur koordinat_x,koordinat_y --target tegangan_v
+# atau diekspor ke CSV:
+#   python penyimpanan_telemetri.py ekspor telemetri.sqlite data.csv --mulai 2024-05-01
+
+PATH_PENYIMPANAN_DEFAULT = 'telemetri.sqlite'
+EKSTENSI_SQLITE = ('.sqlite', '.sqlite3', '.db')
+
+# Resolusi ringkasan -> lebar ember (detik)
+RESOLUSI = {
+    '1s': 1,
+    '1m': 60,
+}
+# Kolom yang diringkas (mean/min/max); koordinat tidak diringkas karena bisa
+# berisi placeholder -1.0 (cahaya tidak terdeteksi)
+KOLOM_RINGKASAN = ['tegangan_v', 'rotasi_azimuth_deg', 'rotasi_elevasi_deg']
+NILAI_PLACEHOLDER = -1.0 # light_cx/cy_from_esp di servo.ino saat cahaya tidak terdeteksi
+
+def _tabel_ringkasan(resolusi):
+    if resolusi not in RESOLUSI:
+        raise ValueError(f"Resolusi '{resolusi}' tidak dikenal (pilih dari: {', '.join(RESOLUSI)}).")
+    return f"ringkasan_{resolusi}"
+
+def _sql_upsert(tabel):
+    kolom = ['perangkat', 'ember', 'n']
+    pembaruan = ['n = n + excluded.n']
+    for nama in KOLOM_RINGKASAN:
+        kolom += [f'{nama}_jumlah', f'{nama}_min', f'{nama}_max']
+        pembaruan += [f'{nama}_jumlah = {nama}_jumlah + excluded.{nama}_jumlah',
+                      f'{nama}_min = MIN({nama}_min, excluded.{nama}_min)',
+                      f'{nama}_max = MAX({nama}_max, excluded.{nama}_max)']
+    return (f"INSERT INTO {tabel} ({', '.join(kolom)}) VALUES ({', '.join('?' * len(kolom))}) "
+            f"ON CONFLICT(perangkat, ember) DO UPDATE SET {', '.join(pembaruan)}")
+
+def _ke_epoch(nilai):
+    """Menerima epoch detik atau string tanggal ISO ('2024-05-01', '2024-05-01T12:00')."""
+    if nilai is None or isinstance(nilai, (int, float)):
+        return nilai
+    try:
+        return float(nilai)
+    except ValueError:
+        from datetime import datetime
+        return datetime.fromisoformat(nilai).timestamp()
+
+def _filter_rentang(mulai, selesai, perangkat, kolom_waktu):
+    """Klausa WHERE untuk rentang [mulai, selesai) dan perangkat opsional."""
+    syarat, parameter = [], []
+    if perangkat is not None:
+        syarat.append("perangkat = ?")
+        parameter.append(perangkat)
+    if mulai is not None:
+        syarat.append(f"{kolom_waktu} >= ?")
+        parameter.append(_ke_epoch(mulai))
+    if selesai is not None:
+        syarat.append(f"{kolom_waktu} < ?")
+        parameter.append(_ke_epoch(selesai))
+    return (" WHERE " + " AND ".join(syarat)) if syarat else "", parameter
+
+class PenyimpananTelemetri:
+    """
+    Sink time-series SQLite dengan penulisan batch di thread latar.
+
+    Contoh:
+        penyimpanan = PenyimpananTelemetri('telemetri.sqlite')
+        penyimpanan.tambah('tracker01', daftar_data, time.time())  # dari on_message
+        penyimpanan.ringkasan('1m', mulai='2024-05-01', perangkat='tracker01')
+        penyimpanan.tutup()  # tulis sisa buffer
+    """
+
+    def __init__(self, path=PATH_PENYIMPANAN_DEFAULT, ukuran_batch=1000, interval_flush=1.0,
+                 maks_buffer=200_000, mode_baca=False):
+        self.path = path
+        self.ukuran_batch = ukuran_batch
+        self.interval_flush = interval_flush
+        self.maks_buffer = maks_buffer
+        self.jumlah_ditulis = 0
+        self.jumlah_dibuang = 0
+        self._buffer = []
+        self._kunci = threading.Lock()
+        self._lokal = threading.local()
+        self._ada_data = threading.Event()
+        self._berhenti = threading.Event()
+        self._thread = None
+
+        conn = self._koneksi()
+        if mode_baca:
+            return
+        kolom_mentah = ', '.join(f'{nama} REAL' for nama in KOLOM_TELEMETRI)
+        conn.execute(f"""
+            CREATE TABLE IF NOT EXISTS pembacaan (
+                waktu REAL NOT NULL,
+                perangkat TEXT NOT NULL,
+                seq INTEGER,
+                {kolom_mentah}
+            )
+        """)
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_pembacaan_perangkat_waktu ON pembacaan (perangkat, waktu)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_pembacaan_waktu ON pembacaan (waktu)")
+        kolom_agregat = ', '.join(f'{nama}_jumlah REAL, {nama}_min REAL, {nama}_max REAL'
+                                  for nama in KOLOM_RINGKASAN)
+        for resolusi in RESOLUSI:
+            tabel = _tabel_ringkasan(resolusi)
+            conn.execute(f"""
+                CREATE TABLE IF NOT EXISTS {tabel} (
+                    perangkat TEXT NOT NULL,
+                    ember INTEGER NOT NULL,
+                    n INTEGER NOT NULL,
+                    {kolom_agregat},
+                    PRIMARY KEY (perangkat, ember)
+                ) WITHOUT ROWID
+            """)
+            conn.execute(f"CREATE INDEX IF NOT EXISTS idx_{tabel}_ember ON {tabel} (ember)")
+        conn.commit()
+
+        self._sql_mentah = (f"INSERT INTO pembacaan (waktu, perangkat, seq, {', '.join(KOLOM_TELEMETRI)}) "
+                            f"VALUES ({', '.join('?' * (3 + len(KOLOM_TELEMETRI)))})")
+        self._sql_upsert = {resolusi: _sql_upsert(_tabel_ringkasan(resolusi)) for resolusi in RESOLUSI}
+        self._thread = threading.Thread(target=self._jalankan, name="penulis_telemetri", daemon=True)
+        self._thread.start()
+
+    def _koneksi(self):
+        conn = getattr(self._lokal, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._lokal.conn = conn
+        return conn
+
+    # --- Penulisan ---
+
+    def tambah(self, perangkat, daftar_data, waktu_terima=None):
+        """
+        Menampung pembacaan untuk ditulis di batch berikutnya (tanpa I/O).
+
+        Args:
+            perangkat (str): Nama perangkat asal.
+            daftar_data (list): Dict hasil dekode_pesan().
+            waktu_terima (float): Dipakai jika pembacaan tidak membawa 'waktu' (bridge lama).
+        """
+        if waktu_terima is None:
+            waktu_terima = time.time()
+        baris = [(data.get('waktu', waktu_terima), perangkat, data.get('seq'),
+                  *(data.get(nama) for nama in KOLOM_TELEMETRI)) for data in daftar_data]
+        with self._kunci:
+            self._buffer.extend(baris)
+            lebih = len(self._buffer) - self.maks_buffer
+            if lebih > 0:
+                # Disk tidak mengejar: buang pembacaan tertua daripada kehabisan memori
+                del self._buffer[:lebih]
+                self.jumlah_dibuang += lebih
+            penuh = len(self._buffer) >= self.ukuran_batch
+        if penuh:
+            self._ada_data.set()
+
+    def jumlah_buffer(self):
+        return len(self._buffer)
+
+    def _jalankan(self):
+        while not self._berhenti.is_set():
+            self._ada_data.wait(timeout=self.interval_flush)
+            self._ada_data.clear()
+            try:
+                self.flush()
+            except sqlite3.Error as e:
+                print(f"Gagal menulis telemetri ke {self.path}: {e}")
+                time.sleep(self.interval_flush)
+
+    def flush(self):
+        """Menulis isi buffer beserta ringkasannya dalam satu transaksi."""
+        with self._kunci:
+            baris, self._buffer = self._buffer, []
+        if not baris:
+            return 0
+
+        # Agregasi dulu di memori: satu upsert per (perangkat, ember), bukan per pembacaan
+        indeks_kolom = [3 + KOLOM_TELEMETRI.index(nama) for nama in KOLOM_RINGKASAN]
+        agregat = {resolusi: {} for resolusi in RESOLUSI}
+        for b in baris:
+            nilai = [b[i] for i in indeks_kolom]
+            if any(v is None or not math.isfinite(v) for v in nilai):
+                continue # Tetap disimpan mentah, tapi tidak ikut ringkasan
+            for resolusi, lebar in RESOLUSI.items():
+                kunci = (b[1], int(b[0] // lebar) * lebar)
+                a = agregat[resolusi].get(kunci)
+                if a is None:
+                    a = agregat[resolusi][kunci] = [0] + [x for v in nilai for x in (0.0, v, v)]
+                a[0] += 1
+                for j, v in enumerate(nilai):
+                    a[1 + 3 * j] += v
+                    if v < a[2 + 3 * j]:
+                        a[2 + 3 * j] = v
+                    if v > a[3 + 3 * j]:
+                        a[3 + 3 * j] = v
+
+        conn = self._koneksi()
+        try:
+            with conn:
+                conn.executemany(self._sql_mentah, baris)
+                for resolusi, isi in agregat.items():
+                    conn.executemany(self._sql_upsert[resolusi], (kunci + tuple(a) for kunci, a in isi.items()))
+        except sqlite3.Error:
+            # Kembalikan ke depan buffer agar dicoba lagi di flush berikutnya
+            with self._kunci:
+                self._buffer[:0] = baris
+            raise
+        self.jumlah_ditulis += len(baris)
+        return len(baris)
+
+    def tutup(self):
+        """Menghentikan thread penulis dan menulis sisa buffer."""
+        if self._thread is not None:
+            self._berhenti.set()
+            self._ada_data.set()
+            self._thread.join()
+            self._thread = None
+            self.flush()
+        conn = getattr(self._lokal, 'conn', None)
+        if conn is not None:
+            conn.close()
+            self._lokal.conn = None
+
+    # --- Query ---
+
+    def daftar_perangkat(self):
+        return [baris[0] for baris in self._koneksi().execute(
+            f"SELECT DISTINCT perangkat FROM {_tabel_ringkasan('1m')} ORDER BY perangkat")]
+
+    def ringkasan(self, resolusi='1m', mulai=None, selesai=None, perangkat=None):
+        """
+        Membaca ringkasan per ember dari tabel ringkasan (tanpa memindai data mentah).
+
+        Args:
+            resolusi (str): '1s' atau '1m'.
+            mulai, selesai: Rentang [mulai, selesai) sebagai epoch detik atau tanggal ISO.
+            perangkat (str): Nama perangkat, atau None untuk semua.
+
+        Returns:
+            list: Dict per (perangkat, ember) berisi 'perangkat', 'waktu' (awal ember),
+                  'n', serta '<kolom>_rata2', '<kolom>_min', '<kolom>_max'
+                  untuk setiap kolom di KOLOM_RINGKASAN.
+        """
+        where, parameter = _filter_rentang(mulai, selesai, perangkat, 'ember')
+        pilih = ', '.join(f'{nama}_jumlah / n, {nama}_min, {nama}_max' for nama in KOLOM_RINGKASAN)
+        kursor = self._koneksi().execute(
+            f"SELECT perangkat, ember, n, {pilih} FROM {_tabel_ringkasan(resolusi)}{where} "
+            f"ORDER BY ember, perangkat", parameter)
+        nama_kolom = ['perangkat', 'waktu', 'n'] + [f'{nama}_{agregat}' for nama in KOLOM_RINGKASAN
+                                                    for agregat in ('rata2', 'min', 'max')]
+        return [dict(zip(nama_kolom, baris)) for baris in kursor]
+
+    def pembacaan(self, mulai=None, selesai=None, perangkat=None, batas=None):
+        """
+        Membaca pembacaan mentah dalam rentang waktu (lewat indeks waktu).
+
+        Returns:
+            list: Dict per pembacaan berisi 'waktu', 'perangkat', 'seq' dan KOLOM_TELEMETRI.
+        """
+        where, parameter = _filter_rentang(mulai, selesai, perangkat, 'waktu')
+        nama_kolom = ['waktu', 'perangkat', 'seq'] + KOLOM_TELEMETRI
+        sql = f"SELECT {', '.join(nama_kolom)} FROM pembacaan{where} ORDER BY waktu"
+        if batas is not None:
+            sql += " LIMIT ?"
+            parameter.append(batas)
+        return [dict(zip(nama_kolom, baris)) for baris in self._koneksi().execute(sql, parameter)]
+
+    def muat_dataframe(self, mulai=None, selesai=None, perangkat=None, buang_placeholder=True):
+        """
+        Memuat pembacaan mentah sebagai DataFrame untuk pelatihan.
+
+        Args:
+            buang_placeholder (bool): Buang pembacaan dengan koordinat -1.0
+                                      (cahaya tidak terdeteksi).
+
+        Returns:
+            pd.DataFrame: Kolom waktu, perangkat, seq dan KOLOM_TELEMETRI.
+        """
+        import pandas as pd
+
+        where, parameter = _filter_rentang(mulai, selesai, perangkat, 'waktu')
+        if buang_placeholder:
+            where += (" AND " if where else " WHERE ") + "NOT (koordinat_x = ? AND koordinat_y = ?)"
+            parameter += [NILAI_PLACEHOLDER, NILAI_PLACEHOLDER]
+        return pd.read_sql_query(
+            f"SELECT waktu, perangkat, seq, {', '.join(KOLOM_TELEMETRI)} FROM pembacaan{where} ORDER BY waktu",
+            self._koneksi(), params=parameter)
+
+    def ekspor_csv(self, path_csv, **kwargs):
+        """Mengekspor pembacaan mentah ke CSV (argumen sama dengan muat_dataframe). Returns: jumlah baris."""
+        df = self.muat_dataframe(**kwargs)
+        df.to_csv(path_csv, index=False)
+        return len(df)
+
+def adalah_penyimpanan(path):
+    return path.lower().endswith(EKSTENSI_SQLITE)
+
+def muat_dataset(path, **kwargs):
+    """Memuat pembacaan mentah dari file penyimpanan (dipakai latih_model_regresi.py)."""
+    penyimpanan = PenyimpananTelemetri(path, mode_baca=True)
+    try:
+        return penyimpanan.muat_dataframe(**kwargs)
+    finally:
+        penyimpanan.tutup()
+
+# --- Program Utama ---
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Query dan ekspor penyimpanan telemetri tracker.")
+    sub = parser.add_subparsers(dest='perintah', required=True)
+
+    def _argumen_rentang(p):
+        p.add_argument('penyimpanan')
+        p.add_argument('--mulai', default=None, help="Epoch detik atau tanggal ISO (inklusif).")
+        p.add_argument('--selesai', default=None, help="Epoch detik atau tanggal ISO (eksklusif).")
+        p.add_argument('--perangkat', default=None)
+
+    p_info = sub.add_parser('info', help="Tampilkan ringkasan isi penyimpanan.")
+    p_info.add_argument('penyimpanan')
+
+    p_ringkasan = sub.add_parser('ringkasan', help="Tampilkan ringkasan per detik/menit.")
+    _argumen_rentang(p_ringkasan)
+    p_ringkasan.add_argument('--resolusi', default='1m', choices=list(RESOLUSI))
+
+    p_ekspor = sub.add_parser('ekspor', help="Ekspor pembacaan mentah ke CSV untuk pelatihan.")
+    _argumen_rentang(p_ekspor)
+    p_ekspor.add_argument('csv')
+    p_ekspor.add_argument('--dengan-placeholder', action='store_true',
+                          help="Sertakan pembacaan tanpa deteksi cahaya (koordinat -1.0).")
+
+    args = parser.parse_args()
+    if not os.path.exists(args.penyimpanan):
+        print(f"Error: File '{args.penyimpanan}' tidak ditemukan.")
+        sys.exit(1)
+    penyimpanan = PenyimpananTelemetri(args.penyimpanan, mode_baca=True)
+
+    if args.perintah == 'info':
+        conn = penyimpanan._koneksi()
+        jumlah, awal, akhir = conn.execute("SELECT COUNT(*), MIN(waktu), MAX(waktu) FROM pembacaan").fetchone()
+        print(f"Penyimpanan: {args.penyimpanan}")
+        print(f"  Jumlah pembacaan: {jumlah}")
+        if jumlah:
+            print(f"  Rentang waktu   : {time.ctime(awal)} - {time.ctime(akhir)}")
+        print(f"  Perangkat       : {', '.join(p or '(default)' for p in penyimpanan.daftar_perangkat())}")
+    elif args.perintah == 'ringkasan':
+        for baris in penyimpanan.ringkasan(args.resolusi, args.mulai, args.selesai, args.perangkat):
+            print(f"{time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(baris['waktu']))} "
+                  f"{baris['perangkat'] or '-':<12} n={baris['n']:<5} "
+                  f"V rata2={baris['tegangan_v_rata2']:.2f} min={baris['tegangan_v_min']:.2f} "
+                  f"max={baris['tegangan_v_max']:.2f}  "
+                  f"azimuth={baris['rotasi_azimuth_deg_rata2']:.1f}°  "
+                  f"elevasi={baris['rotasi_elevasi_deg_rata2']:.1f}°")
+    elif args.perintah == 'ekspor':
+        jumlah = penyimpanan.ekspor_csv(args.csv, mulai=args.mulai, selesai=args.selesai,
+                                        perangkat=args.perangkat, buang_placeholder=not args.dengan_placeholder)
+        print(f"{jumlah} pembacaan diekspor ke {args.csv}.")
+    penyimpanan.tutup()
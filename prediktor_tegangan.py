@@ -0,0 +1,281 @@
+import os
+import re
+import json
+import time
+import argparse
+from array import array
+import numpy as np
+
+# Artefak model tegangan dan prediktor ringan.
+#
+# Model hasil latih_model_regresi.py disimpan sebagai file .npz berversi berisi
+# array NumPy polos (tanpa pickle, tanpa sklearn):
+#   - regresi linear : koefisien + intercept, prediksi = dot product
+#   - random forest  : semua pohon diratakan ke array node (kiri, kanan, fitur,
+#                      ambang, nilai) dengan indeks akar per pohon
+# Modul ini hanya membutuhkan NumPy untuk memuat artefak, sehingga cepat dipakai
+# di host kecil yang menerima aliran data centroid secara langsung.
+
+VERSI_FORMAT = 1
+FOLDER_ARTEFAK_DEFAULT = 'artefak_model'
+
+def _ekspor_linear(model):
+    return {
+        'koefisien': np.asarray(model.coef_, dtype=np.float64).ravel(),
+        'intercept': np.array([float(np.ravel(model.intercept_)[0])]),
+    }
+
+def _ekspor_forest(model):
+    kiri, kanan, fitur, ambang, nilai, akar = [], [], [], [], [], []
+    offset = 0
+    for estimator in model.estimators_:
+        tree = estimator.tree_
+        daun = tree.children_left == -1
+        akar.append(offset)
+        # Indeks anak digeser agar menunjuk ke array gabungan; daun tetap -1
+        kiri.append(np.where(daun, -1, tree.children_left + offset))
+        kanan.append(np.where(daun, -1, tree.children_right + offset))
+        fitur.append(np.where(daun, 0, tree.feature))
+        ambang.append(tree.threshold)
+        nilai.append(tree.value[:, 0, 0])
+        offset += tree.node_count
+    return {
+        'kiri': np.concatenate(kiri).astype(np.int32),
+        'kanan': np.concatenate(kanan).astype(np.int32),
+        'fitur': np.concatenate(fitur).astype(np.int32),
+        'ambang': np.concatenate(ambang).astype(np.float64),
+        'nilai': np.concatenate(nilai).astype(np.float64),
+        'akar': np.array(akar, dtype=np.int32),
+    }
+
+def ekspor_model(model):
+    """
+    Mengubah model sklearn menjadi dict array NumPy.
+
+    Args:
+        model: Model regresi linear (punya coef_/intercept_) atau ensemble
+               pohon yang dirata-rata (RandomForestRegressor/ExtraTreesRegressor).
+
+    Returns:
+        tuple: (jenis model 'linear' atau 'forest', dict array)
+    """
+    if hasattr(model, 'coef_') and hasattr(model, 'intercept_'):
+        return 'linear', _ekspor_linear(model)
+    if hasattr(model, 'estimators_') and all(hasattr(est, 'tree_') for est in model.estimators_):
+        return 'forest', _ekspor_forest(model)
+    raise TypeError(f"Model {type(model).__name__} tidak didukung untuk ekspor artefak.")
+
+def _daftar_versi(folder_artefak, nama_model):
+    pola = re.compile(rf"^{re.escape(nama_model)}_v(\d+)\.npz$")
+    return sorted(int(m.group(1)) for m in map(pola.match, os.listdir(folder_artefak)) if m)
+
+def _versi_berikutnya(folder_artefak, nama_model):
+    return max(_daftar_versi(folder_artefak, nama_model), default=0) + 1
+
+def _path_versi(folder_artefak, nama_model, versi):
+    return os.path.join(folder_artefak, f"{nama_model}_v{versi:04d}.npz")
+
+def simpan_artefak(model, kolom_fitur, nama_model, folder_artefak=FOLDER_ARTEFAK_DEFAULT, info=None,
+                   maks_versi=None):
+    """
+    Menyimpan model sebagai artefak berversi (<nama_model>_vNNNN.npz).
+
+    File ditulis ke file sementara lalu diganti secara atomik, sehingga pembaca
+    tidak pernah melihat artefak yang setengah tertulis.
+
+    Args:
+        model: Model sklearn terlatih (lihat ekspor_model).
+        kolom_fitur (list): Urutan fitur input yang dipakai saat pelatihan.
+        nama_model (str): Nama dasar artefak, mis. 'model_tegangan_rf'.
+        folder_artefak (str): Folder tujuan (dibuat jika belum ada).
+        info (dict): Metadata tambahan, mis. metrik evaluasi.
+        maks_versi (int): Jika diisi, hanya sekian versi terbaru nama_model yang
+                          disimpan; versi lebih lama dihapus (None = semua).
+
+    Returns:
+        str: Path file artefak yang disimpan.
+    """
+    os.makedirs(folder_artefak, exist_ok=True)
+    jenis, arrays = ekspor_model(model)
+    versi = _versi_berikutnya(folder_artefak, nama_model)
+    metadata = {
+        'versi_format': VERSI_FORMAT,
+        'nama_model': nama_model,
+        'versi': versi,
+        'jenis': jenis,
+        'kelas_model': type(model).__name__,
+        'kolom_fitur': list(kolom_fitur),
+        'dibuat': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'info': info or {},
+    }
+    path_artefak = _path_versi(folder_artefak, nama_model, versi)
+    path_sementara = path_artefak + '.tmp'
+    with open(path_sementara, 'wb') as f:
+        np.savez(f, metadata=np.array(json.dumps(metadata)), **arrays)
+    os.replace(path_sementara, path_artefak)
+    if maks_versi is not None:
+        for versi_lama in _daftar_versi(folder_artefak, nama_model)[:-max(1, maks_versi)]:
+            os.remove(_path_versi(folder_artefak, nama_model, versi_lama))
+    return path_artefak
+
+def cari_artefak_terbaru(nama_model, folder_artefak=FOLDER_ARTEFAK_DEFAULT):
+    """
+    Mengembalikan path artefak dengan versi tertinggi, atau None jika belum ada.
+    """
+    if not os.path.isdir(folder_artefak):
+        return None
+    versi = _versi_berikutnya(folder_artefak, nama_model) - 1
+    if versi == 0:
+        return None
+    return _path_versi(folder_artefak, nama_model, versi)
+
+def tentukan_artefak(nama_atau_path, folder_artefak=FOLDER_ARTEFAK_DEFAULT):
+    """
+    Path artefak dari path file, atau dari nama model (mis. 'model_tegangan_rf')
+    yang diartikan sebagai versi terbaru di folder_artefak.
+
+    Returns:
+        str: Path artefak, atau None jika tidak ditemukan.
+    """
+    if os.path.isfile(nama_atau_path):
+        return nama_atau_path
+    return cari_artefak_terbaru(nama_atau_path, folder_artefak)
+
+class PrediktorTegangan:
+    """
+    Prediktor tegangan dari artefak .npz, tanpa pandas maupun sklearn.
+
+    Contoh:
+        prediktor = PrediktorTegangan.muat('artefak_model/model_tegangan_rf_v0001.npz')
+        tegangan = prediktor.prediksi(0.46, 0.10, 0.02)  # urutan = prediktor.kolom_fitur
+    """
+
+    def __init__(self, metadata, arrays):
+        if metadata['versi_format'] != VERSI_FORMAT:
+            raise ValueError(f"Versi format artefak {metadata['versi_format']} tidak didukung.")
+        self.metadata = metadata
+        self.jenis = metadata['jenis']
+        self.kolom_fitur = metadata['kolom_fitur']
+        self._arrays = arrays
+        if self.jenis == 'linear':
+            self._koefisien = arrays['koefisien'].tolist()
+            self._intercept = float(arrays['intercept'][0])
+        elif self.jenis == 'forest':
+            # List Python jauh lebih cepat daripada indeks array NumPy per elemen
+            self._kiri = arrays['kiri'].tolist()
+            self._kanan = arrays['kanan'].tolist()
+            self._fitur = arrays['fitur'].tolist()
+            self._ambang = arrays['ambang'].tolist()
+            self._nilai = arrays['nilai'].tolist()
+            self._akar = arrays['akar'].tolist()
+        else:
+            raise ValueError(f"Jenis model '{self.jenis}' tidak dikenal.")
+
+    @classmethod
+    def muat(cls, path_artefak):
+        """Memuat prediktor dari file artefak .npz."""
+        with np.load(path_artefak, allow_pickle=False) as data:
+            metadata = json.loads(str(data['metadata']))
+            arrays = {nama: data[nama] for nama in data.files if nama != 'metadata'}
+        return cls(metadata, arrays)
+
+    def prediksi(self, *nilai_fitur):
+        """
+        Memprediksi tegangan untuk satu sampel dari nilai float mentah.
+
+        Args:
+            *nilai_fitur (float): Nilai fitur sesuai urutan self.kolom_fitur.
+
+        Returns:
+            float: Prediksi tegangan (Volt).
+        """
+        if len(nilai_fitur) != len(self.kolom_fitur):
+            raise ValueError(f"Diharapkan {len(self.kolom_fitur)} fitur ({self.kolom_fitur}), "
+                             f"diberikan {len(nilai_fitur)}.")
+        if self.jenis == 'linear':
+            hasil = self._intercept
+            for koef, nilai in zip(self._koefisien, nilai_fitur):
+                hasil += koef * nilai
+            return hasil
+
+        # Pohon sklearn membandingkan input dalam float32
+        x = array('f', nilai_fitur)
+        kiri, kanan, fitur, ambang, nilai = self._kiri, self._kanan, self._fitur, self._ambang, self._nilai
+        total = 0.0
+        for node in self._akar:
+            while kiri[node] != -1:
+                node = kiri[node] if x[fitur[node]] <= ambang[node] else kanan[node]
+            total += nilai[node]
+        return total / len(self._akar)
+
+    def prediksi_batch(self, X):
+        """
+        Memprediksi tegangan untuk banyak sampel sekaligus (vektor NumPy).
+
+        Args:
+            X (array-like): Array berukuran (N, jumlah fitur).
+
+        Returns:
+            np.ndarray: Prediksi tegangan berukuran (N,).
+        """
+        X = np.asarray(X, dtype=np.float64)
+        if X.ndim == 1:
+            X = X[None, :]
+        if self.jenis == 'linear':
+            return X @ self._arrays['koefisien'] + self._arrays['intercept'][0]
+
+        X32 = X.astype(np.float32)
+        kiri = self._arrays['kiri']
+        kanan = self._arrays['kanan']
+        fitur = self._arrays['fitur']
+        ambang = self._arrays['ambang']
+        # Satu posisi node per (sampel, pohon); semua turun satu level per iterasi
+        node = np.broadcast_to(self._arrays['akar'], (len(X), len(self._akar))).copy()
+        baris = np.arange(len(X))[:, None]
+        aktif = kiri[node] != -1
+        while aktif.any():
+            ke_kiri = X32[baris, fitur[node]] <= ambang[node]
+            node_baru = np.where(ke_kiri, kiri[node], kanan[node])
+            node = np.where(aktif, node_baru, node)
+            aktif = kiri[node] != -1
+        return self._arrays['nilai'][node].mean(axis=1)
+
+    # Antarmuka mirip sklearn, agar prediktor bisa dipakai langsung oleh pencarian_optimum.py
+    predict = prediksi_batch
+
+# --- Program Utama ---
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Prediksi tegangan dari artefak model.")
+    parser.add_argument('artefak', help="File artefak .npz dari latih_model_regresi.py, atau nama model "
+                                        "(mis. model_tegangan_rf) untuk memakai versi terbarunya.")
+    parser.add_argument('fitur', nargs='*', type=float, help="Nilai fitur sesuai urutan kolom_fitur artefak.")
+    parser.add_argument('--benchmark', type=int, default=0, metavar='N',
+                        help="Ukur kecepatan prediksi satu-sampel sebanyak N kali.")
+    parser.add_argument('--folder-artefak', default=FOLDER_ARTEFAK_DEFAULT,
+                        help="Folder tempat mencari versi terbaru jika artefak diberikan sebagai nama model.")
+    args = parser.parse_args()
+
+    path_artefak = tentukan_artefak(args.artefak, args.folder_artefak)
+    if path_artefak is None:
+        print(f"Error: Artefak '{args.artefak}' tidak ditemukan (juga tidak ada di {args.folder_artefak}).")
+        raise SystemExit(1)
+
+    waktu_mulai = time.perf_counter()
+    prediktor = PrediktorTegangan.muat(path_artefak)
+    waktu_muat = time.perf_counter() - waktu_mulai
+    print(f"Artefak: {prediktor.metadata['nama_model']} v{prediktor.metadata['versi']} "
+          f"({prediktor.metadata['kelas_model']}, dimuat dalam {waktu_muat * 1000:.1f} ms)")
+    print(f"Kolom fitur: {prediktor.kolom_fitur}")
+
+    if args.fitur:
+        print(f"Prediksi Tegangan: {prediktor.prediksi(*args.fitur):.4f} Volt")
+
+    if args.benchmark > 0:
+        rng = np.random.default_rng(0)
+        sampel = rng.random((args.benchmark, len(prediktor.kolom_fitur))).tolist()
+        waktu_mulai = time.perf_counter()
+        for baris in sampel:
+            prediktor.prediksi(*baris)
+        durasi = time.perf_counter() - waktu_mulai
+        print(f"{args.benchmark} prediksi satu-sampel: {durasi / args.benchmark * 1e6:.1f} us/sampel "
+              f"({args.benchmark / durasi:.0f} sampel/detik)")
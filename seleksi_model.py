@@ -0,0 +1,225 @@
+import os
+import json
+import time
+import hashlib
+import argparse
+import itertools
+import numpy as np
+import pandas as pd
+
+# Seleksi model dengan k-fold cross-validation dan pencarian hyperparameter.
+#
+# Setiap kombinasi (model, parameter, fold) adalah satu tugas independen yang
+# dijalankan paralel di semua core (joblib). Hasil setiap tugas disimpan di
+# folder cache dengan kunci hash(dataset + model + parameter + skema fold + versi
+# sklearn), sehingga run ulang atau pencarian yang diperluas hanya menghitung yang baru.
+# latih_model_regresi.py --seleksi-model memakai leaderboard ini untuk memilih
+# model dan hyperparameter yang dilatih di tahap fit.
+
+FOLDER_CACHE_DEFAULT = '.cache_seleksi_model'
+
+# Nama kandidat -> (modul, kelas, grid parameter, parameter tetap)
+KANDIDAT_MODEL = {
+    'linear': ('sklearn.linear_model', 'LinearRegression', {}, {}),
+    'ridge': ('sklearn.linear_model', 'Ridge', {'alpha': [0.01, 0.1, 1.0, 10.0]}, {}),
+    'random_forest': ('sklearn.ensemble', 'RandomForestRegressor',
+                      {'n_estimators': [100, 300], 'max_depth': [None, 5, 10], 'min_samples_leaf': [1, 3]},
+                      {'random_state': 42, 'n_jobs': 1}),
+    'extra_trees': ('sklearn.ensemble', 'ExtraTreesRegressor',
+                    {'n_estimators': [100, 300], 'max_depth': [None, 5, 10], 'min_samples_leaf': [1, 3]},
+                    {'random_state': 42, 'n_jobs': 1}),
+    'gradient_boosting': ('sklearn.ensemble', 'GradientBoostingRegressor',
+                          {'n_estimators': [100, 300], 'learning_rate': [0.05, 0.1], 'max_depth': [2, 3]},
+                          {'random_state': 42}),
+}
+
+def hash_dataset(X, y):
+    """
+    Menghitung hash isi dataset (nama kolom, nilai fitur, dan target).
+
+    Args:
+        X (pd.DataFrame): Fitur.
+        y (pd.Series): Target.
+
+    Returns:
+        str: Hash SHA-256 (hex).
+    """
+    h = hashlib.sha256()
+    h.update(json.dumps(list(X.columns)).encode('utf-8'))
+    h.update(np.ascontiguousarray(X.to_numpy(dtype=np.float64)).tobytes())
+    h.update(np.ascontiguousarray(y.to_numpy(dtype=np.float64)).tobytes())
+    return h.hexdigest()
+
+def daftar_konfigurasi(nama_model_dipilih=None):
+    """
+    Menjabarkan grid parameter setiap kandidat menjadi daftar konfigurasi.
+
+    Args:
+        nama_model_dipilih (list): Nama kandidat (None = semua di KANDIDAT_MODEL).
+
+    Returns:
+        list: List of (nama_model, dict parameter).
+    """
+    konfigurasi = []
+    for nama_model in nama_model_dipilih or KANDIDAT_MODEL:
+        _, _, grid, _ = KANDIDAT_MODEL[nama_model]
+        nama_param = sorted(grid)
+        for nilai in itertools.product(*(grid[nama] for nama in nama_param)):
+            konfigurasi.append((nama_model, dict(zip(nama_param, nilai))))
+    return konfigurasi
+
+def _buat_model(nama_model, parameter):
+    import importlib
+    nama_modul, nama_kelas, _, parameter_tetap = KANDIDAT_MODEL[nama_model]
+    kelas = getattr(importlib.import_module(nama_modul), nama_kelas)
+    return kelas(**{**parameter_tetap, **parameter})
+
+def _kunci_cache(kunci_dataset, nama_model, parameter, k, seed, fold, versi_sklearn):
+    isi = json.dumps([kunci_dataset, nama_model, KANDIDAT_MODEL[nama_model][3], parameter, k, seed, fold,
+                      versi_sklearn], sort_keys=True, default=str)
+    return hashlib.sha256(isi.encode('utf-8')).hexdigest()
+
+def _jalankan_fold(X, y, indeks_latih, indeks_uji, nama_model, parameter):
+    # Dijalankan di proses worker joblib
+    from sklearn.metrics import mean_squared_error, mean_absolute_error, r2_score
+    model = _buat_model(nama_model, parameter)
+    waktu_mulai = time.perf_counter()
+    model.fit(X.iloc[indeks_latih], y.iloc[indeks_latih])
+    waktu_fit = time.perf_counter() - waktu_mulai
+    waktu_mulai = time.perf_counter()
+    y_pred = model.predict(X.iloc[indeks_uji])
+    waktu_prediksi = time.perf_counter() - waktu_mulai
+    y_uji = y.iloc[indeks_uji]
+    return {
+        'rmse': float(np.sqrt(mean_squared_error(y_uji, y_pred))),
+        'mae': float(mean_absolute_error(y_uji, y_pred)),
+        'r2': float(r2_score(y_uji, y_pred)) if len(y_uji) > 1 else float('nan'),
+        'waktu_fit': waktu_fit,
+        'waktu_prediksi': waktu_prediksi,
+        'indeks_uji': [int(i) for i in indeks_uji],
+        'prediksi': [float(v) for v in y_pred],
+    }
+
+def jalankan_seleksi(X, y, nama_model_dipilih=None, k=5, seed=42, n_jobs=-1, folder_cache=FOLDER_CACHE_DEFAULT):
+    """
+    Menjalankan k-fold CV untuk semua konfigurasi kandidat secara paralel.
+
+    Args:
+        X (pd.DataFrame): Fitur.
+        y (pd.Series): Target (Tegangan).
+        nama_model_dipilih (list): Kandidat yang diuji (None = semua).
+        k (int): Jumlah fold (dibatasi jumlah sampel).
+        seed (int): Seed pengacakan fold.
+        n_jobs (int): Jumlah proses paralel (-1 = semua core).
+        folder_cache (str): Folder cache hasil per fold (None = tanpa cache).
+
+    Returns:
+        tuple: (pd.DataFrame leaderboard terurut RMSE rata-rata,
+                pd.DataFrame hasil per fold)
+    """
+    import sklearn
+    from joblib import Parallel, delayed
+    from sklearn.model_selection import KFold
+
+    X = X.reset_index(drop=True)
+    y = y.reset_index(drop=True)
+    k = max(2, min(k, len(X)))
+    daftar_fold = list(KFold(n_splits=k, shuffle=True, random_state=seed).split(X))
+    kunci_dataset = hash_dataset(X, y)
+    if folder_cache:
+        os.makedirs(folder_cache, exist_ok=True)
+
+    tugas = []
+    hasil = {}
+    for nama_model, parameter in daftar_konfigurasi(nama_model_dipilih):
+        for fold, (indeks_latih, indeks_uji) in enumerate(daftar_fold):
+            kunci = _kunci_cache(kunci_dataset, nama_model, parameter, k, seed, fold, sklearn.__version__)
+            path_cache = os.path.join(folder_cache, f"{kunci}.json") if folder_cache else None
+            identitas = (nama_model, json.dumps(parameter, sort_keys=True), fold)
+            if path_cache and os.path.exists(path_cache):
+                with open(path_cache) as f:
+                    hasil[identitas] = {**json.load(f), 'dari_cache': True}
+            else:
+                tugas.append((identitas, path_cache, indeks_latih, indeks_uji, nama_model, parameter))
+
+    print(f"Seleksi model: {len(hasil) + len(tugas)} tugas ({len(hasil)} dari cache, "
+          f"{len(tugas)} dihitung), {k}-fold, n_jobs={n_jobs}")
+    waktu_mulai = time.perf_counter()
+    keluaran = Parallel(n_jobs=n_jobs)(
+        delayed(_jalankan_fold)(X, y, indeks_latih, indeks_uji, nama_model, parameter)
+        for _, _, indeks_latih, indeks_uji, nama_model, parameter in tugas)
+    durasi = time.perf_counter() - waktu_mulai
+    for (identitas, path_cache, *_), hasil_fold in zip(tugas, keluaran):
+        if path_cache:
+            with open(path_cache, 'w') as f:
+                json.dump(hasil_fold, f)
+        hasil[identitas] = {**hasil_fold, 'dari_cache': False}
+    print(f"Selesai dalam {durasi:.2f} detik.")
+
+    df_fold = pd.DataFrame([
+        {'model': nama_model, 'parameter': parameter, 'fold': fold,
+         **{kolom: nilai[kolom] for kolom in ('rmse', 'mae', 'r2', 'waktu_fit', 'waktu_prediksi', 'dari_cache')}}
+        for (nama_model, parameter, fold), nilai in hasil.items()
+    ])
+    leaderboard = (df_fold.groupby(['model', 'parameter'])
+                   .agg(rmse_mean=('rmse', 'mean'), rmse_std=('rmse', 'std'), mae_mean=('mae', 'mean'),
+                        r2_mean=('r2', 'mean'), waktu_fit_total=('waktu_fit', 'sum'),
+                        waktu_prediksi_total=('waktu_prediksi', 'sum'), fold_dari_cache=('dari_cache', 'sum'))
+                   .sort_values('rmse_mean')
+                   .reset_index())
+    leaderboard.index = leaderboard.index + 1
+    return leaderboard, df_fold
+
+def buat_model_terbaik(leaderboard, kandidat=None):
+    """
+    Membuat (belum dilatih) model dari baris teratas leaderboard.
+
+    Args:
+        leaderboard (pd.DataFrame): Hasil jalankan_seleksi().
+        kandidat (list): Hanya pertimbangkan model dengan nama ini (None = semua).
+
+    Returns:
+        tuple: (nama_model, dict parameter, objek model sklearn, RMSE CV rata-rata)
+    """
+    if kandidat is not None:
+        leaderboard = leaderboard[leaderboard['model'].isin(kandidat)]
+    baris = leaderboard.iloc[0]
+    parameter = json.loads(baris['parameter'])
+    return baris['model'], parameter, _buat_model(baris['model'], parameter), float(baris['rmse_mean'])
+
+# --- Program Utama ---
+if __name__ == "__main__":
+    import dataset_fitur
+
+    parser = argparse.ArgumentParser(description="Seleksi model regresi tegangan dengan k-fold CV paralel.")
+    parser.add_argument('--dataset', default='fitur_area_terang.fitur', help="File dataset (.fitur) atau CSV.")
+    parser.add_argument('--fitur', default='pusat_x_norm,pusat_y_norm,area_norm',
+                        help="Daftar kolom fitur dipisah koma.")
+    parser.add_argument('--target', default='Tegangan', help="Nama kolom target.")
+    parser.add_argument('--model', nargs='+', choices=list(KANDIDAT_MODEL), default=None,
+                        help="Kandidat yang diuji (default semua).")
+    parser.add_argument('--k', type=int, default=5, help="Jumlah fold.")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--jobs', type=int, default=-1, help="Jumlah proses paralel (-1 = semua core).")
+    parser.add_argument('--cache', default=FOLDER_CACHE_DEFAULT, help="Folder cache hasil fold.")
+    parser.add_argument('--tanpa-cache', action='store_true')
+    parser.add_argument('--output', default='leaderboard_model.csv', help="File CSV leaderboard.")
+    args = parser.parse_args()
+
+    if args.dataset.endswith('.csv'):
+        df = pd.read_csv(args.dataset)
+    else:
+        df = dataset_fitur.muat_dataset(args.dataset)
+    kolom_fitur = args.fitur.split(',')
+    df = df.dropna(subset=kolom_fitur + [args.target])
+    if len(df) < 4:
+        print(f"Error: Tidak cukup data berlabel ({len(df)} baris) untuk cross-validation.")
+        exit()
+
+    leaderboard, _ = jalankan_seleksi(df[kolom_fitur], df[args.target], args.model, args.k, args.seed, args.jobs,
+                                      None if args.tanpa_cache else args.cache)
+    with pd.option_context('display.max_colwidth', 80, 'display.width', 200):
+        print("\n## Leaderboard Model (urut RMSE CV) ##")
+        print(leaderboard.head(20).to_string(float_format=lambda v: f"{v:.4f}"))
+    leaderboard.to_csv(args.output)
+    print(f"\nLeaderboard disimpan ke: {args.output}")
@@ -0,0 +1,413 @@
+import os
+import sys
+import time
+import argparse
+import numpy as np
+from analitik_telemetri import TARGET_OPTIMAL_X, TARGET_OPTIMAL_Y
+
+# Simulator closed-loop tracker untuk tuning gain tanpa hardware.
+#
+# Memutar ulang hukum kontrol firmware terhadap lintasan matahari yang dimodelkan:
+#   - findLightCentroid (kode_deteksi_cahaya.ino): blob matahari di frame QQVGA,
+#     piksel > 220, terdeteksi jika jumlah piksel terang di antara 0.05% dan 25% frame
+#   - parseAndControl (servo.ino): target = sudut - KP * (centroid - target optimal),
+#     dibatasi 45..135; placeholder -1.0 mengembalikan kedua servo ke 80 derajat
+#   - moveServosSmoothly: langkah SERVO_STEP_SIZE tiap 15 ms, lalu Servo.write(target),
+#     jadi servo selalu berakhir tepat di target; ukuran langkah hanya menentukan
+#     waktu gerak (bukan sumbu sweep). Servo.write(float) memotong ke derajat bulat
+#   - satu siklus per 5 detik (delay(5000) di kedua firmware)
+#
+# Semua set parameter dijalankan sekaligus sebagai vektor NumPy (satu elemen per
+# episode), cuaca dan lintasan matahari sama untuk semua episode agar adil.
+# Tegangan dihitung dari artefak model (prediktor_tegangan.py) yang ditabulasi
+# sekali di grid centroid, atau model fisika cos(sudut datang) jika tidak ada artefak.
+#
+# Contoh:
+#   python simulasi_tracker.py                                   # sweep KP 5..150 (25 x 25)
+#   python simulasi_tracker.py --kp-x 10:60:11 --kp-y 10:60:11 --awan 0.3 --jam-mulai 10 --jam-selesai 14
+#   python simulasi_tracker.py --artefak artefak_model/model_tegangan_rf_v0003.npz --csv sweep.csv
+
+# --- KONSTANTA FIRMWARE ---
+# Sama dengan servo.ino
+KP_FIRMWARE = 25.0
+SERVO_STEP_SIZE_FIRMWARE = 1.0
+SUDUT_MIN, SUDUT_MAX = 45.0, 135.0
+SUDUT_RESET = 80.0               # Posisi awal dan posisi saat cahaya tidak terdeteksi
+JEDA_GERAK_SERVO = 0.015         # SERVO_MOVE_DELAY (detik per langkah)
+PERIODE_SIKLUS = 5.0             # delay(5000)
+# Sama dengan findLightCentroid di kode_deteksi_cahaya.ino (lihat ekstraksi_batch_vektor.py)
+THRESHOLD_TERANG_FIRMWARE = 220
+RASIO_PIKSEL_MIN_FIRMWARE = 0.0005
+RASIO_PIKSEL_MAX_FIRMWARE = 0.25
+LEBAR_FRAME, TINGGI_FRAME = 160, 120 # FRAMESIZE_QQVGA
+
+# --- MODEL DUNIA (ASUMSI, SESUAIKAN DENGAN PEMASANGAN) ---
+LINTANG_DEFAULT = -7.25          # Derajat (Surabaya)
+HARI_DEFAULT = 172               # Hari ke-n dalam tahun
+# Arah sumbu kamera saat kedua servo di SUDUT_RESET. Default (None): sedekat mungkin
+# dengan menghadap matahari jam 12 (agar matahari terlihat dari posisi reset), tetapi
+# digeser agar lintasan matahari selama simulasi berada di dalam rentang mekanis
+# 45..135 jika muat, atau di tengahnya jika tidak. Rentang pan 90 derajat tidak cukup
+# untuk lintasan azimuth satu hari penuh; waktu di luar jangkauan dilaporkan dan
+# episode yang sering jenuh ditandai.
+AZIMUTH_HADAP_DEFAULT = None     # Derajat dari utara
+ELEVASI_HADAP_DEFAULT = None     # Derajat di atas horizon
+FOV_H, FOV_V = 66.0, 50.0        # Field of view kamera (derajat)
+SIGMA_BLOB_PIKSEL = 4.0          # Lebar blob matahari + glare di gambar
+PUNCAK_CERAH = 1.5 * 255         # Intensitas puncak blob (belum terpotong) saat langit cerah
+TEGANGAN_MAKS_FALLBACK = 6.0     # Volt; panel tegak lurus matahari, langit cerah
+FRAKSI_DIFUS = 0.15              # Tegangan dari cahaya difus relatif terhadap maksimum
+HAMBATAN_BEBAN = 10.0            # Ohm; energi = sum(V^2 / R * dt)
+TOLERANSI_SETTLING = 0.02        # Jarak centroid ke target yang dianggap "terkunci"
+SIKLUS_STABIL = 6                # Siklus beruntun di dalam toleransi (30 detik)
+BATAS_JENUH_LAPOR = 0.05         # Fraksi siklus jenuh di atas ini ditandai '!' di tabel
+
+# --- LINTASAN MATAHARI DAN CUACA ---
+def lintasan_matahari(jam, lintang=LINTANG_DEFAULT, hari=HARI_DEFAULT):
+    """
+    Posisi matahari sederhana (deklinasi Cooper, sudut jam dari waktu matahari lokal).
+
+    Args:
+        jam (np.ndarray): Waktu matahari lokal (jam desimal).
+
+    Returns:
+        tuple: (azimuth derajat dari utara searah jarum jam, elevasi derajat)
+    """
+    deklinasi = np.radians(23.45 * np.sin(np.radians(360.0 / 365.0 * (284 + hari))))
+    sudut_jam = np.radians(15.0 * (jam - 12.0))
+    phi = np.radians(lintang)
+    sin_elevasi = np.sin(phi) * np.sin(deklinasi) + np.cos(phi) * np.cos(deklinasi) * np.cos(sudut_jam)
+    elevasi = np.arcsin(np.clip(sin_elevasi, -1.0, 1.0))
+    azimuth = np.arctan2(-np.sin(sudut_jam) * np.cos(deklinasi),
+                         np.cos(phi) * np.sin(deklinasi) - np.sin(phi) * np.cos(deklinasi) * np.cos(sudut_jam))
+    return np.degrees(azimuth) % 360.0, np.degrees(elevasi)
+
+def bangkitkan_cuaca(jumlah_langkah, tutupan_awan, seed=0):
+    """Kecerahan langit 0..1 per langkah (proses AR(1) dengan awan yang lewat)."""
+    rng = np.random.default_rng(seed)
+    if tutupan_awan <= 0:
+        return np.ones(jumlah_langkah)
+    derau = rng.normal(0.0, 1.0, jumlah_langkah)
+    awan = np.empty(jumlah_langkah)
+    nilai = 0.0
+    for i in range(jumlah_langkah): # Sekali per simulasi, dibagi semua episode
+        nilai = 0.98 * nilai + 0.2 * derau[i]
+        awan[i] = nilai
+    ambang = np.quantile(awan, 1.0 - tutupan_awan)
+    return np.where(awan > ambang, 0.35, 1.0)
+
+def area_blob(elevasi, kecerahan):
+    """
+    Rasio piksel > THRESHOLD_TERANG_FIRMWARE untuk blob Gaussian matahari,
+    sama untuk semua episode pada satu langkah (tidak bergantung pose).
+    """
+    redaman = np.clip(np.sin(np.radians(elevasi)) / np.sin(np.radians(15.0)), 0.0, 1.0)
+    puncak = PUNCAK_CERAH * kecerahan * redaman
+    with np.errstate(divide='ignore'):
+        piksel = np.where(puncak > THRESHOLD_TERANG_FIRMWARE,
+                          np.pi * 2.0 * SIGMA_BLOB_PIKSEL ** 2
+                          * np.log(np.maximum(puncak, 1e-9) / THRESHOLD_TERANG_FIRMWARE), 0.0)
+    return piksel / (LEBAR_FRAME * TINGGI_FRAME)
+
+# --- MODEL TEGANGAN ---
+class ModelTeganganFisika:
+    """Tegangan = maks x kecerahan x cos(sudut datang) + difus; panel tegak lurus saat centroid di target."""
+    nama = 'fisika cos(sudut datang)'
+
+    def tegangan(self, cx, cy, area, kecerahan, cos_datang):
+        return TEGANGAN_MAKS_FALLBACK * (kecerahan * np.maximum(cos_datang, 0.0) + FRAKSI_DIFUS * kecerahan)
+
+class ModelTeganganArtefak:
+    """
+    Artefak prediktor_tegangan.py yang ditabulasi sekali di grid (area, cy, cx),
+    lalu dibaca dengan indeks terdekat: biaya per langkah O(N) tanpa menelusuri pohon.
+    Saat cahaya tidak terdeteksi (tidak ada fitur), dipakai ModelTeganganFisika.
+    """
+    FITUR_DIKENAL = {'pusat_x_norm': 'cx', 'koordinat_x': 'cx', 'pusat_y_norm': 'cy', 'koordinat_y': 'cy',
+                     'area_norm': 'area'}
+    UKURAN_CHUNK = 20_000 # Prediktor pohon mengalokasikan array chunk x jumlah pohon per level
+
+    def __init__(self, path_artefak, area_min, area_max, resolusi=101, jumlah_area=16):
+        from prediktor_tegangan import PrediktorTegangan
+        self.prediktor = PrediktorTegangan.muat(path_artefak)
+        self.nama = f"artefak {os.path.basename(path_artefak)}"
+        tidak_dikenal = [k for k in self.prediktor.kolom_fitur if k not in self.FITUR_DIKENAL]
+        if tidak_dikenal:
+            raise ValueError(f"Fitur {tidak_dikenal} tidak bisa disimulasikan "
+                             f"(didukung: {', '.join(self.FITUR_DIKENAL)}).")
+        self.resolusi = resolusi
+        if 'area' not in {self.FITUR_DIKENAL[k] for k in self.prediktor.kolom_fitur}:
+            jumlah_area = 1 # Model tanpa fitur area: cukup satu lapis tabel
+        self.grid_area = np.linspace(area_min, max(area_max, area_min + 1e-9), jumlah_area)
+        grid = np.linspace(0.0, 1.0, resolusi)
+        a, cy, cx = np.meshgrid(self.grid_area, grid, grid, indexing='ij')
+        nilai = {'cx': cx.ravel(), 'cy': cy.ravel(), 'area': a.ravel()}
+        X = np.column_stack([nilai[self.FITUR_DIKENAL[k]] for k in self.prediktor.kolom_fitur])
+        self.tabel = np.concatenate([self.prediktor.prediksi_batch(X[i:i + self.UKURAN_CHUNK])
+                                     for i in range(0, len(X), self.UKURAN_CHUNK)]).reshape(a.shape)
+        self._fisika = ModelTeganganFisika()
+
+    def tegangan(self, cx, cy, area, kecerahan, cos_datang):
+        i_area = np.abs(self.grid_area - area).argmin()
+        i_x = np.clip(np.rint(cx * (self.resolusi - 1)), 0, self.resolusi - 1).astype(np.intp)
+        i_y = np.clip(np.rint(cy * (self.resolusi - 1)), 0, self.resolusi - 1).astype(np.intp)
+        return self.tabel[i_area, i_y, i_x]
+
+    def tegangan_tanpa_deteksi(self, kecerahan, cos_datang):
+        return self._fisika.tegangan(None, None, None, kecerahan, cos_datang)
+
+# --- SIMULASI ---
+def _pilih_hadap(perlu, hadap_siang):
+    # perlu: arah sumbu kamera yang dibutuhkan per siklus (dengan servo di SUDUT_RESET).
+    # Geser sesedikit mungkin dari hadap_siang agar semua kebutuhan muat di rentang mekanis.
+    bawah = perlu.max() + SUDUT_RESET - SUDUT_MAX
+    atas = perlu.min() + SUDUT_RESET - SUDUT_MIN
+    if bawah <= atas:
+        return float(np.clip(hadap_siang, bawah, atas))
+    return float((perlu.min() + perlu.max()) / 2 + SUDUT_RESET - (SUDUT_MIN + SUDUT_MAX) / 2)
+
+def simulasikan(kp_x, kp_y, ukuran_langkah, jam_mulai=7.0, jam_selesai=17.0, lintang=LINTANG_DEFAULT,
+                hari=HARI_DEFAULT, azimuth_hadap=AZIMUTH_HADAP_DEFAULT, elevasi_hadap=ELEVASI_HADAP_DEFAULT,
+                tutupan_awan=0.0, seed=0, path_artefak=None):
+    """
+    Menjalankan N episode closed-loop sekaligus (satu per set parameter).
+
+    Args:
+        kp_x, kp_y, ukuran_langkah (np.ndarray): Parameter per episode, berukuran (N,).
+                                                 Ukuran langkah hanya memengaruhi waktu gerak.
+        path_artefak (str): Artefak model tegangan, atau None untuk model fisika.
+
+    Returns:
+        tuple: (dict metrik nama -> array (N,),
+                dict info: nama_model, azimuth_hadap, elevasi_hadap,
+                fraksi_di_luar_jangkauan, jam_dalam_jangkauan (awal, akhir) atau None)
+    """
+    kp_x, kp_y, ukuran_langkah = np.broadcast_arrays(*(np.asarray(v, dtype=np.float64)
+                                                       for v in (kp_x, kp_y, ukuran_langkah)))
+    n = kp_x.shape[0]
+    jam = np.arange(jam_mulai, jam_selesai, PERIODE_SIKLUS / 3600.0)
+    az_matahari, el_matahari = lintasan_matahari(jam, lintang, hari)
+    kecerahan = bangkitkan_cuaca(len(jam), tutupan_awan, seed)
+    area = area_blob(el_matahari, kecerahan)
+    terang = (area > RASIO_PIKSEL_MIN_FIRMWARE) & (area < RASIO_PIKSEL_MAX_FIRMWARE) & (el_matahari > 0)
+    cos_el_matahari = np.cos(np.radians(el_matahari))
+
+    # Sudut sumbu kamera relatif panel saat centroid tepat di target optimal
+    u_optimal = (0.5 - TARGET_OPTIMAL_X) * FOV_H
+    v_optimal = (0.5 - TARGET_OPTIMAL_Y) * FOV_V
+    # Sudut servo yang dibutuhkan agar centroid tepat di target, relatif terhadap
+    # azimuth matahari tengah hari (kontinu, tanpa lompatan 360)
+    az_siang, el_siang = lintasan_matahari(np.array([12.0]), lintang, hari)
+    az_siang, el_siang = float(az_siang[0]), float(el_siang[0])
+    with np.errstate(divide='ignore'):
+        az_perlu = (az_matahari - u_optimal / cos_el_matahari - az_siang + 180.0) % 360.0 - 180.0
+    el_perlu = el_matahari - v_optimal
+    acuan = terang if terang.any() else np.ones(len(jam), dtype=bool)
+    if azimuth_hadap is None:
+        azimuth_hadap = az_siang + _pilih_hadap(az_perlu[acuan], -u_optimal / np.cos(np.radians(el_siang)))
+    if elevasi_hadap is None:
+        elevasi_hadap = _pilih_hadap(el_perlu[acuan], el_siang - v_optimal)
+    servo_az_perlu = SUDUT_RESET + (az_siang + az_perlu - azimuth_hadap + 180.0) % 360.0 - 180.0
+    servo_el_perlu = SUDUT_RESET + el_perlu - elevasi_hadap
+    dalam_jangkauan = ((servo_az_perlu >= SUDUT_MIN) & (servo_az_perlu <= SUDUT_MAX)
+                       & (servo_el_perlu >= SUDUT_MIN) & (servo_el_perlu <= SUDUT_MAX))
+    info = {
+        'azimuth_hadap': float(azimuth_hadap) % 360.0,
+        'elevasi_hadap': float(elevasi_hadap),
+        # Dihitung atas siklus saat matahari bisa terdeteksi
+        'fraksi_di_luar_jangkauan': float(np.mean(~dalam_jangkauan[acuan])),
+        'jam_dalam_jangkauan': ((float(jam[terang & dalam_jangkauan][0]), float(jam[terang & dalam_jangkauan][-1]))
+                                if (terang & dalam_jangkauan).any() else None),
+    }
+
+    model_fisika = ModelTeganganFisika()
+    model = model_fisika
+    if path_artefak:
+        area_terdeteksi = area[terang] if terang.any() else np.array([0.0])
+        model = ModelTeganganArtefak(path_artefak, area_terdeteksi.min(), area_terdeteksi.max())
+
+    sudut_az = np.full(n, SUDUT_RESET)   # currentAngleAzimuth (float)
+    sudut_el = np.full(n, SUDUT_RESET)
+    energi = np.zeros(n)
+    energi_ideal = 0.0
+    jumlah_balik = np.zeros(n)
+    arah_az, arah_el = np.zeros(n), np.zeros(n)
+    waktu_gerak = np.zeros(n)
+    jumlah_jenuh = np.zeros(n)
+    jumlah_terdeteksi = np.zeros(n)
+    jumlah_error2 = np.zeros(n)
+    beruntun_stabil = np.zeros(n)
+    waktu_settling = np.full(n, np.nan)
+    dt = PERIODE_SIKLUS
+
+    for t in range(len(jam)):
+        # Pose fisik: Servo.write(float) memotong ke derajat bulat
+        pan = azimuth_hadap + (np.trunc(sudut_az) - SUDUT_RESET)
+        kemiringan = elevasi_hadap + (np.trunc(sudut_el) - SUDUT_RESET)
+        u = ((az_matahari[t] - pan + 180.0) % 360.0 - 180.0) * cos_el_matahari[t]
+        v = el_matahari[t] - kemiringan
+        # Tanda mengikuti arah koreksi di parseAndControl (centroid > target -> sudut turun)
+        cx = 0.5 - u / FOV_H
+        cy = 0.5 - v / FOV_V
+        terdeteksi = terang[t] & (cx >= 0.0) & (cx <= 1.0) & (cy >= 0.0) & (cy <= 1.0)
+        cos_datang = np.cos(np.radians(u - u_optimal)) * np.cos(np.radians(v - v_optimal))
+
+        # readAndPrintVoltage: tegangan pada pose saat ini
+        if model is model_fisika:
+            tegangan = model.tegangan(cx, cy, area[t], kecerahan[t], cos_datang)
+            energi_ideal += model.tegangan(None, None, None, kecerahan[t], 1.0) ** 2
+        else:
+            tegangan = np.where(terdeteksi, model.tegangan(cx, cy, area[t], kecerahan[t], cos_datang),
+                                model.tegangan_tanpa_deteksi(kecerahan[t], cos_datang))
+            energi_ideal += float(model.tegangan(TARGET_OPTIMAL_X, TARGET_OPTIMAL_Y, area[t], kecerahan[t], 1.0)
+                                  if terang[t] else model.tegangan_tanpa_deteksi(kecerahan[t], 1.0)) ** 2
+        energi += tegangan ** 2
+
+        # parseAndControl
+        error_x = cx - TARGET_OPTIMAL_X
+        error_y = cy - TARGET_OPTIMAL_Y
+        target_az_mentah = sudut_az - kp_x * error_x
+        target_el_mentah = sudut_el - kp_y * error_y
+        target_az = np.where(terdeteksi, np.clip(target_az_mentah, SUDUT_MIN, SUDUT_MAX), SUDUT_RESET)
+        target_el = np.where(terdeteksi, np.clip(target_el_mentah, SUDUT_MIN, SUDUT_MAX), SUDUT_RESET)
+        # Jenuh: koreksi terpotong batas mekanis
+        jumlah_jenuh += terdeteksi & ((target_az != target_az_mentah) | (target_el != target_el_mentah))
+
+        # moveServosSmoothly: jumlah langkah sampai |target - sudut| <= langkah / 2
+        for sudut, target in ((sudut_az, target_az), (sudut_el, target_el)):
+            selisih = np.abs(target - sudut)
+            waktu_gerak += np.ceil(np.maximum(selisih - ukuran_langkah / 2, 0.0) / ukuran_langkah) * JEDA_GERAK_SERVO
+
+        # Osilasi: langkah fisik yang berbalik arah
+        d_az = np.trunc(target_az) - np.trunc(sudut_az)
+        d_el = np.trunc(target_el) - np.trunc(sudut_el)
+        jumlah_balik += (d_az * arah_az < 0) | (d_el * arah_el < 0)
+        arah_az = np.where(d_az != 0, d_az, arah_az)
+        arah_el = np.where(d_el != 0, d_el, arah_el)
+        sudut_az, sudut_el = target_az, target_el
+
+        # Settling: pertama kali centroid berada di dalam toleransi selama SIKLUS_STABIL siklus
+        error2 = error_x * error_x + error_y * error_y
+        di_dalam = terdeteksi & (error2 < TOLERANSI_SETTLING ** 2)
+        beruntun_stabil = np.where(di_dalam, beruntun_stabil + 1, 0)
+        baru_stabil = (beruntun_stabil == SIKLUS_STABIL) & np.isnan(waktu_settling)
+        waktu_settling[baru_stabil] = (t + 1 - SIKLUS_STABIL) * dt
+        jumlah_terdeteksi += terdeteksi
+        jumlah_error2 += np.where(terdeteksi, error2, 0.0)
+
+    durasi_jam = len(jam) * dt / 3600.0
+    energi_wh = energi / HAMBATAN_BEBAN * dt / 3600.0
+    energi_ideal_wh = energi_ideal / HAMBATAN_BEBAN * dt / 3600.0
+    with np.errstate(invalid='ignore', divide='ignore'):
+        rms_error = np.sqrt(jumlah_error2 / jumlah_terdeteksi)
+    metrik = {
+        'kp_x': kp_x, 'kp_y': kp_y, 'ukuran_langkah': ukuran_langkah,
+        'energi_wh': energi_wh,
+        'energi_relatif': energi_wh / energi_ideal_wh if energi_ideal_wh > 0 else np.full(n, np.nan),
+        'waktu_settling_detik': waktu_settling,
+        'osilasi_per_jam': jumlah_balik / durasi_jam,
+        'rms_error_centroid': rms_error,
+        'fraksi_terdeteksi': jumlah_terdeteksi / len(jam),
+        'fraksi_jenuh': jumlah_jenuh / len(jam),
+        'waktu_gerak_servo_detik': waktu_gerak,
+    }
+    info['nama_model'] = model.nama
+    return metrik, info
+
+# --- PROGRAM UTAMA ---
+def _baca_rentang(teks):
+    """'a:b:n' -> linspace(a, b, n); 'a,b,c' -> daftar nilai."""
+    if ':' in teks:
+        bawah, atas, jumlah = teks.split(':')
+        return np.linspace(float(bawah), float(atas), int(jumlah))
+    return np.array([float(v) for v in teks.split(',')])
+
+def _format(nilai, format_angka):
+    return "-" if nilai != nilai else format(nilai, format_angka)
+
+def tampilkan_tabel(metrik, indeks, judul):
+    print(f"\n{judul}")
+    print(f"{'KP_X':>7} {'KP_Y':>7} {'energi Wh':>10} {'relatif':>8} {'settling':>9} "
+          f"{'osilasi/j':>9} {'rms err':>8} {'deteksi':>8} {'jenuh':>7} {'gerak':>8}")
+    for i in indeks:
+        # '!' menandai episode yang lebih dari BATAS_JENUH_LAPOR siklusnya terpotong batas mekanis
+        tanda = '!' if metrik['fraksi_jenuh'][i] > BATAS_JENUH_LAPOR else ' '
+        print(f"{metrik['kp_x'][i]:7.1f} {metrik['kp_y'][i]:7.1f} "
+              f"{metrik['energi_wh'][i]:10.3f} {_format(metrik['energi_relatif'][i], '8.1%')} "
+              f"{_format(metrik['waktu_settling_detik'][i], '8.0f')}s "
+              f"{metrik['osilasi_per_jam'][i]:9.1f} {_format(metrik['rms_error_centroid'][i], '8.4f')} "
+              f"{metrik['fraksi_terdeteksi'][i]:8.1%} {metrik['fraksi_jenuh'][i]:6.1%}{tanda} "
+              f"{metrik['waktu_gerak_servo_detik'][i]:7.1f}s")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Simulator closed-loop tracker untuk sweep gain KP.")
+    parser.add_argument('--kp-x', default='5:150:25', help="Nilai KP_X: 'awal:akhir:jumlah' atau daftar koma.")
+    parser.add_argument('--kp-y', default='5:150:25', help="Nilai KP_Y, format sama dengan --kp-x.")
+    parser.add_argument('--step', type=float, default=SERVO_STEP_SIZE_FIRMWARE,
+                        help="SERVO_STEP_SIZE; hanya memengaruhi waktu gerak servo (bukan sumbu sweep).")
+    parser.add_argument('--jam-mulai', type=float, default=7.0, help="Waktu matahari lokal (jam).")
+    parser.add_argument('--jam-selesai', type=float, default=17.0)
+    parser.add_argument('--lintang', type=float, default=LINTANG_DEFAULT)
+    parser.add_argument('--hari', type=int, default=HARI_DEFAULT, help="Hari ke-n dalam tahun.")
+    parser.add_argument('--azimuth-hadap', type=float, default=AZIMUTH_HADAP_DEFAULT,
+                        help="Azimuth sumbu kamera (derajat dari utara) saat servo di 80 "
+                             "(default: lintasan matahari di tengah rentang mekanis).")
+    parser.add_argument('--elevasi-hadap', type=float, default=ELEVASI_HADAP_DEFAULT,
+                        help="Elevasi sumbu kamera saat servo di 80 "
+                             "(default: lintasan matahari di tengah rentang mekanis).")
+    parser.add_argument('--awan', type=float, default=0.0, help="Fraksi waktu tertutup awan (0..1).")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--artefak', default=None,
+                        help="Artefak model tegangan .npz atau nama model (versi terbaru di artefak_model/); "
+                             "default: model fisika cos sudut datang.")
+    parser.add_argument('--top-k', type=int, default=10)
+    parser.add_argument('--csv', default=None, help="Simpan metrik semua set parameter ke CSV.")
+    args = parser.parse_args()
+
+    # Produk kartesius gain; set bawaan firmware selalu diikutkan sebagai pembanding
+    kp_x, kp_y = np.meshgrid(_baca_rentang(args.kp_x), _baca_rentang(args.kp_y), indexing='ij')
+    kp_x = np.append(kp_x.ravel(), KP_FIRMWARE)
+    kp_y = np.append(kp_y.ravel(), KP_FIRMWARE)
+    langkah = np.append(np.full(len(kp_x) - 1, args.step), SERVO_STEP_SIZE_FIRMWARE)
+    if args.artefak:
+        from prediktor_tegangan import tentukan_artefak
+        path_artefak = tentukan_artefak(args.artefak)
+        if path_artefak is None:
+            print(f"Error: Artefak '{args.artefak}' tidak ditemukan.")
+            sys.exit(1)
+        args.artefak = path_artefak
+
+    waktu_mulai = time.perf_counter()
+    try:
+        metrik, info = simulasikan(kp_x, kp_y, langkah, args.jam_mulai, args.jam_selesai, args.lintang,
+                                         args.hari, args.azimuth_hadap, args.elevasi_hadap, args.awan, args.seed,
+                                         args.artefak)
+    except ValueError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+    durasi = time.perf_counter() - waktu_mulai
+    jumlah_siklus = int(np.ceil((args.jam_selesai - args.jam_mulai) * 3600.0 / PERIODE_SIKLUS))
+    print(f"{len(kp_x)} set parameter x {jumlah_siklus} siklus disimulasikan dalam {durasi:.2f} detik "
+          f"(model tegangan: {info['nama_model']}).")
+    print(f"Pemasangan: azimuth {info['azimuth_hadap']:.1f}, elevasi {info['elevasi_hadap']:.1f} derajat "
+          f"saat servo di {SUDUT_RESET:.0f}.")
+    if info['fraksi_di_luar_jangkauan'] > 0:
+        rentang = info['jam_dalam_jangkauan']
+        print(f"PERINGATAN: matahari di luar rentang mekanis {SUDUT_MIN:.0f}..{SUDUT_MAX:.0f} selama "
+              f"{info['fraksi_di_luar_jangkauan']:.0%} waktu terang; tracker jenuh di batas dan perbedaan "
+              f"antar gain sebagian besar tertutup.")
+        if rentang is not None:
+            print(f"  Dalam jangkauan sekitar jam {rentang[0]:.2f}..{rentang[1]:.2f}; pakai --jam-mulai/--jam-selesai "
+                  f"itu untuk membandingkan gain.")
+
+    # Energi sama (selisih < 1 mWh) diurutkan dengan rms error centroid; pembanding tidak ikut diurutkan
+    urutan = np.lexsort((metrik['rms_error_centroid'][:-1], -np.round(metrik['energi_wh'][:-1], 3)))
+    tampilkan_tabel(metrik, urutan[:args.top_k], f"{args.top_k} set parameter dengan energi tertinggi:")
+    tampilkan_tabel(metrik, [len(kp_x) - 1], "Bawaan firmware (KP_X = KP_Y = 25, SERVO_STEP_SIZE = 1):")
+    if np.any(metrik['fraksi_jenuh'][np.append(urutan[:args.top_k], len(kp_x) - 1)] > BATAS_JENUH_LAPOR):
+        print(f"\n'!' = lebih dari {BATAS_JENUH_LAPOR:.0%} siklus terpotong batas mekanis (episode jenuh).")
+
+    if args.csv:
+        import pandas as pd
+        pd.DataFrame(metrik).iloc[:-1].to_csv(args.csv, index=False)
+        print(f"\nMetrik disimpan di {args.csv}")
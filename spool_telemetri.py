@@ -0,0 +1,157 @@
+import random
+import sqlite3
+import threading
+
+# Spool tahan-mati untuk mqtt_bridge.py (store-and-forward).
+#
+# Setiap baris dari serial ditulis ke SQLite (mode WAL) SEBELUM dipublikasikan
+# dan mendapat nomor urut (seq) yang naik terus, juga setelah restart. Baris baru
+# dihapus setelah broker mengonfirmasi (PUBACK QoS 1). Selama broker tidak
+# terjangkau, baris menumpuk di disk; ukuran spool dibatasi dengan membuang baris
+# tertua. Subscriber memakai (id_spool, seq) untuk membuang duplikat, sehingga
+# setiap pembacaan diproses tepat satu kali.
+
+PATH_SPOOL_DEFAULT = 'spool_bridge.sqlite'
+MAKS_BARIS_DEFAULT = 1_000_000
+
+class SpoolTelemetri:
+    """
+    Antrian FIFO persisten berbasis SQLite, aman dipakai dari beberapa thread
+    (satu koneksi per thread).
+
+    Contoh:
+        spool = SpoolTelemetri('spool_bridge.sqlite')
+        seq = spool.tambah(time.time(), baris)
+        for seq, waktu, baris, perangkat in spool.ambil(setelah_seq=0, batas=100): ...
+        spool.hapus([seq, ...])  # setelah dikonfirmasi broker
+    """
+
+    def __init__(self, path=PATH_SPOOL_DEFAULT, maks_baris=MAKS_BARIS_DEFAULT):
+        self.path = path
+        self.maks_baris = maks_baris
+        self.jumlah_dibuang = 0
+        self._kunci_jumlah = threading.Lock()
+        self._lokal = threading.local()
+        # Di-set setiap ada baris baru, agar penerbit tidak perlu polling
+        self.ada_data = threading.Event()
+
+        conn = self._koneksi()
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS spool (
+                seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                waktu REAL NOT NULL,
+                baris TEXT NOT NULL,
+                perangkat TEXT NOT NULL DEFAULT ''
+            )
+        """)
+        # Migrasi spool lama (sebelum bridge multi-perangkat)
+        kolom = {baris[1] for baris in conn.execute("PRAGMA table_info(spool)")}
+        if 'perangkat' not in kolom:
+            conn.execute("ALTER TABLE spool ADD COLUMN perangkat TEXT NOT NULL DEFAULT ''")
+        conn.execute("CREATE TABLE IF NOT EXISTS meta (kunci TEXT PRIMARY KEY, nilai TEXT NOT NULL)")
+        # Identitas spool: berubah jika file spool dihapus sehingga seq mulai dari 1 lagi
+        conn.execute("INSERT OR IGNORE INTO meta (kunci, nilai) VALUES ('id_spool', ?)",
+                     (str(random.getrandbits(32)),))
+        conn.commit()
+        self.id_spool = int(conn.execute("SELECT nilai FROM meta WHERE kunci = 'id_spool'").fetchone()[0])
+        # Jumlah baris di spool, dipelihara di memori agar bisa dibaca tanpa query (metrik)
+        self.jumlah_tersimpan = self.jumlah()
+
+    def _koneksi(self):
+        conn = getattr(self._lokal, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL") # Aman terhadap crash proses; cukup untuk spool
+            self._lokal.conn = conn
+        return conn
+
+    def tambah(self, waktu, baris, perangkat=''):
+        """
+        Menambahkan satu baris ke spool.
+
+        Args:
+            waktu (float): Waktu baca (epoch detik).
+            baris (str): Baris mentah dari serial.
+            perangkat (str): Nama perangkat asal ('' = bridge satu perangkat).
+
+        Returns:
+            int: Nomor urut (seq) baris tersebut.
+        """
+        conn = self._koneksi()
+        with conn:
+            seq = conn.execute("INSERT INTO spool (waktu, baris, perangkat) VALUES (?, ?, ?)",
+                               (waktu, baris, perangkat)).lastrowid
+            # Batasi ukuran berdasarkan rentang seq (O(1) lewat primary key)
+            seq_tertua = conn.execute("SELECT MIN(seq) FROM spool").fetchone()[0]
+            if seq - seq_tertua + 1 > self.maks_baris:
+                dibuang = conn.execute("DELETE FROM spool WHERE seq <= ?", (seq - self.maks_baris,)).rowcount
+            else:
+                dibuang = 0
+        with self._kunci_jumlah:
+            self.jumlah_dibuang += dibuang
+            self.jumlah_tersimpan += 1 - dibuang
+        self.ada_data.set()
+        return seq
+
+    def ambil(self, setelah_seq=0, batas=100):
+        """
+        Mengambil baris tertua dengan seq > setelah_seq, urut naik.
+
+        Returns:
+            list: List of (seq, waktu, baris, perangkat).
+        """
+        return self._koneksi().execute(
+            "SELECT seq, waktu, baris, perangkat FROM spool WHERE seq > ? ORDER BY seq LIMIT ?",
+            (setelah_seq, batas)).fetchall()
+
+    def hapus(self, daftar_seq):
+        """Menghapus baris yang sudah dikonfirmasi broker."""
+        if not daftar_seq:
+            return
+        conn = self._koneksi()
+        with conn:
+            cursor = conn.executemany("DELETE FROM spool WHERE seq = ?", ((seq,) for seq in daftar_seq))
+        with self._kunci_jumlah:
+            self.jumlah_tersimpan -= cursor.rowcount
+
+    def jumlah(self, setelah_seq=0):
+        return self._koneksi().execute("SELECT COUNT(*) FROM spool WHERE seq > ?", (setelah_seq,)).fetchone()[0]
+
+    def seq_terakhir(self):
+        """seq terbesar yang ada di spool (0 jika kosong)."""
+        return self._koneksi().execute("SELECT COALESCE(MAX(seq), 0) FROM spool").fetchone()[0]
+
+    def tutup(self):
+        conn = getattr(self._lokal, 'conn', None)
+        if conn is not None:
+            conn.close()
+            self._lokal.conn = None
+
+class PenyaringDuplikat:
+    """
+    Membuang pembacaan yang sudah pernah diterima berdasarkan (sumber, id_spool, seq).
+
+    Bridge mempublikasikan ulang pesan yang belum dikonfirmasi setelah reconnect
+    (QoS 1 = at-least-once); penyaring ini menjadikannya tepat satu kali.
+    Pembacaan tanpa 'seq' (bridge lama) selalu diteruskan.
+    """
+
+    def __init__(self):
+        self._seq_terakhir = {}
+        self.jumlah_duplikat = 0
+
+    def saring(self, sumber, daftar_data):
+        hasil = []
+        for data in daftar_data:
+            seq = data.get('seq')
+            if seq is None:
+                hasil.append(data)
+                continue
+            kunci = (sumber, data.get('spool'))
+            if seq <= self._seq_terakhir.get(kunci, 0):
+                self.jumlah_duplikat += 1
+                continue
+            self._seq_terakhir[kunci] = seq
+            hasil.append(data)
+        return hasil
@@ -0,0 +1,41 @@
+import os
+import pytest
+import dataset_fitur
+
+# Uji kunci nama_file di dataset_fitur.py (jalankan: python -m pytest -q)
+
+def _fitur(nama_file, area=0.1, tegangan=None):
+    fitur = {'nama_file': nama_file, 'area_norm': area, 'pusat_x_norm': 0.5, 'pusat_y_norm': 0.5,
+             'bbox_x_norm': 0.4, 'bbox_y_norm': 0.4, 'bbox_w_norm': 0.2, 'bbox_h_norm': 0.2,
+             'area_terang_ditemukan': 1}
+    if tegangan is not None:
+        fitur['Tegangan'] = tegangan
+    return fitur
+
+def test_kunci_terlalu_panjang_ditolak(tmp_path):
+    path_dataset = str(tmp_path / 'data.fitur')
+    awalan = 'sesi/' + 'a' * 130
+    daftar = [_fitur(f"{awalan}/gambar_{i}.jpg") for i in range(3)]
+    with pytest.raises(ValueError, match='terlalu panjang'):
+        dataset_fitur.tambah_baris(path_dataset, daftar)
+    with pytest.raises(ValueError, match='terlalu panjang'):
+        dataset_fitur.sinkronkan_folder(path_dataset, str(tmp_path / awalan), daftar)
+    assert not os.path.exists(path_dataset)
+
+def test_kunci_non_ascii_tidak_terpotong(tmp_path):
+    path_dataset = str(tmp_path / 'data.fitur')
+    folder = 'pengukuran_' + 'é' * 50 # 100 byte UTF-8
+    daftar = [_fitur(f"{folder}/{nama}", area=0.1 * (i + 1), tegangan=float(i))
+              for i, nama in enumerate(['a.jpg', 'b.jpg', 'c.jpg'])]
+    assert max(len(f['nama_file'].encode('utf-8')) for f in daftar) <= 128
+
+    ditambah, dihapus = dataset_fitur.sinkronkan_folder(path_dataset, str(tmp_path / folder), daftar)
+    assert (ditambah, dihapus) == (3, 0)
+    df = dataset_fitur.muat_dataset(path_dataset)
+    assert sorted(df['nama_file']) == sorted(f['nama_file'] for f in daftar)
+    assert sorted(df['Tegangan']) == [0.0, 1.0, 2.0]
+
+    # Satu gambar dihapus dari folder: hanya barisnya yang dibuang
+    ditambah, dihapus = dataset_fitur.sinkronkan_folder(path_dataset, str(tmp_path / folder), daftar[:2])
+    assert (ditambah, dihapus) == (0, 1)
+    assert sorted(dataset_fitur.muat_dataset(path_dataset)['nama_file']) == sorted(f['nama_file'] for f in daftar[:2])
@@ -0,0 +1,398 @@
+import os
+import pty
+import sys
+import tty
+import json
+import time
+import heapq
+import random
+import signal
+import argparse
+import tempfile
+import threading
+import subprocess
+import urllib.request
+from broker_mini import BrokerMini
+from metrik_telemetri import baca_prometheus, kuantil_bucket
+
+# Uji beban end-to-end pipeline telemetri di satu mesin Linux:
+#
+#   perangkat palsu (pty) -> mqtt_bridge.py -> broker_mini -> mqtt_sub.py
+#
+# Setiap perangkat palsu adalah pasangan pseudo-terminal yang menulis baris JSON
+# seperti kirimDataKePC (servo.ino) dengan laju yang bisa diatur, plus gangguan:
+# baris rusak, placeholder -1.0 (cahaya tidak terdeteksi), jitter interval, dan
+# broker mati sementara. Bridge dan subscriber dijalankan sebagai proses
+# sungguhan; angka diambil dari endpoint /metrics keduanya (metrik_telemetri.py),
+# dari broker di dalam proses ini, dan CPU dari /proc/<pid>/stat.
+#
+# Contoh:
+#   python uji_beban_pipeline.py --perangkat 50 --laju 10 --durasi 30
+#   python uji_beban_pipeline.py --perangkat 20 --laju 20 --batch 50 --rusak 0.01 --putus-broker 5
+#   python uji_beban_pipeline.py --maks-drop 0 --json hasil.json   # exit 1 jika ada drop (regresi)
+
+FOLDER_REPO = os.path.dirname(os.path.abspath(__file__))
+PESAN_SETUP_ARDUINO = "Arduino UNO Siap. Mengirim JSON ke PC." # Baris pertama servo.ino setelah reset
+KUANTIL_LAPORAN = (0.5, 0.9, 0.99)
+BATAS_TUNGGU_SIAP = 30.0 # Detik menunggu bridge membuka semua port
+
+# --- PERANGKAT PALSU ---
+class PerangkatPalsu:
+    """
+    Satu tracker palsu: pasangan pty yang sisi slave-nya dibuka bridge.
+
+    Tulisan ke sisi master bersifat non-blocking; jika buffer pty penuh karena
+    bridge tidak membaca cukup cepat, baris dibuang dan dihitung (seperti
+    overrun UART).
+    """
+
+    def __init__(self, nama, rng):
+        self.nama = nama
+        self._master, self._slave = pty.openpty()
+        tty.setraw(self._slave) # Tanpa echo/konversi baris, seperti port serial
+        os.set_blocking(self._master, False)
+        self.path = os.ttyname(self._slave)
+        self.rng = rng
+        self.terkirim = 0          # Pembacaan valid yang tertulis
+        self.rusak = 0             # Baris rusak/non-JSON yang tertulis
+        self.dibuang_pty = 0       # Baris yang tidak muat di buffer pty
+        self.baris_setup = 0       # Baris PESAN_SETUP_ARDUINO saat menunggu bridge siap
+        # Status servo/sensor, berjalan acak seperti tracker sungguhan
+        self.azimuth = 80.0
+        self.elevasi = 80.0
+        self.tegangan = rng.uniform(4.0, 6.0)
+
+    def tulis(self, baris):
+        data = (baris + '\r\n').encode('ascii') # Serial.println() mengakhiri dengan CRLF
+        try:
+            return os.write(self._master, data) == len(data)
+        except BlockingIOError:
+            return False
+
+    def buat_pembacaan(self, peluang_placeholder):
+        rng = self.rng
+        self.tegangan = min(max(self.tegangan + rng.gauss(0, 0.05), 0.0), 11.5)
+        if rng.random() < peluang_placeholder:
+            # Cahaya tidak terdeteksi: firmware mengembalikan servo ke 80 derajat
+            self.azimuth = self.elevasi = 80.0
+            x = y = -1.0
+        else:
+            self.azimuth = min(max(self.azimuth + rng.choice((-1.0, 0.0, 0.0, 1.0)), 45.0), 135.0)
+            self.elevasi = min(max(self.elevasi + rng.choice((-1.0, 0.0, 0.0, 1.0)), 45.0), 135.0)
+            x, y = round(rng.gauss(0.4597, 0.05), 4), round(rng.gauss(0.0994, 0.05), 4)
+        return json.dumps({'koordinat_x': x, 'koordinat_y': y, 'tegangan_v': round(self.tegangan, 2),
+                           'rotasi_azimuth_deg': self.azimuth, 'rotasi_elevasi_deg': self.elevasi},
+                          separators=(',', ':'))
+
+    def kirim(self, peluang_rusak, peluang_placeholder):
+        if self.rng.random() < peluang_rusak:
+            baris = self.buat_pembacaan(peluang_placeholder)
+            # Byte hilang di tengah baris, atau pesan debug/reset Arduino
+            baris = baris[:self.rng.randrange(1, len(baris) - 1)] if self.rng.random() < 0.5 else PESAN_SETUP_ARDUINO
+            valid = False
+        else:
+            baris = self.buat_pembacaan(peluang_placeholder)
+            valid = True
+        if not self.tulis(baris):
+            self.dibuang_pty += 1
+        elif valid:
+            self.terkirim += 1
+        else:
+            self.rusak += 1
+
+    def kirim_setup(self):
+        # Seperti Arduino yang baru reset; juga penanda bahwa bridge sudah membaca port ini
+        self.tulis(PESAN_SETUP_ARDUINO)
+        self.baris_setup += 1
+
+    def tutup(self):
+        os.close(self._master)
+        os.close(self._slave)
+
+def jalankan_perangkat(daftar_perangkat, laju, jitter, peluang_rusak, peluang_placeholder, berhenti):
+    """
+    Satu thread untuk semua perangkat palsu: jadwal kirim per perangkat di heap.
+    Setiap perangkat mengirim `laju` pembacaan per detik (interval ± jitter).
+    """
+    interval = 1.0 / laju
+    sekarang = time.monotonic()
+    # Fase awal acak agar perangkat tidak mengirim serentak
+    jadwal = [(sekarang + random.random() * interval, i) for i in range(len(daftar_perangkat))]
+    heapq.heapify(jadwal)
+    while not berhenti.is_set():
+        waktu, i = jadwal[0]
+        jeda = waktu - time.monotonic()
+        if jeda > 0 and berhenti.wait(timeout=jeda):
+            break
+        perangkat = daftar_perangkat[i]
+        perangkat.kirim(peluang_rusak, peluang_placeholder)
+        berikut = waktu + interval * (1.0 + jitter * perangkat.rng.uniform(-1.0, 1.0))
+        heapq.heapreplace(jadwal, (berikut, i))
+
+# --- PENGUKURAN ---
+def ambil_metrik(port):
+    """Isi /metrics proses bridge/subscriber, atau None jika belum bisa diakses."""
+    try:
+        with urllib.request.urlopen(f'http://127.0.0.1:{port}/metrics', timeout=2) as respons:
+            return baca_prometheus(respons.read().decode('utf-8'))
+    except OSError:
+        return None
+
+def ambil_metrik_wajib(port, nama, folder_kerja):
+    """Seperti ambil_metrik, tetapi RuntimeError (menunjuk ke log proses) jika tidak bisa diakses."""
+    hasil = ambil_metrik(port)
+    if hasil is None:
+        raise RuntimeError(f"Endpoint /metrics {nama} (port {port}) tidak bisa diakses; "
+                           f"lihat {folder_kerja}/{nama}.log")
+    return hasil
+
+def jumlah_metrik(nilai, nama):
+    """Jumlah semua seri (semua label) dari satu metrik."""
+    return sum(v for k, v in nilai.items() if k == nama or k.startswith(nama + '{'))
+
+def waktu_cpu(pid):
+    """Detik CPU (user + system) sebuah proses dari /proc, atau None."""
+    try:
+        with open(f'/proc/{pid}/stat') as f:
+            bagian = f.read().rsplit(')', 1)[1].split()
+        return (int(bagian[11]) + int(bagian[12])) / os.sysconf('SC_CLK_TCK')
+    except (OSError, IndexError, ValueError):
+        return None
+
+def _port_bebas():
+    import socket
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+def _persen(a, b):
+    return 100.0 * a / b if b else 0.0
+
+def ringkas_latensi(histogram, nama):
+    if nama not in histogram:
+        return None
+    batas, jumlah = histogram[nama]
+    return {f'p{round(q * 100)}': kuantil_bucket(batas, jumlah, q) for q in KUANTIL_LAPORAN}
+
+# --- PROGRAM UTAMA ---
+def main():
+    parser = argparse.ArgumentParser(description="Uji beban end-to-end bridge -> broker -> subscriber.")
+    parser.add_argument('--perangkat', type=int, default=10, help="Jumlah tracker palsu.")
+    parser.add_argument('--laju', type=float, default=5.0,
+                        help="Pembacaan per detik per perangkat (firmware asli: 0.2).")
+    parser.add_argument('--durasi', type=float, default=20.0, help="Lama fase pengukuran (detik).")
+    parser.add_argument('--jitter', type=float, default=0.1, help="Variasi relatif interval kirim (0..1).")
+    parser.add_argument('--rusak', type=float, default=0.0,
+                        help="Peluang satu baris rusak (terpotong atau pesan debug Arduino).")
+    parser.add_argument('--placeholder', type=float, default=0.0,
+                        help="Peluang pembacaan tanpa deteksi cahaya (koordinat -1.0).")
+    parser.add_argument('--putus-broker', type=float, default=0.0,
+                        help="Matikan broker selama N detik di tengah pengukuran (0 = tidak).")
+    parser.add_argument('--batch', type=int, default=1, help="Diteruskan ke mqtt_bridge.py --batch.")
+    parser.add_argument('--jendela-batch', type=float, default=0.2,
+                        help="Diteruskan ke mqtt_bridge.py --jendela-batch.")
+    parser.add_argument('--laju-maks', type=float, default=5000.0,
+                        help="Diteruskan ke mqtt_bridge.py --laju-maks (pesan/detik).")
+    parser.add_argument('--dengan-penyimpanan', action='store_true',
+                        help="Jalankan mqtt_sub.py dengan --simpan (ikut mengukur sink SQLite).")
+    parser.add_argument('--tunggu-drain', type=float, default=10.0,
+                        help="Batas tunggu (detik) tanpa kemajuan setelah pengiriman berhenti.")
+    parser.add_argument('--maks-drop', type=float, default=None,
+                        help="Gagal (exit 1) jika fraksi pembacaan hilang melebihi nilai ini.")
+    parser.add_argument('--json', default=None, help="Simpan laporan sebagai JSON.")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    if args.perangkat < 1 or args.laju <= 0:
+        parser.error("--perangkat harus >= 1 dan --laju > 0")
+
+    folder_kerja = tempfile.mkdtemp(prefix='uji_beban_')
+    print(f"Folder kerja (log, spool): {folder_kerja}")
+    rng_induk = random.Random(args.seed)
+    daftar_perangkat = [PerangkatPalsu(f"sim{i:03d}", random.Random(rng_induk.getrandbits(32)))
+                        for i in range(args.perangkat)]
+
+    broker = BrokerMini(port=0)
+    port_broker = broker.mulai()
+    publish_broker_sebelumnya = 0 # Akumulasi publish dari instance broker sebelum restart
+    port_metrik_bridge, port_metrik_sub = _port_bebas(), _port_bebas()
+    print(f"Broker mini di 127.0.0.1:{port_broker}; {args.perangkat} perangkat palsu x {args.laju:g}/detik")
+
+    path_konfigurasi = os.path.join(folder_kerja, 'bridge.json')
+    with open(path_konfigurasi, 'w') as f:
+        json.dump({'broker': '127.0.0.1', 'port': port_broker, 'batch': args.batch,
+                   'jendela_batch': args.jendela_batch, 'laju_maks': args.laju_maks,
+                   'spool': os.path.join(folder_kerja, 'spool.sqlite'),
+                   'perangkat': [{'nama': p.nama, 'serial': p.path} for p in daftar_perangkat]}, f, indent=2)
+    perintah_sub = [sys.executable, os.path.join(FOLDER_REPO, 'mqtt_sub.py'), '--broker', '127.0.0.1',
+                    '--port', str(port_broker), '--port-metrik', str(port_metrik_sub), '--interval-statistik', '0']
+    if args.dengan_penyimpanan:
+        perintah_sub += ['--simpan', os.path.join(folder_kerja, 'telemetri.sqlite')]
+    perintah_bridge = [sys.executable, os.path.join(FOLDER_REPO, 'mqtt_bridge.py'), '--config', path_konfigurasi,
+                       '--port-metrik', str(port_metrik_bridge), '--interval-statistik', '0']
+    proses = {}
+    for nama, perintah in (('subscriber', perintah_sub), ('bridge', perintah_bridge)):
+        with open(os.path.join(folder_kerja, f'{nama}.log'), 'w') as log:
+            proses[nama] = subprocess.Popen(perintah, stdout=log, stderr=subprocess.STDOUT, cwd=folder_kerja)
+
+    berhenti_perangkat = threading.Event()
+    kode_keluar = 0
+    try:
+        # --- Tunggu pipeline siap: bridge membaca dari semua port ---
+        batas_waktu = time.monotonic() + BATAS_TUNGGU_SIAP
+        while True:
+            metrik_bridge = ambil_metrik(port_metrik_bridge)
+            metrik_sub = ambil_metrik(port_metrik_sub)
+            belum = [p for p in daftar_perangkat
+                     if metrik_bridge is None
+                     or metrik_bridge[0].get(f'bridge_baris_dibaca_total{{perangkat="{p.nama}"}}', 0) == 0]
+            if metrik_sub is not None and not belum:
+                break
+            if time.monotonic() > batas_waktu:
+                raise RuntimeError(f"Pipeline tidak siap dalam {BATAS_TUNGGU_SIAP:.0f} detik "
+                                   f"({len(belum)} port belum dibaca bridge); lihat log di {folder_kerja}")
+            for nama, p in proses.items():
+                if p.poll() is not None:
+                    raise RuntimeError(f"Proses {nama} berhenti (kode {p.returncode}); "
+                                       f"lihat {folder_kerja}/{nama}.log")
+            for perangkat in belum:
+                perangkat.kirim_setup()
+            time.sleep(0.5)
+        print("Pipeline siap; mulai pengukuran.")
+
+        # --- Fase pengukuran ---
+        metrik_awal = {'bridge': ambil_metrik_wajib(port_metrik_bridge, 'bridge', folder_kerja)[0],
+                       'subscriber': ambil_metrik_wajib(port_metrik_sub, 'subscriber', folder_kerja)[0]}
+        cpu_awal = {nama: waktu_cpu(p.pid) for nama, p in proses.items()}
+        cpu_awal['harness'] = time.process_time()
+        publish_broker_awal = broker.jumlah_publish
+        waktu_mulai = time.monotonic()
+        thread_perangkat = threading.Thread(
+            target=jalankan_perangkat, name="perangkat_palsu",
+            args=(daftar_perangkat, args.laju, args.jitter, args.rusak, args.placeholder, berhenti_perangkat))
+        thread_perangkat.start()
+
+        if args.putus_broker > 0:
+            berhenti_perangkat.wait(timeout=max(0.0, (args.durasi - args.putus_broker) / 2))
+            print(f"Gangguan: broker dimatikan selama {args.putus_broker:g} detik.")
+            broker.hentikan()
+            publish_broker_sebelumnya += broker.jumlah_publish
+            time.sleep(args.putus_broker)
+            broker = BrokerMini(port=port_broker)
+            broker.mulai()
+            print("Broker hidup kembali.")
+        berhenti_perangkat.wait(timeout=max(0.0, waktu_mulai + args.durasi - time.monotonic()))
+        berhenti_perangkat.set()
+        thread_perangkat.join()
+        durasi = time.monotonic() - waktu_mulai
+        metrik_akhir_sub = ambil_metrik_wajib(port_metrik_sub, 'subscriber', folder_kerja)[0]
+        cpu_akhir = {nama: waktu_cpu(p.pid) for nama, p in proses.items()}
+        cpu_akhir['harness'] = time.process_time()
+        publish_broker_fase = publish_broker_sebelumnya + broker.jumlah_publish - publish_broker_awal
+
+        # --- Drain: tunggu sisa pesan sampai ke subscriber ---
+        terkirim = sum(p.terkirim for p in daftar_perangkat)
+        diterima_sebelum, waktu_kemajuan = -1, time.monotonic()
+        while time.monotonic() - waktu_kemajuan < args.tunggu_drain:
+            metrik_sub, histogram_sub = ambil_metrik_wajib(port_metrik_sub, 'subscriber', folder_kerja)
+            diterima = jumlah_metrik(metrik_sub, 'subscriber_pembacaan_diterima_total')
+            if diterima >= terkirim:
+                break
+            if diterima != diterima_sebelum:
+                diterima_sebelum, waktu_kemajuan = diterima, time.monotonic()
+            time.sleep(0.25)
+        metrik_sub, histogram_sub = ambil_metrik_wajib(port_metrik_sub, 'subscriber', folder_kerja)
+        metrik_bridge, histogram_bridge = ambil_metrik_wajib(port_metrik_bridge, 'bridge', folder_kerja)
+
+        # --- Laporan ---
+        diterima = jumlah_metrik(metrik_sub, 'subscriber_pembacaan_diterima_total')
+        diterima_fase = (jumlah_metrik(metrik_akhir_sub, 'subscriber_pembacaan_diterima_total')
+                         - jumlah_metrik(metrik_awal['subscriber'], 'subscriber_pembacaan_diterima_total'))
+        pesan_fase = (metrik_akhir_sub.get('subscriber_pesan_diterima_total', 0)
+                      - metrik_awal['subscriber'].get('subscriber_pesan_diterima_total', 0))
+        hilang = int(max(0, terkirim - diterima))
+        laporan = {
+            'konfigurasi': vars(args),
+            'durasi_detik': durasi,
+            'perangkat': {
+                'pembacaan_terkirim': terkirim,
+                'baris_rusak': sum(p.rusak for p in daftar_perangkat),
+                'dibuang_pty': sum(p.dibuang_pty for p in daftar_perangkat),
+                'baris_setup': sum(p.baris_setup for p in daftar_perangkat),
+                'laju_target_per_detik': args.perangkat * args.laju,
+            },
+            'throughput': {
+                'pembacaan_per_detik': diterima_fase / durasi,
+                'pesan_subscriber_per_detik': pesan_fase / durasi,
+                'publish_broker_per_detik': publish_broker_fase / durasi,
+            },
+            'pembacaan_diterima': int(diterima),
+            'pembacaan_hilang': hilang,
+            'fraksi_hilang': hilang / terkirim if terkirim else 0.0,
+            'duplikat_dibuang': int(metrik_sub.get('subscriber_duplikat_total', 0)),
+            'decode_gagal': int(metrik_sub.get('subscriber_decode_gagal_total', 0)),
+            'spool_backlog_akhir': int(metrik_bridge.get('bridge_spool_backlog', 0)),
+            'publish_gagal_bridge': int(metrik_bridge.get('bridge_publish_gagal_total', 0)),
+            'latensi_detik': {
+                'baca_serial_ke_subscriber': ringkas_latensi(histogram_sub, 'subscriber_latensi_baca_terima_detik'),
+                'publish_ke_subscriber': ringkas_latensi(histogram_sub, 'subscriber_latensi_publish_terima_detik'),
+                'baca_serial_ke_publish': ringkas_latensi(histogram_bridge, 'bridge_latensi_baca_publish_detik'),
+            },
+            'cpu_persen': {nama: (_persen(cpu_akhir[nama] - cpu_awal[nama], durasi)
+                                  if cpu_awal[nama] is not None and cpu_akhir[nama] is not None else None)
+                           for nama in cpu_awal},
+        }
+        tampilkan_laporan(laporan)
+        if args.json:
+            with open(args.json, 'w') as f:
+                json.dump(laporan, f, indent=2)
+            print(f"Laporan disimpan di {args.json}")
+        if args.maks_drop is not None and laporan['fraksi_hilang'] > args.maks_drop:
+            print(f"GAGAL: {laporan['fraksi_hilang']:.2%} pembacaan hilang (batas {args.maks_drop:.2%}).")
+            kode_keluar = 1
+    except RuntimeError as e:
+        print(f"Error: {e}")
+        kode_keluar = 2
+    finally:
+        berhenti_perangkat.set()
+        for p in proses.values():
+            if p.poll() is None:
+                p.send_signal(signal.SIGINT)
+        for p in proses.values():
+            try:
+                p.wait(timeout=15)
+            except subprocess.TimeoutExpired:
+                p.kill()
+        broker.hentikan()
+        for perangkat in daftar_perangkat:
+            perangkat.tutup()
+    return kode_keluar
+
+def tampilkan_laporan(laporan):
+    def ms(nilai):
+        return "N/A" if nilai is None else f"{nilai * 1000:.1f} ms"
+
+    perangkat, throughput = laporan['perangkat'], laporan['throughput']
+    print("\n===== Hasil Uji Beban =====")
+    print(f"Durasi pengukuran      : {laporan['durasi_detik']:.1f} detik")
+    print(f"Laju target            : {perangkat['laju_target_per_detik']:.1f} pembacaan/detik")
+    print(f"Throughput subscriber  : {throughput['pembacaan_per_detik']:.1f} pembacaan/detik "
+          f"({throughput['pesan_subscriber_per_detik']:.1f} pesan/detik)")
+    print(f"Publish ke broker      : {throughput['publish_broker_per_detik']:.1f} pesan/detik")
+    print(f"Pembacaan terkirim     : {perangkat['pembacaan_terkirim']} "
+          f"(+{perangkat['baris_rusak']} baris rusak, {perangkat['dibuang_pty']} dibuang buffer pty)")
+    print(f"Pembacaan diterima     : {laporan['pembacaan_diterima']} "
+          f"(hilang {laporan['pembacaan_hilang']} = {laporan['fraksi_hilang']:.3%}, "
+          f"duplikat dibuang {laporan['duplikat_dibuang']})")
+    print(f"Decode gagal           : {laporan['decode_gagal']} "
+          f"(baris rusak + hingga {perangkat['baris_setup']} baris setup Arduino saat menunggu bridge)")
+    print(f"Bridge                 : backlog spool {laporan['spool_backlog_akhir']}, "
+          f"publish gagal {laporan['publish_gagal_bridge']}")
+    for nama, kuantil in laporan['latensi_detik'].items():
+        if kuantil:
+            print(f"Latensi {nama:<24}: " + ", ".join(f"{k}={ms(v)}" for k, v in kuantil.items()))
+    print("CPU (% satu core)      : " + ", ".join(
+        f"{nama}={'N/A' if v is None else f'{v:.1f}%'}" for nama, v in laporan['cpu_persen'].items()))
+    print("(Persentil latensi diinterpolasi dari bucket histogram; harness = broker + perangkat palsu.)")
+
+if __name__ == "__main__":
+    sys.exit(main())